@@ -0,0 +1,194 @@
+from typing import List, Optional
+from pathlib import Path
+
+import random
+
+
+class Corpus:
+    """Synthetic clua sources and projects used by the benchmarks (deterministic per seed)."""
+    
+    # Names used by the generated code
+    NAMES: List[str] = [
+        "value", "count", "index", "result", "buffer", "player", "health", "score",
+        "speed", "target", "offset", "length", "state", "config", "item", "total"
+    ]
+    
+    TYPES: List[str] = ["Number", "String", "Boolean", "Table"]
+    
+    
+    @staticmethod
+    def generate_expression(rng: random.Random, min_length: int) -> str:
+        """Returns an arithmetic/call expression of at least min_length characters."""
+        
+        parts: List[str] = [rng.choice(Corpus.NAMES)]
+        length = len(parts[0])
+        
+        while length < min_length:
+            operand = rng.choice([
+                rng.choice(Corpus.NAMES),
+                str(rng.randint(0, 9999)),
+                f'"{rng.choice(Corpus.NAMES)}"',
+                f"{rng.choice(Corpus.NAMES)}.{rng.choice(Corpus.NAMES)}",
+                f"{rng.choice(Corpus.NAMES)}({rng.choice(Corpus.NAMES)}, {rng.randint(0, 99)})",
+            ])
+            operator = rng.choice(["+", "-", "*", "/", "..", "==", "and", "or"])
+            
+            parts.append(f" {operator} {operand}")
+            length += len(operator) + len(operand) + 2
+        
+        return "".join(parts)
+    
+    
+    @staticmethod
+    def generate_block(
+        rng: random.Random,
+        lines: List[str],
+        depth: int,
+        max_depth: int,
+        line_length: int,
+        statement_count: int
+    ):
+        """Appends the lines of a block (nested blocks up to max_depth) to lines."""
+        
+        indent = "    " * depth
+        
+        for _ in range(statement_count):
+            name = rng.choice(Corpus.NAMES)
+            choice = rng.random()
+            
+            if depth < max_depth and choice < 0.25:
+                keyword = rng.choice(["if", "while", "for"])
+                
+                if keyword == "if":
+                    lines.append(f"{indent}if {Corpus.generate_expression(rng, 10)} then")
+                elif keyword == "while":
+                    lines.append(f"{indent}while {name} < {rng.randint(1, 100)} do")
+                else:
+                    lines.append(f"{indent}for {name} = 1, {rng.randint(1, 100)} do")
+                
+                Corpus.generate_block(rng, lines, depth + 1, max_depth, line_length, 3)
+                lines.append(f"{indent}end")
+            elif choice < 0.35:
+                lines.append(f"{indent}-- {name} {'x' * rng.randint(0, 40)}")
+            elif choice < 0.55:
+                type_name = rng.choice(Corpus.TYPES)
+                expression = Corpus.generate_expression(rng, line_length - len(indent) - 30)
+                
+                lines.append(f"{indent}local {name}: {type_name} = {expression}")
+            elif choice < 0.75:
+                expression = Corpus.generate_expression(rng, line_length - len(indent) - 20)
+                lines.append(f"{indent}{name} = {expression}")
+            else:
+                expression = Corpus.generate_expression(rng, line_length - len(indent) - 10)
+                lines.append(f"{indent}print({expression})")
+    
+    
+    @staticmethod
+    def generate_source(
+        size: int,
+        line_length: int = 60,
+        nesting_depth: int = 3,
+        requires: Optional[List[str]] = None,
+        seed: int = 0
+    ) -> str:
+        """
+        Generates a clua source made of typed functions with nested blocks.
+        
+        Args:
+            size (int): The approximate size of the source in bytes.
+            line_length (int, optional): The approximate length of the statement lines.
+            nesting_depth (int, optional): The maximum nesting depth of the blocks.
+            requires (List[str], optional): The module names required at the top of the file.
+            seed (int, optional): The random seed.
+        
+        Returns:
+            str: The generated source.
+        """
+        
+        rng = random.Random(seed)
+        lines: List[str] = [
+            f'local {module_name.replace(".", "_")} = require("{module_name}")'
+            for module_name in requires or []
+        ]
+        length = sum(len(line) + 1 for line in lines)
+        function_index = 0
+        
+        while length < size:
+            start = len(lines)
+            parameters = ", ".join(
+                f"{name}: {rng.choice(Corpus.TYPES)}"
+                for name in rng.sample(Corpus.NAMES, 2)
+            )
+            
+            lines.append(f"local function function_{function_index}({parameters}): Number")
+            Corpus.generate_block(rng, lines, 1, nesting_depth, line_length, 8)
+            lines.append(f"    return {rng.choice(Corpus.NAMES)}")
+            lines.append("end")
+            lines.append("")
+            
+            length += sum(len(line) + 1 for line in lines[start:])
+            function_index += 1
+        
+        return "\n".join(lines)
+    
+    
+    @staticmethod
+    def generate_project(
+        project_dir_path: Path,
+        file_count: int,
+        file_size: int,
+        line_length: int = 60,
+        nesting_depth: int = 3,
+        files_per_dir: int = 20,
+        seed: int = 0
+    ) -> List[Path]:
+        """
+        Writes a project directory (nested directories, config files and require chains).
+        
+        Args:
+            project_dir_path (Path): The path of the project directory (created if missing).
+            file_count (int): The number of clua files.
+            file_size (int): The approximate size of every file in bytes.
+            line_length (int, optional): The approximate length of the statement lines.
+            nesting_depth (int, optional): The maximum nesting depth of the blocks.
+            files_per_dir (int, optional): The number of files per directory.
+            seed (int, optional): The random seed.
+        
+        Returns:
+            List[Path]: The paths of the written clua files.
+        """
+        
+        rng = random.Random(seed)
+        project_dir_path.mkdir(parents=True, exist_ok=True)
+        (project_dir_path / "clua.config.yaml").write_text("compilerOptions:\n  removeComments: false\n")
+        
+        module_names: List[str] = []
+        cf_paths: List[Path] = []
+        
+        for file_index in range(file_count):
+            dir_index = file_index // files_per_dir
+            dir_path = project_dir_path / f"module_{dir_index}"
+            
+            if not dir_path.exists():
+                dir_path.mkdir()
+                
+                # A config file every few directories (config inheritance)
+                if dir_index % 4 == 0:
+                    (dir_path / "clua.config.yaml").write_text("compilerOptions:\n  removeComments: true\n")
+            
+            # Requires of previously generated modules (acyclic graph)
+            requires = rng.sample(module_names, min(len(module_names), 3))
+            
+            cf_path = dir_path / f"file_{file_index}.clua"
+            cf_path.write_text(Corpus.generate_source(
+                file_size,
+                line_length,
+                nesting_depth,
+                requires,
+                seed + file_index
+            ))
+            
+            module_names.append(f"module_{dir_index}.file_{file_index}")
+            cf_paths.append(cf_path)
+        
+        return cf_paths
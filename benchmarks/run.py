@@ -0,0 +1,333 @@
+"""
+Benchmarks of the compiler hot paths (loader, scanner, parser, emitter, driver).
+
+Usage (from the repository root):
+    python benchmarks/run.py [--size 1000000] [--files 200] [--output results.json]
+    python benchmarks/run.py --save-baseline
+    python benchmarks/run.py --baseline benchmarks/baseline.json --threshold 0.1
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+
+import statistics
+import argparse
+import platform
+import tempfile
+import json
+import time
+import sys
+import io
+
+# The compiler package lives inside the src directory
+REPOSITORY_DIR_PATH = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPOSITORY_DIR_PATH / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from compiler import Cache, Loader, Driver, Scanner, Parser, Emitter, SourceBuffer, LineIndex, SourceMap  # noqa: E402
+from corpus import Corpus  # noqa: E402
+
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+
+class Benchmarks:
+    @staticmethod
+    def measure(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+        """
+        Runs a function multiple times.
+        
+        Returns:
+            Dict[str, float]: The best and median durations in seconds.
+        """
+        
+        durations: List[float] = []
+        
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            function()
+            durations.append(time.perf_counter() - start_time)
+        
+        return {"seconds": min(durations), "median_seconds": statistics.median(durations)}
+    
+    
+    @staticmethod
+    def run_file_benchmarks(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+        """Scanner, parser and emitter benchmarks on a single generated source."""
+        
+        source = Corpus.generate_source(args.size, args.line_length, args.depth, seed=args.seed).encode()
+        buffer = SourceBuffer.from_bytes(source)
+        megabytes = len(source) / 1_000_000
+        
+        results: Dict[str, Dict[str, float]] = {}
+        
+        result = Benchmarks.measure(lambda: Scanner.scan(buffer), args.repeat)
+        tokens = Scanner.scan(buffer)
+        result["mb_per_second"] = megabytes / result["seconds"]
+        result["tokens_per_second"] = len(tokens) / result["seconds"]
+        results["scanner.scan"] = result
+        
+        result = Benchmarks.measure(lambda: Scanner.prescan(buffer), args.repeat)
+        result["mb_per_second"] = megabytes / result["seconds"]
+        results["scanner.prescan"] = result
+        
+        result = Benchmarks.measure(lambda: Parser(tokens).parse(), args.repeat)
+        tree = Parser(tokens).parse()
+        result["nodes_per_second"] = len(tree) / result["seconds"]
+        result["tokens_per_second"] = len(tokens) / result["seconds"]
+        results["parser.parse"] = result
+        
+        def emit(remove_comments: bool = False, source_map: Optional[SourceMap.Builder] = None):
+            # Streaming pipeline of the driver (parse -> emit, one top-level statement at a time)
+            parser = Parser(tokens)
+            Emitter.emit_statements(parser.iter_statements(), parser.tree, buffer, io.BytesIO(), remove_comments, source_map)
+        
+        result = Benchmarks.measure(emit, args.repeat)
+        result["mb_per_second"] = megabytes / result["seconds"]
+        results["emitter.emit_statements"] = result
+        
+        # compilerOptions.removeComments
+        result = Benchmarks.measure(lambda: emit(remove_comments=True), args.repeat)
+        result["mb_per_second"] = megabytes / result["seconds"]
+        results["emitter.remove_comments"] = result
+        
+        # compilerOptions.sourceMap (segments recorded by the emitter, VLQ encoding)
+        line_index = LineIndex.from_buffer(buffer.data)
+        
+        def emit_source_map():
+            source_map = SourceMap.Builder(line_index, "output.lua", "output.clua")
+            emit(source_map=source_map)
+            source_map.build().encode_mappings()
+        
+        result = Benchmarks.measure(emit_source_map, args.repeat)
+        result["mb_per_second"] = megabytes / result["seconds"]
+        results["emitter.source_map"] = result
+        
+        # Shipped examples (fixed corpus)
+        example_buffers = [
+            SourceBuffer.from_bytes(cf_path.read_bytes())
+            for cf_path in sorted((REPOSITORY_DIR_PATH / "examples" / "clua_files").glob("*.clua"))
+        ]
+        
+        if len(example_buffers) > 0:
+            example_megabytes = sum(example_buffer.size for example_buffer in example_buffers) / 1_000_000
+            
+            result = Benchmarks.measure(
+                lambda: [Scanner.scan(example_buffer) for example_buffer in example_buffers],
+                args.repeat
+            )
+            result["mb_per_second"] = example_megabytes / result["seconds"]
+            results["scanner.scan_examples"] = result
+            
+            result = Benchmarks.measure(
+                lambda: [Scanner.prescan(example_buffer) for example_buffer in example_buffers],
+                args.repeat
+            )
+            result["mb_per_second"] = example_megabytes / result["seconds"]
+            results["scanner.prescan_examples"] = result
+        
+        return results
+    
+    
+    @staticmethod
+    def run_project_benchmarks(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+        """Loader and end-to-end compile benchmarks on a generated project."""
+        
+        results: Dict[str, Dict[str, float]] = {}
+        
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            project_dir_path = Path(temporary_dir) / "project"
+            
+            Corpus.generate_project(
+                project_dir_path,
+                args.files,
+                args.file_size,
+                args.line_length,
+                args.depth,
+                seed=args.seed
+            )
+            
+            results["loader.initialize"] = Benchmarks.measure(
+                lambda: Loader.initialize(project_dir_path),
+                args.repeat
+            )
+            
+            clua_trace = Cache.Project.clua_trace or []
+            import_graph = Cache.Project.import_graph
+            waves = import_graph.topological_waves() if import_graph is not None else None
+            
+            result = Benchmarks.measure(
+                lambda: Driver.compile_trace(clua_trace, 1, None, False, waves),
+                args.repeat
+            )
+            result["files_per_second"] = len(clua_trace) / result["seconds"]
+            results["driver.compile_trace"] = result
+            
+            result = Benchmarks.measure(
+                lambda: Driver.compile_trace(clua_trace, None, None, False, waves),
+                args.repeat
+            )
+            result["files_per_second"] = len(clua_trace) / result["seconds"]
+            results["driver.compile_trace_parallel"] = result
+            
+            # Warm on-disk cache (every file is unchanged)
+            cache_dir_path = project_dir_path / ".clua_cache"
+            Driver.compile_trace(clua_trace, 1, cache_dir_path, False, waves)
+            
+            result = Benchmarks.measure(
+                lambda: Driver.compile_trace(clua_trace, 1, cache_dir_path, False, waves),
+                args.repeat
+            )
+            result["files_per_second"] = len(clua_trace) / result["seconds"]
+            results["driver.compile_trace_cached"] = result
+        
+        return results
+    
+    
+    @staticmethod
+    def compare(
+        results: Dict[str, Dict[str, float]],
+        baseline: Dict[str, Dict[str, float]],
+        threshold: float
+    ) -> List[str]:
+        """
+        Compares the results with a baseline.
+        
+        Returns:
+            List[str]: The names of the regressed benchmarks (slower than baseline * (1 + threshold)).
+        """
+        
+        regressions: List[str] = []
+        
+        for name, result in results.items():
+            baseline_result = baseline.get(name)
+            
+            if baseline_result is None:
+                print(f"{name:<34} {result['seconds'] * 1000:10.2f} ms  (no baseline)")
+                continue
+            
+            ratio = result["seconds"] / baseline_result["seconds"]
+            status = "REGRESSION" if ratio > 1 + threshold else "ok"
+            
+            if status == "REGRESSION":
+                regressions.append(name)
+            
+            print(f"{name:<34} {result['seconds'] * 1000:10.2f} ms  {ratio:6.2f}x  {status}")
+        
+        return regressions
+    
+    
+    @staticmethod
+    def main(argv: Optional[List[str]] = None) -> int:
+        parser = argparse.ArgumentParser(description="Clua compiler benchmarks.")
+        
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=1_000_000,
+            help="size of the single file benchmarks (bytes)"
+        )
+        parser.add_argument(
+            "--files",
+            type=int,
+            default=200,
+            help="number of files of the project benchmarks"
+        )
+        parser.add_argument(
+            "--file-size",
+            type=int,
+            default=10_000,
+            help="size of the project files (bytes)"
+        )
+        parser.add_argument(
+            "--line-length",
+            type=int,
+            default=60,
+            help="approximate length of the lines"
+        )
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=3,
+            help="maximum nesting depth of the blocks"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="number of runs per benchmark (best is kept)"
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="random seed of the corpus"
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="write the results as JSON"
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            default=DEFAULT_BASELINE_PATH,
+            help="baseline JSON file"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.1,
+            help="allowed slowdown before flagging"
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="store the results as the new baseline"
+        )
+        
+        args = parser.parse_args(argv)
+        
+        results: Dict[str, Dict[str, float]] = {}
+        results.update(Benchmarks.run_file_benchmarks(args))
+        results.update(Benchmarks.run_project_benchmarks(args))
+        
+        report: Dict[str, Any] = {
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+            },
+            "parameters": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "baseline", "save_baseline")
+            },
+            "results": results
+        }
+        
+        if args.output is not None:
+            args.output.write_text(json.dumps(report, indent=2))
+        
+        if args.save_baseline:
+            args.baseline.write_text(json.dumps(report, indent=2))
+            print(f"Baseline saved: {args.baseline}")
+        
+        baseline: Dict[str, Dict[str, float]] = {}
+        
+        if args.baseline.is_file() and not args.save_baseline:
+            baseline_report = json.loads(args.baseline.read_text())
+            
+            # Results of other corpus parameters are not comparable
+            if baseline_report.get("parameters") != report["parameters"]:
+                print("Warning: the baseline was measured with other parameters.", file=sys.stderr)
+            
+            baseline = baseline_report.get("results", {})
+        
+        regressions = Benchmarks.compare(results, baseline, args.threshold)
+        
+        return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(Benchmarks.main())
@@ -1,12 +1,51 @@
 # type: ignore
-from .contexts import Cache
-from .contexts import Register
+from importlib import import_module
 
-from .utilities import Debugger
-from .utilities import Paths
-from .utilities import Files
 
-from .loader import Loader
-from .operator import Operator
-from .scanner import Scanner
-from .parser import Parser
+# Public names of the package and the modules where they are defined,
+# the modules are only imported on first access (compiler startup time)
+LAZY_NAMES = {
+    "Cache": ".contexts",
+    "Register": ".contexts",
+    
+    "Debugger": ".utilities",
+    "Paths": ".utilities",
+    "Files": ".utilities",
+    "SourceBuffer": ".utilities",
+    "LineIndex": ".utilities",
+    "SourceCursor": ".utilities",
+    "DiskCache": ".utilities",
+    "Timings": ".utilities",
+    "OutputFile": ".utilities",
+    "SourceMap": ".utilities",
+    
+    "ConfigResolver": ".resolver",
+    "Loader": ".loader",
+    "Operator": ".operator",
+    "Scanner": ".scanner",
+    "ImportGraph": ".graph",
+    "Parser": ".parser",
+    "Emitter": ".emitter",
+    "Driver": ".driver",
+    "Watcher": ".watcher",
+    "Client": ".client",
+    "Server": ".server",
+    "Cli": ".cli",
+}
+
+
+def __getattr__(name: str):
+    module_name = LAZY_NAMES.get(name)
+    
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(import_module(module_name, __name__), name)
+    
+    # Next accesses don't go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(LAZY_NAMES))
@@ -0,0 +1,12 @@
+import time
+
+# Measured before the compiler modules are imported (--startup-profile)
+startup_time = time.perf_counter()
+
+from compiler import Cli
+
+import sys
+
+
+if __name__ == "__main__":
+    sys.exit(Cli.main(startup_time=startup_time))
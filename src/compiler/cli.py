@@ -0,0 +1,300 @@
+from compiler import Cache, Debugger, SourceBuffer, Timings, Loader, Driver, Watcher
+from compiler.client import Client
+from compiler.contexts import FileContext, ProjectContext
+
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from pathlib import Path
+
+import argparse
+import json
+import time
+import sys
+
+
+class Cli:
+    """Command line entry point of the compiler (python -m compiler)."""
+    
+    @staticmethod
+    def create_parser() -> argparse.ArgumentParser:
+        """Returns the argument parser of the command line interface."""
+        
+        parser = argparse.ArgumentParser(
+            prog="clua",
+            description="Clua compiler (\"clua serve\" starts a compilation server)."
+        )
+        
+        parser.add_argument(
+            "project_dir",
+            nargs="?",
+            default=".",
+            help="path of the project directory (defaults to the current directory)"
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="keep running and recompile the changed files"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="polling interval of the watch mode in seconds"
+        )
+        parser.add_argument(
+            "-j", "--jobs",
+            type=int,
+            default=None,
+            help="number of worker processes (defaults to the number of CPUs)"
+        )
+        parser.add_argument(
+            "--emit",
+            action="store_true",
+            help="write the Lua output of every clua file beside it"
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="disable the on-disk compile cache (.clua_cache)"
+        )
+        parser.add_argument(
+            "--snippets",
+            action="store_true",
+            help="print the source line under every diagnostic"
+        )
+        parser.add_argument(
+            "--server",
+            action="store_true",
+            help="compile through the compilation server (compiles locally if it is not running)"
+        )
+        parser.add_argument(
+            "--socket",
+            type=Path,
+            default=None,
+            help="path of the compilation server socket"
+        )
+        parser.add_argument(
+            "--startup-profile",
+            action="store_true",
+            help="report the import, initialization and compilation times"
+        )
+        parser.add_argument(
+            "--timings",
+            action="store_true",
+            help="report the time spent per phase and the slowest files"
+        )
+        parser.add_argument(
+            "--timings-json",
+            type=Path,
+            default=None,
+            help="write the phase timings and counters as JSON"
+        )
+        parser.add_argument(
+            "--timings-trace",
+            type=Path,
+            default=None,
+            help="write the phase timings as a Chrome trace (chrome://tracing, Perfetto)"
+        )
+        
+        return parser
+    
+    
+    @staticmethod
+    def report(
+        contexts: List[FileContext],
+        snippets: bool = False,
+        output_file: Optional[TextIO] = None,
+        project: Optional[ProjectContext] = None
+    ) -> int:
+        """
+        Prints the diagnostics of the compiled files (trace order, then offset order),
+        filtered by the "logLevel" and "ignoreDiagnostics" compiler options of every file.
+
+        Args:
+            contexts (List[FileContext]): The compilation contexts (trace order).
+            snippets (bool, optional): Prints the source line under every diagnostic.
+            output_file (TextIO, optional): The output stream (defaults to stdout).
+            project (ProjectContext, optional): The project of the files (defaults to Cache.Project).
+
+        Returns:
+            int: The number of reported errors.
+        """
+        
+        messages: Dict[str, Any] = Cache.Compiler.compiler_database.get("diagnostic_messages.yaml") or {}
+        error_count = 0
+        
+        # Debuggers of the effective configs, one per directory
+        debuggers: Dict[Path, Debugger] = {}
+        
+        for context in contexts:
+            if len(context.diagnostics) == 0 or context.line_index is None:
+                continue
+            
+            debugger = debuggers.get(context.cf_path.parent)
+            
+            if debugger is None:
+                compiler_options = Driver.get_compiler_options(context.cf_path, project)
+                debugger = debuggers[context.cf_path.parent] = Debugger.from_options(messages, compiler_options)
+            
+            diagnostics = debugger.filter(context.diagnostics)
+            
+            if len(diagnostics) == 0:
+                continue
+            
+            # The source is only opened again for the files with reported diagnostics
+            cf_buffer = SourceBuffer.open(context.cf_path) if snippets else None
+            
+            try:
+                for diagnostic in diagnostics:
+                    if debugger.get_log_type(diagnostic[0]) == Debugger.Types.ERROR:
+                        error_count += 1
+                    
+                    print(debugger.format(context.cf_path, diagnostic, context.line_index, cf_buffer), file=output_file)
+            finally:
+                if cf_buffer is not None:
+                    cf_buffer.close()
+        
+        return error_count
+    
+    
+    @staticmethod
+    def report_startup_profile(timestamps: List[Tuple[str, float]]):
+        """
+        Prints the duration of the startup steps (stderr).
+
+        Args:
+            timestamps (List[Tuple[str, float]]): The steps names and their end time
+                (time.perf_counter()), the first one is the reference time.
+        """
+        
+        for (_, previous_time), (step_name, step_time) in zip(timestamps, timestamps[1:]):
+            print(f"{step_name:<12} {(step_time - previous_time) * 1000:8.2f} ms", file=sys.stderr)
+        
+        total_time = timestamps[-1][1] - timestamps[0][1]
+        print(f"{'total':<12} {total_time * 1000:8.2f} ms", file=sys.stderr)
+    
+    
+    @staticmethod
+    def report_timings(timings: Timings, args: argparse.Namespace):
+        """
+        Prints the timings report (stderr) and writes the requested timings files.
+
+        Args:
+            timings (Timings): The recorder of the compilation (Cache.Compiler.timings).
+            args (argparse.Namespace): The parsed command line arguments.
+        """
+        
+        if args.timings:
+            print(timings.format_report(), file=sys.stderr)
+        
+        if args.timings_json is not None:
+            args.timings_json.write_text(json.dumps(timings.to_json(), indent=2))
+        
+        if args.timings_trace is not None:
+            args.timings_trace.write_text(json.dumps(timings.to_chrome_trace()))
+    
+    
+    @staticmethod
+    def compile_on_server(args: argparse.Namespace, project_dir_path: Path) -> Optional[int]:
+        """
+        Sends the compilation of a project to the compilation server (--server).
+
+        Args:
+            args (argparse.Namespace): The parsed command line arguments.
+            project_dir_path (Path): The absolute path of the project directory.
+
+        Returns:
+            Optional[int]: The exit code, or None if the server cannot be reached.
+        """
+        
+        socket_path = args.socket or Client.get_default_socket_path()
+        
+        try:
+            response = Client.compile(socket_path, project_dir_path, not args.no_cache, args.emit, args.snippets)
+        except OSError:
+            print(f"No compilation server on {socket_path}, compiling locally.", file=sys.stderr)
+            return None
+        
+        if response.get("status") != "ok":
+            print(f"Compilation server error: {response.get('message')}", file=sys.stderr)
+            return 1
+        
+        sys.stdout.write(response.get("output", ""))
+        
+        return int(response.get("exitCode", 1))
+    
+    
+    @staticmethod
+    def main(argv: Optional[List[str]] = None, startup_time: Optional[float] = None) -> int:
+        """
+        Compiles a project (and watches it if requested),
+        "serve" as first argument starts a compilation server instead.
+
+        Args:
+            argv (List[str], optional): The command line arguments (defaults to sys.argv[1:]).
+            startup_time (float, optional): The time (time.perf_counter()) measured before
+                the compiler imports, used as the reference of --startup-profile.
+
+        Returns:
+            int: The exit code (1 if errors have been reported).
+        """
+        
+        timestamps: List[Tuple[str, float]] = [("start", startup_time or time.perf_counter())]
+        
+        if argv is None:
+            argv = sys.argv[1:]
+        
+        if len(argv) > 0 and argv[0] == "serve":
+            # Imported on demand (only the server needs socketserver/threading)
+            from compiler.server import Server
+            
+            return Server.main(argv[1:])
+        
+        args = Cli.create_parser().parse_args(argv)
+        timestamps.append(("imports", time.perf_counter()))
+        
+        project_dir_path = Path(args.project_dir).resolve()
+        cache_dir_path = None if args.no_cache else project_dir_path / ".clua_cache"
+        
+        record_timings = args.timings or args.timings_json is not None or args.timings_trace is not None
+        
+        # Watch mode and timings need the project state of the current process
+        if args.server and not args.watch and not record_timings:
+            exit_code = Cli.compile_on_server(args, project_dir_path)
+            
+            if exit_code is not None:
+                return exit_code
+        
+        if record_timings:
+            Cache.Compiler.timings = Timings()
+        
+        Loader.initialize(project_dir_path)
+        timestamps.append(("initialize", time.perf_counter()))
+        
+        import_graph = Cache.Project.import_graph
+        watcher: Optional[Watcher] = None
+        
+        # Taken before the initial compilation, the files saved meanwhile are rebuilt
+        if args.watch:
+            watcher = Watcher(project_dir_path, args.jobs, cache_dir_path, emit=args.emit)
+            watcher.take_snapshot()
+        
+        contexts = Driver.compile_trace(
+            Cache.Project.clua_trace or [],
+            args.jobs,
+            cache_dir_path,
+            args.emit,
+            import_graph.topological_waves() if import_graph is not None else None
+        )
+        error_count = Cli.report(contexts, args.snippets)
+        timestamps.append(("compile", time.perf_counter()))
+        
+        if args.startup_profile:
+            Cli.report_startup_profile(timestamps)
+        
+        if Cache.Compiler.timings.enabled:
+            Cli.report_timings(Cache.Compiler.timings, args)
+        
+        if watcher is not None:
+            watcher.run(lambda contexts: Cli.report(contexts, args.snippets), args.interval)
+        
+        return 1 if error_count > 0 else 0
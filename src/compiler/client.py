@@ -0,0 +1,119 @@
+from typing import Any, Dict, Optional
+from pathlib import Path
+
+import tempfile
+import socket
+import json
+import stat
+import os
+
+
+class Client:
+    """
+    Thin client of the compilation server (clua serve), the requests and the responses
+    are JSON objects, one per line, sent over a Unix domain socket.
+    """
+    
+    @staticmethod
+    def get_default_socket_path() -> Path:
+        """
+        Returns the default socket path of the compilation server (one server per user),
+        inside $XDG_RUNTIME_DIR, or inside a private directory of the temporary directory
+        (created by the server).
+        """
+        
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        
+        if runtime_dir:
+            return Path(runtime_dir) / "clua.sock"
+        
+        return Path(tempfile.gettempdir()) / f"clua-{os.getuid()}" / "clua.sock"
+    
+    
+    @staticmethod
+    def check_socket(socket_path: Path):
+        """
+        Checks that a path is a socket owned by the current user before trusting it
+        (another user can create it first in a shared directory).
+        
+        Args:
+            socket_path (Path): The path of the server socket.
+        
+        Raises:
+            OSError: If the socket doesn't exist or isn't a socket,
+                PermissionError if it belongs to another user.
+        """
+        
+        socket_stat = os.lstat(socket_path)
+        
+        if not stat.S_ISSOCK(socket_stat.st_mode):
+            raise ConnectionRefusedError(f"{socket_path} is not a socket.")
+        
+        if socket_stat.st_uid != os.getuid():
+            raise PermissionError(f"{socket_path} belongs to another user.")
+    
+    
+    @staticmethod
+    def request(socket_path: Path, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Sends a request to the compilation server and waits for its response.
+        
+        Args:
+            socket_path (Path): The path of the server socket.
+            request (Dict[str, Any]): The request ("command" key and its arguments).
+            timeout (float, optional): The maximum waiting time in seconds (None waits forever).
+        
+        Raises:
+            OSError: If the server cannot be reached or closes the connection,
+                PermissionError if the socket belongs to another user.
+        
+        Returns:
+            Dict[str, Any]: The response ("status" key, "ok" or "error").
+        """
+        
+        Client.check_socket(socket_path)
+        
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+            client_socket.settimeout(timeout)
+            client_socket.connect(str(socket_path))
+            client_socket.sendall(json.dumps(request).encode() + b"\n")
+            
+            with client_socket.makefile("rb") as response_file:
+                response_line = response_file.readline()
+        
+        if not response_line:
+            raise ConnectionError("The compilation server closed the connection.")
+        
+        return json.loads(response_line)
+    
+    
+    @staticmethod
+    def compile(
+        socket_path: Path,
+        project_dir_path: Path,
+        use_cache: bool = True,
+        emit: bool = False,
+        snippets: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Compiles a project through the compilation server.
+        
+        Args:
+            socket_path (Path): The path of the server socket.
+            project_dir_path (Path): The absolute path of the project directory.
+            use_cache (bool, optional): Uses the on-disk compile cache of the project.
+            emit (bool, optional): Writes the Lua output of every clua file beside it.
+            snippets (bool, optional): Adds the source line under every diagnostic.
+        
+        Returns:
+            Dict[str, Any]: The response, "output" holds the reported diagnostics
+                and "exitCode" the exit code of the compilation.
+        """
+        
+        return Client.request(socket_path, {
+            "command": "compile",
+            "project": str(project_dir_path),
+            "cache": use_cache,
+            "emit": emit,
+            "snippets": snippets
+        })
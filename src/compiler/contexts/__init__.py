@@ -1,4 +1,10 @@
 # type: ignore
-from .cache import Cache
 from .types import Types
+from .symbols import SymbolTable
+from .stream import TokenStream
+from .prescan import Prescan
+from .tree import SyntaxTree, SyntaxNode
+from .file import FileContext
+from .project import ProjectContext
+from .cache import Cache
 from .register import Register
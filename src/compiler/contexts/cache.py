@@ -1,4 +1,5 @@
-from . import Types
+from . import ProjectContext
+from ..utilities import Timings
 
 from typing import Dict, Any, List, Optional
 from pathlib import Path
@@ -9,6 +10,7 @@ class Cache:
         """Compiler internal global cached variables."""
         
         # Globally stored compiler tree (List[Path])
+        # Only contains the database files (fixed paths inside the compiler package)
         compiler_tree: Optional[List[Path]] = None
         
         # Data loaded from the compiler database directory
@@ -19,18 +21,10 @@ class Cache:
             "system.yaml": None
         }
         
-        compiler_tokens: List[Types] = []
+        # Phase timings and counters of the compilation (--timings), disabled by default
+        timings: Timings = Timings(enabled=False)
 
 
-    class Project:
-        """User project global cached variables."""
-        
-        # Globally stored user project tree (List[Path])
-        project_tree: Optional[List[Path]] = None
-        
-        # Contains a list of all the clua file paths (sorted by directory depth)
-        clua_trace: Optional[List[Path]] = []
-        
-        # Config file dicts loaded from the user project directory
-        loaded_config_dicts: Optional[Dict[Path, Any]] = {}
-        
\ No newline at end of file
+    # State of the project compiled by the command line
+    # (the compilation server keeps one context per resident project)
+    Project: ProjectContext = ProjectContext()
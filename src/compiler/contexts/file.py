@@ -0,0 +1,56 @@
+from . import TokenStream, SyntaxTree
+
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+from pathlib import Path
+
+if TYPE_CHECKING:
+    from ..utilities import LineIndex, SourceMap
+    from ..utilities.timings import TimingEvent
+
+
+class FileContext:
+    """
+    Compilation context of a single clua file, unlike the Register (global),
+    a context is created per file so multiple files can be compiled at the same time.
+    """
+    
+    def __init__(self, cf_path: Path):
+        # Path of the compiled clua file
+        self.cf_path: Path = cf_path
+        
+        # Token stream of the file (None if the file cannot be opened)
+        self.tokens: Optional[TokenStream] = None
+        
+        # Symbol texts of the file-local interning table (the token symbol ids refer to it),
+        # None once the symbols are merged into the project table (ProjectContext.symbol_table)
+        self.symbol_names: Optional[List[bytes]] = None
+        
+        # Syntax tree of the file (node arena, spans point into the token stream)
+        self.syntax_tree: Optional[SyntaxTree] = None
+        
+        # Line-start offsets of the file
+        self.line_index: Optional["LineIndex"] = None
+        
+        # Diagnostics found while compiling the file, stored as (code, offset, args)
+        self.diagnostics: List[Tuple[str, int, Tuple[Any, ...]]] = []
+        
+        # False if the file cannot be opened
+        self.loaded: bool = False
+        
+        # True if the context has been loaded from the disk cache
+        self.cached: bool = False
+        
+        # Path of the emitted Lua file (None if the file has only been checked)
+        self.output_path: Optional[Path] = None
+        
+        # Path of the source map of the Lua file (None if compilerOptions.sourceMap is disabled)
+        self.source_map_path: Optional[Path] = None
+        
+        # Lua output of the file and its source map, only kept until the context is stored
+        # into the disk cache (a cache hit writes them without scanning the file)
+        self.emitted_output: Optional[bytes] = None
+        self.emitted_source_map: Optional["SourceMap"] = None
+        
+        # Phase timings recorded while compiling the file (merged into Cache.Compiler.timings),
+        # never stored into the disk cache
+        self.timing_events: List["TimingEvent"] = []
@@ -0,0 +1,53 @@
+from ..utilities import LineIndex
+
+from typing import Optional, Tuple
+from bisect import bisect_right
+from array import array
+
+
+class Prescan:
+    """
+    Layout of a source buffer found before the tokenization (Scanner.prescan()):
+    the line index, the comment spans and the string literal spans.
+    
+    Note:
+        The spans are stored as parallel start/end arrays sorted by offset,
+        they never overlap (a comment inside a string is part of the string).
+    """
+    
+    def __init__(self, line_index: LineIndex):
+        # Size of the prescanned buffer in bytes
+        self.size: int = line_index.size
+        
+        # Line-start offsets of the buffer
+        self.line_index: LineIndex = line_index
+        
+        # Spans of the line and long comments (unfinished ones end with the buffer)
+        self.comment_starts: "array[int]" = array("q")
+        self.comment_ends: "array[int]" = array("q")
+        
+        # Spans of the short and long string literals (unfinished ones included)
+        self.string_starts: "array[int]" = array("q")
+        self.string_ends: "array[int]" = array("q")
+    
+    
+    def comment_at(self, offset: int) -> Optional[Tuple[int, int]]:
+        """Returns the span of the comment containing an offset, or None in O(log n)."""
+        
+        index = bisect_right(self.comment_starts, offset) - 1
+        
+        if index >= 0 and offset < self.comment_ends[index]:
+            return self.comment_starts[index], self.comment_ends[index]
+        
+        return None
+    
+    
+    def string_at(self, offset: int) -> Optional[Tuple[int, int]]:
+        """Returns the span of the string literal containing an offset, or None in O(log n)."""
+        
+        index = bisect_right(self.string_starts, offset) - 1
+        
+        if index >= 0 and offset < self.string_ends[index]:
+            return self.string_starts[index], self.string_ends[index]
+        
+        return None
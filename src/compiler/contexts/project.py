@@ -0,0 +1,92 @@
+from . import TokenStream, SymbolTable
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from pathlib import Path
+from array import array
+
+if TYPE_CHECKING:
+    from ..resolver import ConfigResolver
+    from ..graph import ImportGraph
+
+
+# The symbol table is never rebuilt below this size (small projects)
+MIN_TRIMMED_SYMBOL_COUNT = 4096
+
+
+class ProjectContext:
+    """
+    State of a loaded user project (project tree, configs, build trace and interned tokens),
+    the command line compiles a single project (Cache.Project), the compilation server
+    keeps one context per resident project, so the projects are compiled independently.
+    """
+    
+    def __init__(self):
+        # User project tree (List[Path])
+        # Only contains the directories, the clua files and the config files
+        self.project_tree: Optional[List[Path]] = None
+        
+        # Name patterns (fnmatch) of the files/directories excluded from the project tree
+        self.excluded_patterns: List[str] = []
+        
+        # Contains a list of all the clua file paths (build order of the import graph)
+        self.clua_trace: Optional[List[Path]] = []
+        
+        # Dependency graph of the clua files (require calls)
+        self.import_graph: Optional["ImportGraph"] = None
+        
+        # Config file dicts loaded from the user project directory
+        # (loaded on demand by the config resolver, ConfigResolver.loaded_config_dicts)
+        self.loaded_config_dicts: Optional[Dict[Path, Any]] = {}
+        
+        # Resolves the effective config of the project directories (lazy, memoized)
+        self.config_resolver: Optional["ConfigResolver"] = None
+        
+        # Token streams of the scanned clua files (keys are the clua file paths)
+        self.compiler_tokens: Dict[Path, TokenStream] = {}
+        
+        # Project-wide interning table of the identifiers and string literals,
+        # shared by all the token streams (TokenStream.symbols)
+        self.symbol_table: SymbolTable = SymbolTable()
+        
+        # Size of the symbol table after its last rebuild (trim_symbols())
+        self.trimmed_symbol_count: int = MIN_TRIMMED_SYMBOL_COUNT
+    
+    
+    def trim_symbols(self) -> bool:
+        """
+        Rebuilds the symbol table from the token streams of the project once it has doubled
+        since its last rebuild, the symbols of the removed and edited files are dropped.
+        
+        Note:
+            The table is only rebuilt when it has doubled, so the cost of the rebuilds
+            is amortized over the interned symbols.
+        
+        Returns:
+            bool: True if the symbol table has been rebuilt.
+        """
+        
+        if len(self.symbol_table) < 2 * self.trimmed_symbol_count:
+            return False
+        
+        used_ids = set()
+        
+        for tokens in self.compiler_tokens.values():
+            if tokens.symbols is not None:
+                used_ids.update(tokens.symbols)
+        
+        symbol_table = SymbolTable()
+        names = self.symbol_table.names
+        
+        # Unused ids are never read (0 is the id of the tokens without symbol)
+        remapping = array("I", [0]) * len(names)
+        
+        for symbol_id in sorted(used_ids):
+            remapping[symbol_id] = symbol_table.intern(names[symbol_id])
+        
+        for tokens in self.compiler_tokens.values():
+            tokens.remap_symbols(remapping)
+        
+        self.symbol_table = symbol_table
+        self.trimmed_symbol_count = max(len(symbol_table), MIN_TRIMMED_SYMBOL_COUNT)
+        
+        return True
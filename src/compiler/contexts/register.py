@@ -1,23 +1,31 @@
-from typing import Optional, TextIO, MutableSequence
+from typing import TYPE_CHECKING, Optional, MutableSequence
 from array import array
 
+if TYPE_CHECKING:
+    from ..utilities import SourceBuffer, LineIndex, SourceCursor
+
 
 class Register:
     """Used as a context/storage for instructions between the scanner and the parser."""
     
-    # Currently opened clua file object
-    cf_object: Optional[TextIO] = None
+    # Currently opened clua file buffer (memory mapped)
+    cf_object: Optional["SourceBuffer"] = None
       
-    # Register virtual pointer (needs to be updated by the real pointer position).
-    cf_virtual_pointer_pos: int = 0
+    # Main cursor over the clua file buffer
+    cf_cursor: Optional["SourceCursor"] = None
     
     # Contains the length of every read line
     # It is used after the first reading of the file
     # if the parser ask for a re-scanning of certain lines
     cf_line_lengths: MutableSequence[int] = array("i")
     
+    # Line-start offsets of the whole file (built once when the file is opened),
+    # used for O(1) line seeking and offset to line/column conversions
+    cf_line_index: Optional["LineIndex"] = None
+    
     # -1 removes the first iteration supplement (0-Indexing)
     cf_line_number: int = -1  
     
-    # Stores the currently processed line
-    cf_line: str = ""
+    # Stores the span (start/end byte offsets) of the currently processed line
+    cf_line_start: int = 0
+    cf_line_end: int = 0
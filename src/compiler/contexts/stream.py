@@ -0,0 +1,150 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+from array import array
+
+if TYPE_CHECKING:
+    from ..utilities import SourceBuffer
+
+
+class TokenStream:
+    """
+    Compact storage of the scanner tokens (struct of arrays),
+    a token is only an index shared by the parallel kind/offset/length arrays.
+    
+    Note:
+        The token text is never stored, it is materialized on demand from the source buffer.
+    """
+    
+    def __init__(
+        self,
+        buffer: Optional["SourceBuffer"] = None,
+        kinds: Optional["array[int]"] = None,
+        offsets: Optional["array[int]"] = None,
+        lengths: Optional["array[int]"] = None,
+        symbols: Optional["array[int]"] = None
+    ):
+        # Source buffer of the tokens (used to materialize the token text)
+        self.buffer: Optional["SourceBuffer"] = buffer
+        
+        # Token kind ids (Types.Tokens values)
+        self.kinds: "array[int]" = kinds if kinds is not None else array("H")
+        
+        # Token start offsets inside the source buffer
+        self.offsets: "array[int]" = offsets if offsets is not None else array("I")
+        
+        # Token lengths in bytes
+        self.lengths: "array[int]" = lengths if lengths is not None else array("I")
+        
+        # Symbol ids of the identifiers and string literals (0 for the other tokens),
+        # None until the stream is interned (Scanner.intern_symbols())
+        self.symbols: Optional["array[int]"] = symbols
+    
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """The source buffer is not serialized (memory maps can't be pickled)."""
+        
+        state = self.__dict__.copy()
+        state["buffer"] = None
+        return state
+    
+    
+    def __len__(self) -> int:
+        return len(self.kinds)
+    
+    
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return zip(self.kinds, self.offsets, self.lengths)
+    
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[int, int, int], "TokenStream"]:
+        """
+        Returns a token as a (kind, offset, length) tuple,
+        or a new stream sharing the same buffer if the index is a slice.
+        """
+        
+        if isinstance(index, slice):
+            return TokenStream(
+                self.buffer,
+                self.kinds[index],
+                self.offsets[index],
+                self.lengths[index],
+                self.symbols[index] if self.symbols is not None else None
+            )
+        
+        return self.kinds[index], self.offsets[index], self.lengths[index]
+    
+    
+    def append(self, kind: int, offset: int, length: int):
+        """Appends a token at the end of the stream."""
+        
+        self.kinds.append(kind)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+    
+    
+    def extend(self, tokens: Iterable[Tuple[int, int, int]]):
+        """Appends compact tokens (Scanner.tokenize() output) at the end of the stream."""
+        
+        append_kind = self.kinds.append
+        append_offset = self.offsets.append
+        append_length = self.lengths.append
+        
+        for kind, offset, length in tokens:
+            append_kind(kind)
+            append_offset(offset)
+            append_length(length)
+    
+    
+    def kind(self, index: int) -> int:
+        """Returns the kind id of a token (Types.Tokens value)."""
+        
+        return self.kinds[index]
+    
+    
+    def span(self, index: int) -> Tuple[int, int]:
+        """Returns the start/end offsets of a token."""
+        
+        offset = self.offsets[index]
+        return offset, offset + self.lengths[index]
+    
+    
+    def symbol(self, index: int) -> int:
+        """Returns the symbol id of a token (0 if the token has no symbol)."""
+        
+        return self.symbols[index] if self.symbols is not None else 0
+    
+    
+    def remap_symbols(self, remapping: "array[int]"):
+        """Translates the symbol ids of the stream (SymbolTable.merge() remapping)."""
+        
+        if self.symbols is not None:
+            self.symbols = array("I", map(remapping.__getitem__, self.symbols))
+    
+    
+    def raw(self, index: int) -> bytes:
+        """Materializes the raw bytes of a token from the source buffer."""
+        
+        offset = self.offsets[index]
+        return self.buffer.slice(offset, offset + self.lengths[index])
+    
+    
+    def text(self, index: int) -> str:
+        """Materializes the decoded text of a token from the source buffer."""
+        
+        offset = self.offsets[index]
+        return self.buffer.text(offset, offset + self.lengths[index])
+    
+    
+    def lookahead(self, index: int, count: int) -> "array[int]":
+        """Returns the kinds of the next tokens (parser lookahead), starting at index."""
+        
+        return self.kinds[index:index + count]
+    
+    
+    def memory_size(self) -> int:
+        """Returns the size of the token arrays in bytes."""
+        
+        return sum(
+            values.itemsize * len(values)
+            for values in (self.kinds, self.offsets, self.lengths, self.symbols)
+            if values is not None
+        )
@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, List, Optional
+from array import array
+
+
+class SymbolTable:
+    """
+    Interning table of the identifiers and the string literals, every distinct text
+    is stored once and mapped to a small integer id, so the symbols are compared
+    as integers by the binder/type checker.
+    
+    Note:
+        The id 0 is reserved for the tokens without symbol.
+        The tables of the worker processes are merged into the project table
+        (ProjectContext.symbol_table) with merge(), which returns the id remapping.
+    """
+    
+    def __init__(self):
+        # Raw text (bytes) of every symbol, indexed by symbol id
+        self.names: List[bytes] = [b""]
+        
+        # Symbol ids indexed by their raw text
+        self.ids: Dict[bytes, int] = {b"": 0}
+    
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    
+    def __contains__(self, raw: bytes) -> bool:
+        return raw in self.ids
+    
+    
+    def intern(self, raw: bytes) -> int:
+        """Returns the symbol id of a raw text (a new id is allocated for unknown texts)."""
+        
+        symbol_id = self.ids.get(raw)
+        
+        if symbol_id is None:
+            symbol_id = self.ids[raw] = len(self.names)
+            self.names.append(raw)
+        
+        return symbol_id
+    
+    
+    def lookup(self, raw: bytes) -> Optional[int]:
+        """Returns the symbol id of a raw text, or None if it has never been interned."""
+        
+        return self.ids.get(raw)
+    
+    
+    def raw(self, symbol_id: int) -> bytes:
+        """Returns the raw text of a symbol."""
+        
+        return self.names[symbol_id]
+    
+    
+    def text(self, symbol_id: int) -> str:
+        """Returns the decoded text of a symbol."""
+        
+        return self.names[symbol_id].decode("utf-8", "replace")
+    
+    
+    def merge(self, names: Iterable[bytes]) -> "array[int]":
+        """
+        Interns the symbols of another table (SymbolTable.names of a worker).
+        
+        Args:
+            names (Iterable[bytes]): The symbol texts of the other table, indexed by their ids.
+        
+        Returns:
+            array[int]: The id remapping, the index is the id inside the other table
+                and the value is the id inside this table.
+        """
+        
+        intern = self.intern
+        return array("I", [intern(raw) for raw in names])
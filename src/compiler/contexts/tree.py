@@ -0,0 +1,280 @@
+from . import Types, TokenStream
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from array import array
+
+
+class SyntaxNode:
+    """
+    Lightweight view over a node of a syntax tree (created on demand, never stored),
+    only the tree and the node index are kept.
+    """
+    
+    __slots__ = ("tree", "index")
+    
+    def __init__(self, tree: "SyntaxTree", index: int):
+        self.tree: "SyntaxTree" = tree
+        self.index: int = index
+    
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SyntaxNode) and other.tree is self.tree and other.index == self.index
+    
+    
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+    
+    
+    def __repr__(self) -> str:
+        return f"SyntaxNode({self.tree.kind_name(self.index)}, {self.index})"
+    
+    
+    @property
+    def kind(self) -> int:
+        return self.tree.kinds[self.index]
+    
+    
+    @property
+    def parent(self) -> Optional["SyntaxNode"]:
+        parent_index = self.tree.parents[self.index]
+        return SyntaxNode(self.tree, parent_index) if parent_index >= 0 else None
+    
+    
+    @property
+    def children(self) -> List["SyntaxNode"]:
+        return [SyntaxNode(self.tree, index) for index in self.tree.children(self.index)]
+    
+    
+    def text(self) -> str:
+        return self.tree.text(self.index)
+
+
+class SyntaxTree:
+    """
+    Syntax tree of a clua file stored as a node arena (struct of arrays),
+    a node is only an index shared by the parallel arrays, its children are linked
+    through the first child/next sibling indices.
+    
+    Note:
+        The nodes are allocated bottom-up (children before their parent), so the root node
+        is the last one. The source spans are token indices inside the token stream,
+        the node text is materialized on demand from the source buffer.
+    """
+    
+    def __init__(self, tokens: Optional[TokenStream] = None):
+        # Token stream of the parsed file (node spans point into it)
+        self.tokens: Optional[TokenStream] = tokens
+        
+        # Node kind ids (Types.Nodes values)
+        self.kinds: "array[int]" = array("H")
+        
+        # First/last token indices of the nodes (inclusive, last < first for empty nodes)
+        self.first_tokens: "array[int]" = array("i")
+        self.last_tokens: "array[int]" = array("i")
+        
+        # Node links (-1 if none)
+        self.parents: "array[int]" = array("i")
+        self.first_children: "array[int]" = array("i")
+        self.next_siblings: "array[int]" = array("i")
+        
+        # Node specific value, the operator token kind of the operations (-1 if none)
+        self.values: "array[int]" = array("i")
+        
+        # Index of the root node (-1 if the tree is empty)
+        self.root: int = -1
+    
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """The token stream is stored by the file context, it is not serialized twice."""
+        
+        state = self.__dict__.copy()
+        state["tokens"] = None
+        return state
+    
+    
+    def __len__(self) -> int:
+        return len(self.kinds)
+    
+    
+    def add_node(
+        self,
+        kind: int,
+        first_token: int,
+        last_token: int,
+        children: Tuple[int, ...] = (),
+        value: int = -1
+    ) -> int:
+        """
+        Allocates a node and links its children (already allocated nodes).
+        
+        Args:
+            kind (int): The node kind id (Types.Nodes value).
+            first_token (int): The index of the first token of the node.
+            last_token (int): The index of the last token of the node.
+            children (Tuple[int, ...], optional): The child node indices (source order),
+                negative indices (missing optional children) are skipped.
+            value (int, optional): The node specific value.
+        
+        Returns:
+            int: The index of the new node.
+        """
+        
+        index = len(self.kinds)
+        
+        self.kinds.append(kind)
+        self.first_tokens.append(first_token)
+        self.last_tokens.append(last_token)
+        self.parents.append(-1)
+        self.first_children.append(-1)
+        self.next_siblings.append(-1)
+        self.values.append(value)
+        
+        previous_child = -1
+        
+        for child in children:
+            if child < 0:
+                continue
+            
+            self.parents[child] = index
+            
+            if previous_child < 0:
+                self.first_children[index] = child
+            else:
+                self.next_siblings[previous_child] = child
+            
+            previous_child = child
+        
+        return index
+    
+    
+    def truncate(self, node_count: int):
+        """
+        Discards the nodes allocated after the first node_count ones (failed statement),
+        the links of the kept nodes to the discarded ones are removed.
+        
+        Note:
+            Kept nodes are never parents of discarded ones (bottom-up allocation), only
+            the children of the discarded nodes are repaired, in O(discarded nodes).
+        """
+        
+        for index in range(node_count, len(self.kinds)):
+            child = self.first_children[index]
+            
+            while child >= 0:
+                next_sibling = self.next_siblings[child]
+                
+                if child < node_count:
+                    self.parents[child] = -1
+                    self.next_siblings[child] = -1
+                
+                child = next_sibling
+        
+        for values in (
+            self.kinds,
+            self.first_tokens,
+            self.last_tokens,
+            self.parents,
+            self.first_children,
+            self.next_siblings,
+            self.values
+        ):
+            del values[node_count:]
+    
+    
+    def children(self, index: int) -> Iterator[int]:
+        """Yields the child node indices of a node (source order)."""
+        
+        child = self.first_children[index]
+        
+        while child >= 0:
+            yield child
+            child = self.next_siblings[child]
+    
+    
+    def walk(self, index: Optional[int] = None) -> Iterator[int]:
+        """Yields the node indices of a subtree in pre-order (defaults to the whole tree)."""
+        
+        if index is None:
+            index = self.root
+        
+        if index < 0:
+            return
+        
+        pending_indices: List[int] = [index]
+        
+        while len(pending_indices) > 0:
+            index = pending_indices.pop()
+            yield index
+            
+            # Reversed, so the first child is popped first
+            pending_indices.extend(reversed(list(self.children(index))))
+    
+    
+    def node(self, index: int) -> SyntaxNode:
+        """Returns a view over a node."""
+        
+        return SyntaxNode(self, index)
+    
+    
+    def kind_name(self, index: int) -> str:
+        """Returns the name of the kind of a node."""
+        
+        return Types.Nodes(self.kinds[index]).name
+    
+    
+    def span(self, index: int) -> Tuple[int, int]:
+        """Returns the start/end byte offsets of a node (through its tokens)."""
+        
+        first_token = self.first_tokens[index]
+        last_token = self.last_tokens[index]
+        
+        if last_token < first_token:
+            offset = self.tokens.offsets[first_token] if first_token < len(self.tokens) else 0
+            return offset, offset
+        
+        end = self.tokens.offsets[last_token] + self.tokens.lengths[last_token]
+        return self.tokens.offsets[first_token], end
+    
+    
+    def text(self, index: int) -> str:
+        """Materializes the source text of a node from the source buffer."""
+        
+        start, end = self.span(index)
+        return self.tokens.buffer.text(start, end)
+    
+    
+    def dump(self, index: Optional[int] = None) -> str:
+        """Returns an indented representation of a subtree (debugging)."""
+        
+        if index is None:
+            index = self.root
+        
+        lines: List[str] = []
+        pending_nodes: List[Tuple[int, int]] = [(index, 0)]
+        
+        while len(pending_nodes) > 0:
+            index, depth = pending_nodes.pop()
+            first_token = self.first_tokens[index]
+            last_token = self.last_tokens[index]
+            
+            lines.append(f"{'  ' * depth}{self.kind_name(index)} [{first_token}:{last_token}]")
+            pending_nodes.extend((child, depth + 1) for child in reversed(list(self.children(index))))
+        
+        return "\n".join(lines)
+    
+    
+    def memory_size(self) -> int:
+        """Returns the size of the node arrays in bytes."""
+        
+        return sum(
+            values.itemsize * len(values)
+            for values in (
+                self.kinds,
+                self.first_tokens,
+                self.last_tokens,
+                self.parents,
+                self.first_children,
+                self.next_siblings,
+                self.values
+            )
+        )
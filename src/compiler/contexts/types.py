@@ -1,7 +1,139 @@
-from enum import Enum
+from enum import IntEnum
 
 
 class Types:
-    class Tokens(Enum):
-        pass
-    
\ No newline at end of file
+    class Tokens(IntEnum):
+        """Token kinds produced by the scanner (the values are stored as compact kind ids)."""
+        
+        # Special tokens
+        EOF = 0
+        INVALID_CHARACTER = 1
+        UNFINISHED_STRING = 2
+        UNFINISHED_LONG_STRING = 3
+        UNFINISHED_LONG_COMMENT = 4
+        
+        # Literals & identifiers
+        NAME = 10
+        NUMBER = 11
+        STRING = 12
+        LONG_STRING = 13
+        COMMENT = 14
+        LONG_COMMENT = 15
+        
+        # Keywords
+        AND = 20
+        BREAK = 21
+        DO = 22
+        ELSE = 23
+        ELSEIF = 24
+        END = 25
+        FALSE = 26
+        FOR = 27
+        FUNCTION = 28
+        GOTO = 29
+        IF = 30
+        IN = 31
+        LOCAL = 32
+        NIL = 33
+        NOT = 34
+        OR = 35
+        REPEAT = 36
+        RETURN = 37
+        THEN = 38
+        TRUE = 39
+        UNTIL = 40
+        WHILE = 41
+        
+        # Operators & punctuation
+        PLUS = 50
+        MINUS = 51
+        STAR = 52
+        DOUBLE_SLASH = 53
+        SLASH = 54
+        PERCENT = 55
+        CARET = 56
+        HASH = 57
+        AMPERSAND = 58
+        NOT_EQUAL = 59
+        TILDE = 60
+        PIPE = 61
+        SHIFT_LEFT = 62
+        SHIFT_RIGHT = 63
+        LESS_EQUAL = 64
+        GREATER_EQUAL = 65
+        LESS = 66
+        GREATER = 67
+        EQUAL = 68
+        ASSIGN = 69
+        LEFT_PAREN = 70
+        RIGHT_PAREN = 71
+        LEFT_BRACE = 72
+        RIGHT_BRACE = 73
+        LEFT_BRACKET = 74
+        RIGHT_BRACKET = 75
+        DOUBLE_COLON = 76
+        COLON = 77
+        SEMICOLON = 78
+        COMMA = 79
+        ELLIPSIS = 80
+        CONCAT = 81
+        DOT = 82
+    
+    
+    class Nodes(IntEnum):
+        """Syntax tree node kinds (the values are stored as compact kind ids)."""
+        
+        # Structure
+        CHUNK = 0
+        BLOCK = 1
+        ERROR = 2
+        
+        # Statements
+        EMPTY_STATEMENT = 10
+        LOCAL_STATEMENT = 11
+        LOCAL_FUNCTION = 12
+        FUNCTION_STATEMENT = 13
+        ASSIGNMENT = 14
+        CALL_STATEMENT = 15
+        IF_STATEMENT = 16
+        ELSEIF_CLAUSE = 17
+        ELSE_CLAUSE = 18
+        WHILE_STATEMENT = 19
+        NUMERIC_FOR = 20
+        GENERIC_FOR = 21
+        REPEAT_STATEMENT = 22
+        DO_STATEMENT = 23
+        RETURN_STATEMENT = 24
+        BREAK_STATEMENT = 25
+        GOTO_STATEMENT = 26
+        LABEL = 27
+        
+        # Statement parts
+        DECLARATION = 40
+        TYPE_ANNOTATION = 41
+        ATTRIBUTE = 42
+        FUNCTION_NAME = 43
+        PARAMETERS = 44
+        VARIABLE_LIST = 45
+        EXPRESSION_LIST = 46
+        
+        # Expressions
+        NIL = 60
+        TRUE = 61
+        FALSE = 62
+        NUMBER = 63
+        STRING = 64
+        VARARG = 65
+        FUNCTION_EXPRESSION = 66
+        TABLE = 67
+        POSITIONAL_FIELD = 68
+        NAMED_FIELD = 69
+        INDEXED_FIELD = 70
+        BINARY_OPERATION = 71
+        UNARY_OPERATION = 72
+        PARENTHESIZED = 73
+        IDENTIFIER = 74
+        INDEX = 75
+        FIELD = 76
+        CALL = 77
+        METHOD_CALL = 78
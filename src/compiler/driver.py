@@ -0,0 +1,463 @@
+from compiler import Cache, SourceBuffer, LineIndex, DiskCache, Timings, OutputFile, SourceMap, Scanner, Parser, Emitter
+from compiler.contexts import FileContext, ProjectContext, SymbolTable
+
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Tuple
+from contextlib import nullcontext
+from itertools import repeat
+from pathlib import Path
+
+import threading
+import hashlib
+import json
+import os
+import io
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+class Driver:
+    """Compiles the clua files of the project trace, file by file or in parallel."""
+    
+    # Block buffers of the outputs, one per thread (allocated by the first emitted file of the thread,
+    # the compilations of a thread pool never share one)
+    output_buffers: threading.local = threading.local()
+    
+    
+    @staticmethod
+    def get_config_hash(cf_path: Path, project: Optional[ProjectContext] = None) -> str:
+        """
+        Returns the hash of the effective config of a clua file
+        (config resolver of the project, compiler default config if no project is loaded).
+        
+        Args:
+            cf_path (Path): The path of the clua file.
+            project (ProjectContext, optional): The project of the file (defaults to Cache.Project).
+        
+        Returns:
+            str: The hexadecimal hash of the config.
+        """
+        
+        config_resolver = (project if project is not None else Cache.Project).config_resolver
+        
+        if config_resolver is not None:
+            return config_resolver.get_config_hash(cf_path.parent)
+        
+        serialized_config = json.dumps(
+            Cache.Compiler.compiler_database.get("clua.config.yaml"),
+            sort_keys=True,
+            default=str
+        )
+        
+        return hashlib.sha256(serialized_config.encode()).hexdigest()
+    
+    
+    @staticmethod
+    def get_compiler_options(cf_path: Path, project: Optional[ProjectContext] = None) -> Dict[str, Any]:
+        """Returns the "compilerOptions" of the effective config of a clua file (project defaults to Cache.Project)."""
+        
+        config_resolver = (project if project is not None else Cache.Project).config_resolver
+        
+        if config_resolver is not None:
+            config = config_resolver.resolve_file(cf_path)
+        else:
+            config = Cache.Compiler.compiler_database.get("clua.config.yaml") or {}
+        
+        return config.get("compilerOptions") or {}
+    
+    
+    @staticmethod
+    def emit_file(
+        context: FileContext,
+        cf_buffer: SourceBuffer,
+        remove_comments: bool = False,
+        source_map: bool = False,
+        keep_output: bool = False
+    ) -> bool:
+        """
+        Writes the Lua output of a clua file beside it (same name, ".lua" suffix),
+        without the type annotations.
+        
+        Note:
+            The output already held by a cached context (FileContext.emitted_output)
+            is written as is, the file is neither scanned nor parsed. A context without
+            syntax tree is parsed while its output is written (Parser.iter_statements()),
+            no syntax tree of the whole file is built.
+        
+        Args:
+            context (FileContext): The compilation context of the file.
+            cf_buffer (SourceBuffer): The opened source buffer of the file.
+            remove_comments (bool, optional): Skips the comments (compilerOptions.removeComments).
+            source_map (bool, optional): Writes the source map of the output beside it
+                (".lua.map" suffix, compilerOptions.sourceMap).
+            keep_output (bool, optional): Keeps the output and its source map in the context
+                (stored with it into the disk cache).
+        
+        Returns:
+            bool: True if the output has been written, False if it was already up to date
+                (the existing file keeps its modification time).
+        """
+        
+        output_path = context.cf_path.with_suffix(".lua")
+        emitted_source_map = context.emitted_source_map
+        
+        # Every output of the thread reuses the block buffer of the first one
+        output_file = OutputFile(output_path, getattr(Driver.output_buffers, "block_buffer", None))
+        Driver.output_buffers.block_buffer = output_file.block_buffer
+        
+        with output_file:
+            if context.emitted_output is not None and (emitted_source_map is not None or not source_map):
+                output_file.write(context.emitted_output)
+            else:
+                source_map_builder: Optional[SourceMap.Builder] = None
+                
+                if source_map:
+                    # Line starts already known by the context (no rescanning)
+                    source_map_builder = SourceMap.Builder(
+                        context.line_index or LineIndex.from_buffer(cf_buffer.data),
+                        output_path.name,
+                        context.cf_path.name
+                    )
+                
+                # Emitted in memory first when the output is kept
+                emit_target: BinaryIO = io.BytesIO() if keep_output else output_file
+                
+                # The type annotations (and the comments) are located by the syntax tree,
+                # cached contexts included (their token offsets are kept)
+                if context.syntax_tree is not None:
+                    Emitter.emit_tree(context.syntax_tree, cf_buffer, emit_target, remove_comments, source_map_builder)
+                else:
+                    # Parsed and written one top-level statement at a time,
+                    # the nodes of a statement are released once it is written
+                    parser = Parser(context.tokens)
+                    
+                    Emitter.emit_statements(
+                        parser.iter_statements(),
+                        parser.tree,
+                        cf_buffer,
+                        emit_target,
+                        remove_comments,
+                        source_map_builder
+                    )
+                    
+                    if not context.loaded:
+                        context.diagnostics.extend(parser.diagnostics)
+                        context.loaded = True
+                
+                emitted_source_map = source_map_builder.build() if source_map_builder is not None else None
+                
+                if keep_output:
+                    context.emitted_output = emit_target.getvalue()
+                    context.emitted_source_map = emitted_source_map
+                    output_file.write(context.emitted_output)
+        
+        context.output_path = output_path
+        
+        if source_map and emitted_source_map is not None:
+            # Named after the written files (the cached content may come from another path)
+            emitted_source_map.file = output_path.name
+            emitted_source_map.source = context.cf_path.name
+            
+            context.source_map_path = output_path.with_name(f"{output_path.name}.map")
+            emitted_source_map.dump(context.source_map_path, output_file.block_buffer)
+        
+        return output_file.changed
+    
+    
+    @staticmethod
+    def compile_file(
+        cf_path: Path,
+        disk_cache: Optional[DiskCache] = None,
+        config_hash: str = "",
+        emit_options: Optional[Dict[str, Any]] = None,
+        record_timings: bool = False,
+        scan_workers: int = 1,
+        executor: Optional["Executor"] = None
+    ) -> FileContext:
+        """
+        Compiles a single clua file inside its own context (no global state involved),
+        this method is used by the worker processes.
+        
+        Args:
+            cf_path (Path): The path of the clua file.
+            disk_cache (DiskCache, optional): The on-disk cache, unchanged files are not compiled.
+            config_hash (str, optional): The hash of the effective config of the file.
+            emit_options (Dict[str, Any], optional): The compiler options of the file,
+                None only checks the file (no Lua output).
+            record_timings (bool, optional): Records the phase timings of the file
+                (FileContext.timing_events).
+            scan_workers (int, optional): The number of processes tokenizing a large file
+                (Scanner.scan_parallel()), only used when the file is compiled alone.
+            executor (Executor, optional): The process pool tokenizing the chunks of a large file
+                (Scanner.scan_parallel()), None starts new worker processes if needed.
+        
+        Returns:
+            FileContext: The compilation context of the file.
+        """
+        
+        context = FileContext(cf_path)
+        # Worker processes don't share the global recorder, the events travel with the context
+        timings = Timings(record_timings)
+        
+        with timings.span("read", cf_path) as span:
+            cf_buffer: Optional[SourceBuffer] = SourceBuffer.open(cf_path)
+            
+            if cf_buffer is not None:
+                span.count(bytes=cf_buffer.size)
+        
+        if cf_buffer is None:
+            return context
+        
+        with cf_buffer:
+            cache_key: Optional[str] = None
+            
+            if disk_cache is not None:
+                with timings.span("cache", cf_path) as span:
+                    cache_key = disk_cache.make_key(cf_buffer.data, config_hash)
+                    cached_context = disk_cache.load(cache_key)
+                    
+                    span.count(hits=int(isinstance(cached_context, FileContext)))
+                
+                if isinstance(cached_context, FileContext):
+                    cached_context.cf_path = cf_path
+                    cached_context.cached = True
+                    
+                    # The token stream is only serialized once (by the context)
+                    if cached_context.syntax_tree is not None:
+                        cached_context.syntax_tree.tokens = cached_context.tokens
+                    
+                    if emit_options is not None:
+                        # Entry stored by a check only, completed with the output
+                        missing_output = cached_context.emitted_output is None
+                        
+                        with timings.span("emit", cf_path) as span:
+                            written = Driver.emit_file(
+                                cached_context,
+                                cf_buffer,
+                                bool(emit_options.get("removeComments")),
+                                bool(emit_options.get("sourceMap")),
+                                keep_output=True
+                            )
+                            span.count(bytes=cf_buffer.size, written=int(written))
+                        
+                        if missing_output:
+                            with timings.span("cache", cf_path):
+                                disk_cache.store(cache_key, cached_context)
+                    
+                    # The outputs are written, they don't travel with the context
+                    cached_context.emitted_output = None
+                    cached_context.emitted_source_map = None
+                    
+                    cached_context.timing_events = timings.events
+                    return cached_context
+            
+            with timings.span("scan", cf_path) as span:
+                context.line_index = LineIndex.from_buffer(cf_buffer.data)
+                # File-local symbols, merged into the project table by the main process
+                symbol_table = SymbolTable()
+                
+                if scan_workers > 1:
+                    context.tokens = Scanner.scan_parallel(cf_buffer, scan_workers, symbol_table, executor)
+                else:
+                    context.tokens = Scanner.scan(cf_buffer, symbol_table=symbol_table)
+                
+                context.symbol_names = symbol_table.names
+                context.diagnostics = Scanner.collect_diagnostics(context.tokens)
+                
+                span.count(bytes=cf_buffer.size, lines=len(context.line_index), tokens=len(context.tokens))
+            
+            if emit_options is None:
+                with timings.span("parse", cf_path) as span:
+                    parser = Parser(context.tokens)
+                    context.syntax_tree = parser.parse()
+                    context.diagnostics.extend(parser.diagnostics)
+                    context.loaded = True
+                    
+                    span.count(nodes=len(context.syntax_tree), diagnostics=len(parser.diagnostics))
+            else:
+                # Parsed by the emission (streaming pipeline), the span covers both phases
+                with timings.span("emit", cf_path) as span:
+                    written = Driver.emit_file(
+                        context,
+                        cf_buffer,
+                        bool(emit_options.get("removeComments")),
+                        bool(emit_options.get("sourceMap")),
+                        keep_output=cache_key is not None
+                    )
+                    span.count(bytes=cf_buffer.size, written=int(written))
+            
+            # The buffer is closed with the file
+            context.tokens.buffer = None
+        
+        if disk_cache is not None and cache_key is not None:
+            with timings.span("cache", cf_path):
+                disk_cache.store(cache_key, context)
+            
+            # The outputs are written, they don't travel with the context
+            context.emitted_output = None
+            context.emitted_source_map = None
+        
+        # Attached after the store (the timings of a run are never cached)
+        context.timing_events = timings.events
+        return context
+    
+    
+    @staticmethod
+    def compile_trace(
+        clua_trace: List[Path],
+        max_workers: Optional[int] = None,
+        cache_dir_path: Optional[Path] = None,
+        emit: bool = False,
+        waves: Optional[List[List[Path]]] = None,
+        executor: Optional["Executor"] = None,
+        project: Optional[ProjectContext] = None
+    ) -> List[FileContext]:
+        """
+        Compiles all the files of a trace across multiple processes,
+        the contexts are returned in the same order as the trace.
+        
+        Args:
+            clua_trace (List[Path]): The clua file paths (ProjectContext.clua_trace).
+            max_workers (int, optional): The number of worker processes,
+                defaults to the number of CPUs, 1 compiles the files inside the current process.
+            cache_dir_path (Path, optional): The path of the on-disk cache directory
+                (usually "<project>/.clua_cache"), None disables the cache.
+            emit (bool, optional): Writes the Lua output of every file beside it.
+            waves (List[List[Path]], optional): The build waves of the trace
+                (ImportGraph.topological_waves()), a wave starts once the previous one
+                is compiled, defaults to a single wave.
+            executor (Executor, optional): A resident process pool (compilation server),
+                used instead of starting new worker processes.
+            project (ProjectContext, optional): The project of the files (configs, tokens and symbols),
+                defaults to the project of the command line (Cache.Project).
+        
+        Returns:
+            List[FileContext]: The compilation contexts (trace order).
+        """
+        
+        if waves is None:
+            waves = [clua_trace]
+        
+        if project is None:
+            project = Cache.Project
+        
+        disk_cache: Optional[DiskCache] = None
+        config_hashes: Dict[Path, str] = {}
+        emit_options: Dict[Path, Dict[str, Any]] = {}
+        
+        # The configs of the directories are resolved on first use
+        with Cache.Compiler.timings.span("config"):
+            if cache_dir_path is not None:
+                system_data = Cache.Compiler.compiler_database.get("system.yaml") or {}
+                disk_cache = DiskCache(cache_dir_path, str(system_data.get("compilerVersion", "")))
+                config_hashes = {cf_path: Driver.get_config_hash(cf_path, project) for cf_path in clua_trace}
+            
+            if emit:
+                emit_options = {cf_path: Driver.get_compiler_options(cf_path, project) for cf_path in clua_trace}
+        
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        
+        worker_count = min(max_workers, max((len(wave) for wave in waves), default=0))
+        compiled_contexts: Dict[Path, FileContext] = {}
+        record_timings = Cache.Compiler.timings.enabled
+        
+        def compile_alone(cf_path: Path, worker_pool: Optional["Executor"] = None) -> FileContext:
+            """Compiles a file inside the current process, all the workers tokenize its chunks."""
+            
+            return Driver.compile_file(
+                cf_path,
+                disk_cache,
+                config_hashes.get(cf_path, ""),
+                emit_options.get(cf_path),
+                record_timings,
+                max_workers,
+                worker_pool
+            )
+        
+        # Starting processes for a single file costs more than compiling it
+        # (Scanner.scan_parallel() still starts them for a large file)
+        if worker_count <= 1 and executor is None:
+            for wave in waves:
+                for cf_path in wave:
+                    compiled_contexts[cf_path] = compile_alone(cf_path)
+        else:
+            # Imported on demand (multiprocessing is slow to import)
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # The worker processes are shared by all the waves (and by the requests of the server)
+            with nullcontext(executor) if executor is not None else ProcessPoolExecutor(worker_count) as worker_pool:
+                for wave in waves:
+                    # A wave of a single file keeps the workers for the tokenization of the file
+                    if len(wave) == 1:
+                        compiled_contexts[wave[0]] = compile_alone(wave[0], worker_pool)
+                        continue
+                    
+                    # Chunks reduce the inter-process communication on large waves
+                    chunksize = max(1, len(wave) // (worker_count * 4))
+                    
+                    wave_contexts = worker_pool.map(
+                        Driver.compile_file,
+                        wave,
+                        repeat(disk_cache),
+                        [config_hashes.get(cf_path, "") for cf_path in wave],
+                        [emit_options.get(cf_path) for cf_path in wave],
+                        repeat(record_timings),
+                        chunksize=chunksize
+                    )
+                    
+                    # Waits for the whole wave (its dependents are in the next waves)
+                    for context in wave_contexts:
+                        compiled_contexts[context.cf_path] = context
+        
+        contexts = [compiled_contexts[cf_path] for cf_path in clua_trace]
+        
+        for context in contexts:
+            if context.tokens is not None:
+                Driver.merge_symbols(context, project.symbol_table)
+                project.compiler_tokens[context.cf_path] = context.tokens
+            
+            Cache.Compiler.timings.merge(context.timing_events)
+            context.timing_events = []
+        
+        return contexts
+    
+    
+    @staticmethod
+    def merge_symbols(context: FileContext, symbol_table: SymbolTable):
+        """
+        Interns the file-local symbols of a context into the project table
+        (ProjectContext.symbol_table) and translates the symbol ids of its tokens.
+        
+        Args:
+            context (FileContext): The compilation context (worker or disk cache result).
+            symbol_table (SymbolTable): The symbol table of the project.
+        """
+        
+        if context.symbol_names is None:
+            return
+        
+        remapping = symbol_table.merge(context.symbol_names)
+        
+        context.tokens.remap_symbols(remapping)
+        context.symbol_names = None
+    
+    
+    @staticmethod
+    def merge_diagnostics(contexts: List[FileContext]) -> List[Tuple[Path, str, int, Tuple[Any, ...]]]:
+        """
+        Merges the diagnostics of multiple contexts, sorted by trace order then by offset,
+        so the output doesn't depend on the order in which the workers finished.
+        
+        Args:
+            contexts (List[FileContext]): The compilation contexts (trace order).
+        
+        Returns:
+            List[Tuple[Path, str, int, Tuple[Any, ...]]]: The diagnostics as (path, code, offset, args).
+        """
+        
+        return [
+            (context.cf_path, code, offset, args)
+            for context in contexts
+            for code, offset, args in sorted(context.diagnostics, key=lambda i: i[1])
+        ]
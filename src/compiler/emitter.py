@@ -0,0 +1,254 @@
+from compiler import SourceBuffer, SourceMap
+from compiler.contexts import Types, TokenStream, SyntaxTree
+
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+
+Tokens = Types.Tokens
+Nodes = Types.Nodes
+
+# Whitespace bytes, a removed comment glued between two tokens is replaced by a space
+WHITESPACE_BYTES = b" \t\r\n\f\v"
+
+# Span removed from the output (start/end offsets, True if it is a comment)
+RemovedSpan = Tuple[int, int, bool]
+
+
+class Emitter:
+    """
+    Writes the Lua output of the parsed statements, statement by statement.
+    
+    Note:
+        The output is a copy of the source without the type annotations
+        (and without the comments if compilerOptions.removeComments is enabled).
+    """
+    
+    @staticmethod
+    def get_comment_separator(buffer: SourceBuffer, start: int, end: int) -> bytes:
+        """Returns the bytes replacing a removed comment (a space if it separates two tokens)."""
+        
+        if 0 < start and end < buffer.size:
+            if buffer.byte_at(start - 1) not in WHITESPACE_BYTES and buffer.byte_at(end) not in WHITESPACE_BYTES:
+                return b" "
+        
+        return b""
+    
+    
+    @staticmethod
+    def get_removed_spans(
+        tokens: TokenStream,
+        tree: Optional[SyntaxTree],
+        remove_comments: bool = False
+    ) -> List[RemovedSpan]:
+        """
+        Returns the spans removed from the output of a token stream, sorted by offset.
+        
+        Args:
+            tokens (TokenStream): The tokens (whole file or statement).
+            tree (SyntaxTree, optional): The syntax tree of the tokens (type annotations),
+                None if the tokens hold no colon.
+            remove_comments (bool, optional): Also removes the comments (compilerOptions.removeComments).
+        
+        Returns:
+            List[RemovedSpan]: The removed spans (start, end, is_comment).
+        """
+        
+        removed_spans: List[RemovedSpan] = []
+        
+        if tree is not None:
+            type_annotation = Nodes.TYPE_ANNOTATION
+            
+            for index, kind in enumerate(tree.kinds):
+                if kind == type_annotation:
+                    start, end = tree.span(index)
+                    removed_spans.append((start, end, False))
+        
+        if remove_comments:
+            removed_spans.extend(Emitter.get_comment_spans(tokens, 0, len(tokens)))
+        
+        removed_spans.sort()
+        return removed_spans
+    
+    
+    @staticmethod
+    def get_comment_spans(tokens: TokenStream, start_token: int, end_token: int) -> List[RemovedSpan]:
+        """Returns the spans of the comments found between two token indices (end excluded)."""
+        
+        kinds = tokens.kinds
+        offsets = tokens.offsets
+        lengths = tokens.lengths
+        
+        return [
+            (offsets[index], offsets[index] + lengths[index], True)
+            for index in range(start_token, end_token)
+            if kinds[index] == Tokens.COMMENT or kinds[index] == Tokens.LONG_COMMENT
+        ]
+    
+    
+    @staticmethod
+    def emit_spans(
+        buffer: SourceBuffer,
+        output_file: BinaryIO,
+        removed_spans: Iterable[RemovedSpan],
+        start: int = 0,
+        end: Optional[int] = None,
+        source_map: Optional[SourceMap.Builder] = None
+    ) -> int:
+        """
+        Copies a part of the source into an output file, without the removed spans.
+        
+        Args:
+            buffer (SourceBuffer): The source buffer.
+            output_file (BinaryIO): The output file object (binary mode).
+            removed_spans (Iterable[RemovedSpan]): The removed spans (sorted, inside start/end),
+                a span nested inside a previous one is skipped.
+            start (int, optional): The offset where the copy starts.
+            end (int, optional): The offset where the copy stops (defaults to the end of the buffer).
+            source_map (SourceMap.Builder, optional): Records the written source spans.
+        
+        Returns:
+            int: The number of written bytes.
+        """
+        
+        if end is None:
+            end = buffer.size
+        
+        written_bytes = 0
+        
+        # End offset of the source text already written
+        written_end = start
+        
+        for span_start, span_end, is_comment in removed_spans:
+            if span_end <= written_end:
+                continue
+            
+            span_start = max(span_start, written_end)
+            separator = Emitter.get_comment_separator(buffer, span_start, span_end) if is_comment else b""
+            
+            if source_map is not None:
+                source_map.add_span(written_end, span_start)
+                source_map.add_text(len(separator))
+            
+            written_bytes += output_file.write(buffer.slice(written_end, span_start))
+            written_bytes += output_file.write(separator)
+            written_end = span_end
+        
+        if end > written_end:
+            if source_map is not None:
+                source_map.add_span(written_end, end)
+            
+            written_bytes += output_file.write(buffer.slice(written_end, end))
+        
+        return written_bytes
+    
+    
+    @staticmethod
+    def emit_tree(
+        tree: SyntaxTree,
+        buffer: SourceBuffer,
+        output_file: BinaryIO,
+        remove_comments: bool = False,
+        source_map: Optional[SourceMap.Builder] = None
+    ) -> int:
+        """
+        Writes the output of a parsed file, the type annotations are located by the syntax tree
+        and the comments by the token stream (nothing is scanned or parsed again).
+        
+        Args:
+            tree (SyntaxTree): The syntax tree of the file (its token stream included).
+            buffer (SourceBuffer): The source buffer of the file.
+            output_file (BinaryIO): The output file object (binary mode).
+            remove_comments (bool, optional): Skips the comments (compilerOptions.removeComments).
+            source_map (SourceMap.Builder, optional): Records the written source spans.
+        
+        Returns:
+            int: The number of written bytes.
+        """
+        
+        tokens = tree.tokens
+        
+        # Files without colons have no type annotation, the tree isn't walked
+        removed_spans = Emitter.get_removed_spans(
+            tokens,
+            tree if Tokens.COLON in tokens.kinds else None,
+            remove_comments
+        )
+        
+        return Emitter.emit_spans(buffer, output_file, removed_spans, source_map=source_map)
+    
+    
+    @staticmethod
+    def emit_statements(
+        statements: Iterable[int],
+        tree: SyntaxTree,
+        buffer: SourceBuffer,
+        output_file: BinaryIO,
+        remove_comments: bool = False,
+        source_map: Optional[SourceMap.Builder] = None
+    ) -> int:
+        """
+        Writes the top-level statements as soon as they are parsed (Parser.iter_statements()),
+        every statement is written before its nodes are released,
+        the whitespace between the tokens is preserved.
+        
+        Args:
+            statements (Iterable[int]): The node indices of the top-level statements.
+            tree (SyntaxTree): The syntax tree holding the current statement (Parser.tree).
+            buffer (SourceBuffer): The source buffer of the statements.
+            output_file (BinaryIO): The output file object (binary mode).
+            remove_comments (bool, optional): Skips the comments (compilerOptions.removeComments).
+            source_map (SourceMap.Builder, optional): Records the written source spans.
+        
+        Returns:
+            int: The number of written bytes.
+        """
+        
+        tokens = tree.tokens
+        type_annotation = Nodes.TYPE_ANNOTATION
+        
+        written_bytes = 0
+        
+        # End offset of the source text already written, index of the first token after it
+        written_end = 0
+        written_token = 0
+        
+        for statement in statements:
+            last_token = tree.last_tokens[statement]
+            
+            # Empty statement (error node at the end of the file)
+            if last_token < written_token:
+                continue
+            
+            removed_spans: List[RemovedSpan] = []
+            
+            # Only the current statement is held by the tree, most of them have no annotation
+            if type_annotation in tree.kinds:
+                for index in tree.walk(statement):
+                    if tree.kinds[index] == type_annotation:
+                        start, end = tree.span(index)
+                        removed_spans.append((start, end, False))
+            
+            # The comments preceding the statement are written with it
+            if remove_comments:
+                removed_spans.extend(Emitter.get_comment_spans(tokens, written_token, last_token + 1))
+            
+            removed_spans.sort()
+            statement_end = tokens.offsets[last_token] + tokens.lengths[last_token]
+            
+            written_bytes += Emitter.emit_spans(
+                buffer,
+                output_file,
+                removed_spans,
+                written_end,
+                statement_end,
+                source_map
+            )
+            
+            written_end = statement_end
+            written_token = last_token + 1
+        
+        # Trailing comments and whitespace of the file
+        removed_spans = Emitter.get_comment_spans(tokens, written_token, len(tokens)) if remove_comments else []
+        written_bytes += Emitter.emit_spans(buffer, output_file, removed_spans, written_end, source_map=source_map)
+        
+        return written_bytes
@@ -0,0 +1,277 @@
+from compiler import SourceBuffer
+
+from typing import Dict, Iterable, List, Optional, Set, Union
+from pathlib import Path
+
+import mmap
+import re
+
+
+# Import scanner, only the "require" calls are extracted (no tokenization/parsing),
+# comments and strings are matched first so the calls written inside them are skipped
+IMPORT_PATTERN = re.compile(
+    rb"--\[(?P<LONG_COMMENT_LEVEL>=*)\[.*?\](?P=LONG_COMMENT_LEVEL)\]"
+    rb"|--[^\n]*"
+    rb"|\[(?P<LONG_STRING_LEVEL>=*)\[.*?\](?P=LONG_STRING_LEVEL)\]"
+    rb"""|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'"""
+    rb"|(?<![A-Za-z0-9_.:])require\s*\(?\s*"
+    rb"""(?:"(?P<DOUBLE_QUOTED>[^"\\\n]*)"|'(?P<SINGLE_QUOTED>[^'\\\n]*)')""",
+    re.DOTALL
+)
+
+
+class ImportGraph:
+    """
+    Dependency graph of the clua files of a project ("Pre-process files" phase),
+    an edge goes from a file to every project file it requires.
+    
+    Note:
+        The modules are resolved like the Lua "package.path" ("a.b" -> "a/b.clua"
+        or "a/b/init.clua"), from the project directory then from the directory
+        of the importing file. Unresolved modules (Lua libraries) are ignored.
+    """
+    
+    def __init__(self, project_dir_path: Path):
+        # Path of the project directory (root of the module names)
+        self.project_dir_path: Path = project_dir_path
+        
+        # Module names required by every file (scanned once per file change)
+        self.imports: Dict[Path, List[str]] = {}
+        
+        # Resolved edges, the files required by a file and the files requiring it
+        self.dependencies: Dict[Path, Set[Path]] = {}
+        self.dependents: Dict[Path, Set[Path]] = {}
+    
+    
+    @staticmethod
+    def scan_imports(data: Union[bytes, mmap.mmap]) -> List[str]:
+        """
+        Extracts the module names of the "require" calls of a clua file.
+        
+        Args:
+            data (Union[bytes, mmap.mmap]): The content of the file.
+        
+        Returns:
+            List[str]: The required module names (source order, duplicates removed).
+        """
+        
+        # Most of the files are skipped without running the pattern
+        if data.find(b"require") == -1:
+            return []
+        
+        module_names: List[str] = []
+        
+        for match in IMPORT_PATTERN.finditer(data):
+            module_name = match.group("DOUBLE_QUOTED")
+            
+            if module_name is None:
+                module_name = match.group("SINGLE_QUOTED")
+            
+            if module_name is None:
+                continue
+            
+            module_name = module_name.decode("utf-8", errors="replace")
+            
+            if module_name not in module_names:
+                module_names.append(module_name)
+        
+        return module_names
+    
+    
+    def resolve_module(self, module_name: str, cf_path: Path) -> Optional[Path]:
+        """
+        Returns the path of the project file matching a module name.
+        
+        Args:
+            module_name (str): The required module name.
+            cf_path (Path): The path of the importing file.
+        
+        Returns:
+            Optional[Path]: The path of the required file, or None if it is not a project file.
+        """
+        
+        relative_path = Path(*module_name.replace("\\", "/").replace(".", "/").split("/"))
+        
+        for base_dir_path in (self.project_dir_path, cf_path.parent):
+            for candidate_path in (
+                base_dir_path / relative_path.with_suffix(".clua"),
+                base_dir_path / relative_path / "init.clua"
+            ):
+                if candidate_path in self.imports and candidate_path != cf_path:
+                    return candidate_path
+        
+        return None
+    
+    
+    def link(self, cf_path: Path):
+        """Resolves the edges of a file from its scanned module names."""
+        
+        for dependency_path in self.dependencies.get(cf_path, ()):
+            self.dependents[dependency_path].discard(cf_path)
+        
+        dependency_paths: Set[Path] = set()
+        
+        for module_name in self.imports[cf_path]:
+            dependency_path = self.resolve_module(module_name, cf_path)
+            
+            if dependency_path is not None:
+                dependency_paths.add(dependency_path)
+                self.dependents[dependency_path].add(cf_path)
+        
+        self.dependencies[cf_path] = dependency_paths
+    
+    
+    def scan_file(self, cf_path: Path):
+        """Scans the imports of a file (an unreadable file has no imports)."""
+        
+        cf_buffer = SourceBuffer.open(cf_path)
+        
+        if cf_buffer is None:
+            self.imports[cf_path] = []
+            return
+        
+        with cf_buffer:
+            self.imports[cf_path] = ImportGraph.scan_imports(cf_buffer.data)
+    
+    
+    def build(self, clua_paths: List[Path]):
+        """
+        Scans all the files of a project then resolves their edges.
+        
+        Args:
+            clua_paths (List[Path]): The clua file paths of the project.
+        """
+        
+        self.imports.clear()
+        self.dependencies.clear()
+        self.dependents = {cf_path: set() for cf_path in clua_paths}
+        
+        for cf_path in clua_paths:
+            self.scan_file(cf_path)
+        
+        for cf_path in clua_paths:
+            self.link(cf_path)
+    
+    
+    def update(self, changed_paths: Iterable[Path], removed_paths: Iterable[Path] = ()):
+        """
+        Updates the graph after a change, only the changed files are scanned again.
+        
+        Args:
+            changed_paths (Iterable[Path]): The modified or added clua files.
+            removed_paths (Iterable[Path], optional): The removed clua files.
+        """
+        
+        changed_paths = list(changed_paths)
+        removed_paths = list(removed_paths)
+        
+        # Added/removed files can change the resolution of the modules of other files
+        files_changed = False
+        
+        for cf_path in removed_paths:
+            if cf_path not in self.imports:
+                continue
+            
+            for dependency_path in self.dependencies.pop(cf_path, ()):
+                self.dependents[dependency_path].discard(cf_path)
+            
+            for dependent_path in self.dependents[cf_path]:
+                self.dependencies[dependent_path].discard(cf_path)
+            
+            del self.imports[cf_path]
+            del self.dependents[cf_path]
+            files_changed = True
+        
+        for cf_path in changed_paths:
+            if cf_path not in self.imports:
+                self.dependents[cf_path] = set()
+                files_changed = True
+            
+            self.scan_file(cf_path)
+        
+        relinked_paths = self.imports if files_changed else changed_paths
+        
+        for cf_path in list(relinked_paths):
+            self.link(cf_path)
+    
+    
+    def transitive_dependents(self, cf_paths: Iterable[Path]) -> Set[Path]:
+        """
+        Returns the files that must be recompiled after a change.
+        
+        Args:
+            cf_paths (Iterable[Path]): The changed clua files.
+        
+        Returns:
+            Set[Path]: The changed files and all the files requiring them (directly or not).
+        """
+        
+        affected_paths: Set[Path] = set()
+        pending_paths: List[Path] = list(cf_paths)
+        
+        while len(pending_paths) > 0:
+            cf_path = pending_paths.pop()
+            
+            if cf_path in affected_paths:
+                continue
+            
+            affected_paths.add(cf_path)
+            pending_paths.extend(self.dependents.get(cf_path, ()))
+        
+        return affected_paths
+    
+    
+    def topological_waves(self, cf_paths: Optional[Iterable[Path]] = None) -> List[List[Path]]:
+        """
+        Groups files into build waves (Kahn's algorithm), a file only depends on files
+        of the previous waves, so the files of a wave can be compiled in parallel.
+        
+        Note:
+            The files of an import cycle can't be ordered, they are grouped into
+            the last wave.
+        
+        Args:
+            cf_paths (Iterable[Path], optional): The files to schedule (defaults to all),
+                the dependencies outside of this subset are considered as already built.
+        
+        Returns:
+            List[List[Path]]: The build waves (paths sorted inside every wave).
+        """
+        
+        scheduled_paths: Set[Path] = set(self.imports if cf_paths is None else cf_paths)
+        
+        remaining_counts: Dict[Path, int] = {
+            cf_path: len(self.dependencies.get(cf_path, set()) & scheduled_paths)
+            for cf_path in scheduled_paths
+        }
+        
+        waves: List[List[Path]] = []
+        wave = sorted(cf_path for cf_path, count in remaining_counts.items() if count == 0)
+        
+        while len(wave) > 0:
+            waves.append(wave)
+            next_wave: List[Path] = []
+            
+            for cf_path in wave:
+                del remaining_counts[cf_path]
+                
+                for dependent_path in self.dependents.get(cf_path, ()):
+                    if dependent_path in remaining_counts:
+                        remaining_counts[dependent_path] -= 1
+                        
+                        if remaining_counts[dependent_path] == 0:
+                            next_wave.append(dependent_path)
+            
+            wave = sorted(next_wave)
+        
+        # Import cycles
+        if len(remaining_counts) > 0:
+            waves.append(sorted(remaining_counts))
+        
+        return waves
+    
+    
+    def topological_order(self, cf_paths: Optional[Iterable[Path]] = None) -> List[Path]:
+        """Returns the files in build order (flattened topological waves)."""
+        
+        return [cf_path for wave in self.topological_waves(cf_paths) for cf_path in wave]
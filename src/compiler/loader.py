@@ -1,59 +1,30 @@
-from compiler import Paths, Files, Cache
+from compiler import Paths, Files, Cache, ConfigResolver, ImportGraph
+from compiler.contexts import ProjectContext
 
-from typing import List, Dict, Any, Generator, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 import sys
+import os
 
 
 class Loader:
-    @staticmethod
-    def __load_compiler_tree(
-        compiler_dir_path: Path,
-        included_extensions: Optional[List[str]] = None
-    ) -> Optional[List[Path]]:
-        """
-        Loads the compiler tree with whitelisted file extensions.
-
-        Args:
-            compiler_dir_path (Path): The path of the main compiler directory.
-            included_extensions (List[str], optional): File extensions included into the tree.
-                Defaults to a list -> [".yaml"].
-
-        Returns:
-            Optional[List[Path]]: The result list of paths after the scanning
-                of the compiler directory.
-        """
-        
-        # Default arg value can't be a mutable object
-        # Replaced by YAML extension (database main files)
-        if included_extensions is None:
-            included_extensions = [".yaml"]
-
-        # Data directory research
-        compiler_tree: Optional[List[Path]] = Paths.search_by_extensions(
-            compiler_dir_path,
-            included_extensions,
-            True
-        )
-        
-        # Empty list catching
-        if compiler_tree is not None:
-            return compiler_tree if len(compiler_tree) > 0 else None
-
-
     @staticmethod
     def __load_compiler_data(
-        compiler_tree: List[Path],
-        data_filenames: List[str]
+        data_paths: Dict[str, Path],
+        snapshot_path: Optional[Path] = None
     ) -> Dict[str, Optional[Dict[str, Any]]]:
         """
         Loads the YAML files that contains the diagnostic messages used by the debugger
-        and the default config file of the compiler from the loaded compiler tree.
+        and the default config file of the compiler from the compiler database directory.
+        
+        Note:
+            The loaded data are stored into a pickled snapshot, which is used instead of
+            the YAML files as long as their modification times and sizes don't change.
 
         Args:
-            compiler_tree (List[Path]): The loaded compiler tree.
-            data_filenames (List[str]): The name of the files to load into loaded_data.
+            data_paths (Dict[str, Path]): The paths of the files to load (keys are the filenames).
+            snapshot_path (Path, optional): The path of the database snapshot (None disables it).
             
         Returns:
             Dict[str, Optional[Dict[str, Any]]]: The keys are the filenames,
@@ -61,73 +32,73 @@ class Loader:
                 or None if file not found/YAML error.
         """
         
+        # Signature of the source files (a changed file rebuilds the snapshot)
+        data_signature: Dict[str, Any] = {}
+        
+        for filename, file_path in data_paths.items():
+            try:
+                file_stat = os.stat(file_path)
+                data_signature[filename] = (file_stat.st_mtime_ns, file_stat.st_size)
+            except OSError:
+                data_signature[filename] = None
+        
+        if snapshot_path is not None:
+            snapshot = Files.load_pickle(snapshot_path)
+            
+            if isinstance(snapshot, dict) and snapshot.get("signature") == data_signature:
+                return snapshot["data"]
+        
         loaded_data: Dict[str, Optional[Dict[str, Any]]] = {}
         
-        for filename in data_filenames:
-            content: Optional[Dict[str, Any]] = Files.load_yaml_from_compiler_tree(
-                compiler_tree,
-                filename
-            )
+        for filename, file_path in data_paths.items():
+            content: Optional[Dict[str, Any]] = Files.load_yaml(file_path)
             
             if content is not None:
                 loaded_data[filename] = content
         
+        # Read-only installations keep working without snapshot
+        if snapshot_path is not None:
+            Files.dump_pickle(snapshot_path, {"signature": data_signature, "data": loaded_data})
+        
         # Default empty return
         return loaded_data
 
 
     @staticmethod
-    def __load_project_tree(project_dir_path: Path) -> Optional[List[Path]]:
+    def __load_project_tree(
+        project_dir_path: Path,
+        excluded_patterns: List[str],
+        filename: str = "clua.config.yaml"
+    ) -> Optional[Tuple[List[Path], List[Path], List[Path]]]:
         """
-        Returns a tree that contains all the files and directories
-        inside a project, including the child directories.
+        Walks the project directory (including the child directories) in a single pass
+        and classifies the clua files and the config files.
 
         Args:
             project_dir_path (Path): The path of the project directory.
+            excluded_patterns (List[str]): Name patterns of the skipped files/directories.
+            filename (str, optional): The default name of the clua config file.
 
         Returns:
-            Optional[List[Path]]: A list of all the paths found inside the project dir
-                or None if the path is invalid.
+            Optional[Tuple[List[Path], List[Path], List[Path]]]: The clua file paths,
+                the config file paths and the directory paths,
+                or None if the path is invalid or the project is empty.
         """
 
         if Paths.is_dir_path_valid(project_dir_path):
-            project_tree_generator: Generator[Path, None, None] = Paths.get_directory_tree(
+            clua_paths, config_paths, dir_paths = Paths.walk_project(
                 project_dir_path,
-                True
+                filename,
+                excluded_patterns
             )
             
-            project_tree = list(project_tree_generator)
-            
-            # Empty list catching
-            if len(project_tree) > 0:
-                return project_tree
+            # Empty project catching
+            if len(clua_paths) > 0 or len(config_paths) > 0:
+                return clua_paths, config_paths, dir_paths
                  
         return None
 
 
-    @staticmethod
-    def __load_project_configs(
-        project_tree: List[Path],
-        filename: str = "clua.config.yaml"
-    ) -> Optional[Dict[Path, Any]]:
-        """
-        Loads all the found config files inside the user project.
-        
-        Args:
-            project_tree (List[Path]): The loaded user project tree.
-            filename (str, optional): The default name of the clua config file.
-            
-        Returns:
-            Optional[Dict[Path, Any]]: Contains all the loaded config files,
-                the keys corresponds to the path of these files,
-                the values are their dict formatted content.
-        """
-
-        # DPC102
-        # Load the content of all the found config files
-        return Files.load_multiple_yaml_from_tree(project_tree, filename)
-
-
     @staticmethod
     def __load_compiler(compiler_dir_path: Path) -> bool:
         """Loads the compiler data and saves them to the Cache.
@@ -140,52 +111,123 @@ class Loader:
         """
         
         if Paths.is_dir_path_valid(compiler_dir_path):
-            # Loads a general tree containing all the paths found inside the compiler directory
-            compiler_tree: Optional[List[Path]] = Loader.__load_compiler_tree(compiler_dir_path)
+            # The database files have fixed paths inside the compiler package (compiler/database)
+            database_dir_path = compiler_dir_path / "database"
             
-            if compiler_tree is not None:
-                # List of filenames used to load the compiler data (compiler/data)
-                data_filenames = [
-                    "diagnostic_messages.yaml",
-                    "clua.config.yaml",
-                    "system.yaml"
-                ]
-                
-                Cache.Compiler.compiler_tree = compiler_tree
+            # List of filenames used to load the compiler data
+            data_filenames = [
+                "diagnostic_messages.yaml",
+                "clua.config.yaml",
+                "system.yaml"
+            ]
+            
+            data_paths: Dict[str, Path] = {
+                filename: database_dir_path / filename
+                for filename in data_filenames
+            }
+            
+            Cache.Compiler.compiler_tree = list(data_paths.values())
+            
+            with Cache.Compiler.timings.span("database"):
                 Cache.Compiler.compiler_database = Loader.__load_compiler_data(
-                    compiler_tree,
-                    data_filenames
+                    data_paths,
+                    database_dir_path / "database.pickle"
                 )
-                
-                return True
+            
+            return True
             
         return False
 
 
     @staticmethod
-    def __load_project(project_dir_path: Path) -> bool:
-        """Loads the project directory data and saves them into the Cache (project sub-class).
+    def __load_project(project_dir_path: Path, project: ProjectContext) -> bool:
+        """Loads the project directory data and saves them into a project context.
 
         Args:
             project_dir_path (Path): The path of the project directory.
+            project (ProjectContext): The context receiving the project data.
 
         Returns:
             bool: True if all the data are successfully loaded.
         """
 
         if Paths.is_dir_path_valid(project_dir_path):
-            project_tree: Optional[List[Path]] = Loader.__load_project_tree(project_dir_path)
+            timings = Cache.Compiler.timings
+            
+            # The config files are only loaded when the compiler enters their directory
+            config_resolver = ConfigResolver(
+                project_dir_path,
+                Cache.Compiler.compiler_database.get("clua.config.yaml")
+            )
+            
+            project.config_resolver = config_resolver
+            project.loaded_config_dicts = config_resolver.loaded_config_dicts
+            
+            # The "exclude" list of the project root config overrides the default one
+            with timings.span("config"):
+                root_config: Dict[str, Any] = config_resolver.resolve(project_dir_path)
+                project.excluded_patterns = list(root_config.get("exclude", []))
+            
+            with timings.span("walk") as span:
+                project_tree = Loader.__load_project_tree(project_dir_path, project.excluded_patterns)
+                
+                if project_tree is not None:
+                    span.count(files=len(project_tree[0]), configs=len(project_tree[1]), dirs=len(project_tree[2]))
             
             if project_tree is not None:
-                Cache.Project.project_tree = project_tree
-                Cache.Project.clua_trace = Paths.clua_paths_organizer(project_tree)
-                Cache.Project.loaded_config_dicts = Loader.__load_project_configs(project_tree)
+                clua_paths, config_paths, dir_paths = project_tree
+                
+                project.project_tree = dir_paths + config_paths + clua_paths
+                
+                # Pre-process phase, the trace follows the build order of the imports
+                with timings.span("imports") as span:
+                    import_graph = ImportGraph(project_dir_path)
+                    import_graph.build(Paths.clua_paths_organizer(clua_paths) or [])
+                    
+                    span.count(files=len(clua_paths))
+                
+                project.import_graph = import_graph
+                project.clua_trace = import_graph.topological_order()
+                config_resolver.config_paths = set(config_paths)
                 
                 return True
         
         return False
 
 
+    @staticmethod
+    def initialize_compiler() -> bool:
+        """
+        Initialize the compiler tree/data only, a resident process (compilation server)
+        loads them once and keeps them for all the projects.
+
+        Returns:
+            bool: True if all the data are successfully loaded.
+        """
+        
+        # DPC103
+        compiler_dir_path = Path(__file__).parent
+        
+        return Loader.__load_compiler(compiler_dir_path)
+
+
+    @staticmethod
+    def initialize_project(project_dir_path: Path, project: Optional[ProjectContext] = None) -> bool:
+        """
+        Initialize the project tree/configs (the compiler data must be loaded).
+
+        Args:
+            project_dir_path (Path): The path of the project directory.
+            project (ProjectContext, optional): The context receiving the project data,
+                defaults to the project of the command line (Cache.Project).
+
+        Returns:
+            bool: True if all the data are successfully loaded.
+        """
+        
+        return Loader.__load_project(project_dir_path, project if project is not None else Cache.Project)
+
+
     @staticmethod
     def initialize(project_dir_path: Path):
         """
@@ -196,11 +238,8 @@ class Loader:
             project_dir_path (Path): The path of the project directory.
         """
         
-        # DPC103
-        compiler_dir_path = Path(__file__).parent
-        
-        compiler_loading_result = Loader.__load_compiler(compiler_dir_path)
-        project_loading_result = Loader.__load_project(project_dir_path)
+        compiler_loading_result = Loader.initialize_compiler()
+        project_loading_result = Loader.initialize_project(project_dir_path)
                 
         if not compiler_loading_result or not project_loading_result:
             sys.exit(1)
@@ -1,7 +1,8 @@
-from compiler import Paths, Register
+from compiler import Register, SourceBuffer, SourceCursor, LineIndex
 
-from typing import Optional, TextIO
+from typing import Optional, Tuple
 from pathlib import Path
+from array import array
 
 
 class Operator:
@@ -12,116 +13,154 @@ class Operator:
         The default 'clua_file_' name is abbreviated as 'cf_'.
     """
     
-    class VirtualPointer:
-        """Operations on a already opened Clua file pointer."""
-        
-        @staticmethod
-        def get_position() -> int:
-            """Returns the virtual pointer position from the Register."""
-
-            return Register.cf_virtual_pointer_pos
-        
-        
-        @staticmethod
-        def set_position(new_pointer_pos: int):
-            """Set the Register virtual pointer position."""
-        
-            Register.cf_virtual_pointer_pos = new_pointer_pos
-        
-        
-        @staticmethod
-        def update_position(new_pointer_pos: int) -> int:
-            """Get the virtual pointer position from the Register before setting a new one."""
-        
-            old_virtual_pointer_pos = Operator.VirtualPointer.get_position()
-            Operator.VirtualPointer.set_position(new_pointer_pos)
-            return old_virtual_pointer_pos
-        
-        
-        @staticmethod
-        def get_position_difference(new_pointer_pos: int) -> int:
-            """
-            Returns the difference between the Register virtual pointer position and the current one.
-
-            Args:
-                new_pointer_pos (int): The new pointer position.
-
-            Returns:
-                int: The difference between the two pointer positions.
-            """
-            
-            return new_pointer_pos - Operator.VirtualPointer.get_position()
-
-
     @staticmethod
-    def open_cf(cf_path: Path) -> Optional[TextIO]:
+    def open_cf(cf_path: Path) -> Optional[SourceBuffer]:
         """
-        Opens a .clua file for future reading, note that this method don't close the file
-        as it should be kept inside the memory for parser later re-scanning.
+        Maps a .clua file into memory for future reading, note that this method don't close
+        the file as it should be kept inside the memory for parser later re-scanning.
         
         Args:
             cf_path (Path): The path of the file that will be scanned.
             
         Returns:
-            Optional[TextIO]: Successfully loaded file object or None if the file cannot be opened.
+            Optional[SourceBuffer]: Successfully mapped file buffer
+                or None if the file cannot be opened.
         """
     
-        if Paths.is_file_path_valid(cf_path, ".clua"):
-            try:
-                return open(cf_path, "r")
-            except OSError:
-                pass
-        
-        return None
+        cf_buffer: Optional[SourceBuffer] = SourceBuffer.open(cf_path)
+        
+        if cf_buffer is not None:
+            Register.cf_object = cf_buffer
+            Register.cf_line_lengths = array("i")
+            Register.cf_line_index = LineIndex.from_buffer(cf_buffer.data)
+            Register.cf_cursor = SourceCursor(cf_buffer, line_index=Register.cf_line_index)
+            Register.cf_line_number = -1
+            Register.cf_line_start = 0
+            Register.cf_line_end = 0
+        
+        return cf_buffer
     
     
     @staticmethod
-    def close_cf(cf_object: Optional[TextIO]) -> bool:
+    def close_cf(cf_object: Optional[SourceBuffer]) -> bool:
         """
         Closes a previously opened .clua file (Parser final validity instruction or eq.).
         
         Args:
-            cf_object (Optional[TextIO]): The file object (TextIO -> open() returned object).
+            cf_object (Optional[SourceBuffer]): The file buffer (open_cf() returned object).
         """
         
-        if isinstance(cf_object, TextIO):
+        if isinstance(cf_object, SourceBuffer):
             cf_object.close()
+            
+            if Register.cf_object is cf_object:
+                Register.cf_object = None
+                Register.cf_line_index = None
+                Register.cf_cursor = None
+            
             return True
         
         return False
 
 
     @staticmethod
-    def cf_is_eof(current_line: str) -> bool:
-        """Returns True if the end of the file (EOF) is reached."""
+    def cf_is_eof(cf_object: SourceBuffer) -> bool:
+        """Returns True if the end of the file (EOF) is reached by the Register cursor."""
         
-        if not current_line:
+        if Register.cf_cursor.position >= cf_object.size:
             return True
         
         return False
 
 
     @staticmethod
-    def cf_readline(cf_object: TextIO) -> str:
+    def cf_seek_line(line_number: int) -> int:
+        """
+        Moves the Register cursor to the beginning of a line (parser re-scanning),
+        the next cf_readline() call will return this line.
+
+        Args:
+            line_number (int): The 0-indexed number of the line.
+
+        Returns:
+            int: The new cursor position.
+        """
+        
+        line_start = Register.cf_cursor.seek_line(line_number)
+        Register.cf_line_number = Register.cf_cursor.line_number
+        
+        return line_start
+
+
+    @staticmethod
+    def cf_apply_edit(new_cf_object: SourceBuffer, edit_start: int) -> int:
+        """
+        Replaces the Register file buffer by its edited version (editor integration),
+        the previous buffer is closed, the stored lengths of the lines before the edit are kept
+        and the Register cursor is moved to the beginning of the edited line,
+        so only the lines after it are read again.
+        
+        Note:
+            The tokens of the edited region are updated by Scanner.rescan().
+
+        Args:
+            new_cf_object (SourceBuffer): The buffer after the edit.
+            edit_start (int): The offset where the edit starts.
+
+        Returns:
+            int: The new cursor position (beginning of the edited line).
+        """
+        
+        edit_line_number = Register.cf_line_index.line_at(edit_start)
+        previous_cf_object = Register.cf_object
+        
+        # The replaced buffer is unmapped (nothing refers to it anymore)
+        if previous_cf_object is not None and previous_cf_object is not new_cf_object:
+            previous_cf_object.close()
+        
+        Register.cf_object = new_cf_object
+        Register.cf_line_index = LineIndex.from_buffer(new_cf_object.data)
+        Register.cf_cursor = SourceCursor(new_cf_object, line_index=Register.cf_line_index)
+        del Register.cf_line_lengths[edit_line_number:]
+        
+        return Operator.cf_seek_line(edit_line_number)
+
+
+    @staticmethod
+    def cf_readline(cf_object: SourceBuffer) -> Tuple[int, int]:
         """
-        Reads a line from the Clua file object based on the current pointer position
+        Reads a line from the Clua file buffer based on the Register cursor position
         and updates the corresponding Register values.
+        
+        Note:
+            The line is not copied, its content can be obtained from the returned span
+            with `cf_object.slice()` or `cf_object.text()`.
 
         Args:
-            cf_object (TextIO): The file object (TextIO -> open() returned object).
+            cf_object (SourceBuffer): The file buffer (open_cf() returned object).
 
         Returns:
-            str: The line that have been read.
+            Tuple[int, int]: The span (start/end byte offsets) of the line that have been read,
+                an empty span is returned if the end of the file is reached.
         """
         
-        current_line = cf_object.readline()
+        cursor = Register.cf_cursor
+        
+        if cursor is None or cursor.buffer is not cf_object:
+            cursor = Register.cf_cursor = SourceCursor(cf_object, line_index=Register.cf_line_index)
         
-        # Overwrites the virtual pointer pos by the real one
-        Operator.VirtualPointer.set_position(cf_object.tell())
+        line_start, line_end = cursor.readline()
+        
+        if line_start == line_end:
+            return line_start, line_end
 
-        # Updates cf line data
-        Register.cf_line_lengths.append(len(current_line))
-        Register.cf_line_number += 1
-        Register.cf_line = current_line
+        # Updates cf line data (line lengths are only stored during the first reading)
+        Register.cf_line_number = cursor.line_number
+        
+        if Register.cf_line_number >= len(Register.cf_line_lengths):
+            Register.cf_line_lengths.append(line_end - line_start)
+        
+        Register.cf_line_start = line_start
+        Register.cf_line_end = line_end
 
-        return current_line
+        return line_start, line_end
@@ -1,7 +1,885 @@
-from compiler import Register
+from compiler.contexts import Types, TokenStream, SyntaxTree
 
-from pathlib import Path
+from typing import Any, Dict, Generator, List, Set, Tuple
+from array import array
+
+
+Tokens = Types.Tokens
+Nodes = Types.Nodes
+
+# Keywords that always start a statement (they can't appear inside an expression)
+STATEMENT_KEYWORDS: Set[int] = {
+    Tokens.LOCAL.value,
+    Tokens.IF.value,
+    Tokens.WHILE.value,
+    Tokens.FOR.value,
+    Tokens.REPEAT.value,
+    Tokens.DO.value,
+    Tokens.RETURN.value,
+    Tokens.BREAK.value,
+    Tokens.GOTO.value,
+    Tokens.DOUBLE_COLON.value,
+}
+
+# Tokens ending a block
+BLOCK_FOLLOW_KINDS: Set[int] = {
+    Tokens.EOF.value,
+    Tokens.END.value,
+    Tokens.ELSE.value,
+    Tokens.ELSEIF.value,
+    Tokens.UNTIL.value,
+}
+
+# Tokens where the error recovery stops (start of the next statement or end of the block)
+RECOVERY_KINDS: Set[int] = STATEMENT_KEYWORDS | BLOCK_FOLLOW_KINDS | {
+    Tokens.FUNCTION.value,
+    Tokens.SEMICOLON.value,
+}
+
+# Literal tokens and their expression node
+LITERAL_NODES: Dict[int, int] = {
+    Tokens.NIL.value: Nodes.NIL.value,
+    Tokens.TRUE.value: Nodes.TRUE.value,
+    Tokens.FALSE.value: Nodes.FALSE.value,
+    Tokens.NUMBER.value: Nodes.NUMBER.value,
+    Tokens.STRING.value: Nodes.STRING.value,
+    Tokens.LONG_STRING.value: Nodes.STRING.value,
+    Tokens.ELLIPSIS.value: Nodes.VARARG.value,
+}
+
+# Tokens starting the arguments of a call
+CALL_ARGUMENT_KINDS: Set[int] = {
+    Tokens.LEFT_PAREN.value,
+    Tokens.STRING.value,
+    Tokens.LONG_STRING.value,
+    Tokens.LEFT_BRACE.value,
+}
+
+UNARY_OPERATOR_KINDS: Set[int] = {
+    Tokens.NOT.value,
+    Tokens.MINUS.value,
+    Tokens.HASH.value,
+    Tokens.TILDE.value,
+}
+
+# Priority of the unary operators (lower than the power operator)
+UNARY_PRIORITY = 12
+
+# Left/right priorities of the binary operators (Lua 5.3 reference implementation),
+# a right priority lower than the left one makes the operator right associative
+BINARY_PRIORITIES: Dict[int, Tuple[int, int]] = {
+    Tokens.OR.value: (1, 1),
+    Tokens.AND.value: (2, 2),
+    Tokens.LESS.value: (3, 3),
+    Tokens.GREATER.value: (3, 3),
+    Tokens.LESS_EQUAL.value: (3, 3),
+    Tokens.GREATER_EQUAL.value: (3, 3),
+    Tokens.NOT_EQUAL.value: (3, 3),
+    Tokens.EQUAL.value: (3, 3),
+    Tokens.PIPE.value: (4, 4),
+    Tokens.TILDE.value: (5, 5),
+    Tokens.AMPERSAND.value: (6, 6),
+    Tokens.SHIFT_LEFT.value: (7, 7),
+    Tokens.SHIFT_RIGHT.value: (7, 7),
+    Tokens.CONCAT.value: (9, 8),
+    Tokens.PLUS.value: (10, 10),
+    Tokens.MINUS.value: (10, 10),
+    Tokens.STAR.value: (11, 11),
+    Tokens.SLASH.value: (11, 11),
+    Tokens.DOUBLE_SLASH.value: (11, 11),
+    Tokens.PERCENT.value: (11, 11),
+    Tokens.CARET.value: (14, 13),
+}
+
+# Nesting limit of the blocks/expressions (keeps the recursion below the Python limit)
+MAX_NESTING_LEVEL = 100
+
+# Displayed names of the expected tokens
+TOKEN_NAMES: Dict[int, str] = {
+    Tokens.NAME.value: "<name>",
+    Tokens.EOF.value: "<eof>",
+    Tokens.THEN.value: "then",
+    Tokens.DO.value: "do",
+    Tokens.END.value: "end",
+    Tokens.UNTIL.value: "until",
+    Tokens.IN.value: "in",
+    Tokens.ASSIGN.value: "=",
+    Tokens.COMMA.value: ",",
+    Tokens.LEFT_PAREN.value: "(",
+    Tokens.RIGHT_PAREN.value: ")",
+    Tokens.RIGHT_BRACKET.value: "]",
+    Tokens.RIGHT_BRACE.value: "}",
+    Tokens.DOUBLE_COLON.value: "::",
+    Tokens.GREATER.value: ">",
+}
+
+
+class ParserError(Exception):
+    """Syntax error raised inside the parser (caught by the statement level recovery)."""
+    
+    def __init__(self, code: str, token_index: int, args: Tuple[Any, ...] = ()):
+        super().__init__(code)
+        
+        # Diagnostic code, index of the token where the error is reported and message arguments
+        self.code: str = code
+        self.token_index: int = token_index
+        self.message_args: Tuple[Any, ...] = args
 
 
 class Parser:
-    pass
+    """
+    Recursive descent parser of the clua files (Lua 5.3 grammar with optional
+    type annotations), the syntax tree is allocated inside a node arena (SyntaxTree).
+    
+    Note:
+        The type annotations are accepted after the declared names and the parameters
+        ("local x: Number", "function f(model: String): Boolean").
+    """
+    
+    def __init__(self, tokens: TokenStream):
+        # Token stream of the file (bound to its source buffer)
+        self.tokens: TokenStream = tokens
+        
+        # Indices of the significant tokens (comments and invalid tokens are skipped,
+        # the invalid tokens are already reported by the scanner)
+        self.positions: "array[int]" = array("I", [
+            index for index, kind in enumerate(tokens.kinds)
+            if kind >= Tokens.NAME and kind != Tokens.COMMENT and kind != Tokens.LONG_COMMENT
+        ])
+        
+        # Current position inside the significant tokens
+        self.position: int = 0
+        
+        # Kind of the current token (EOF once all the tokens are consumed)
+        self.kind: int = Tokens.EOF
+        
+        # Token index of the last consumed token (-1 before the first one)
+        self.last_token: int = -1
+        
+        # Current nesting level (blocks and expressions)
+        self.level: int = 0
+        
+        self.tree: SyntaxTree = SyntaxTree(tokens)
+        
+        # Diagnostics found while parsing, stored as (code, offset, args)
+        self.diagnostics: List[Tuple[str, int, Tuple[Any, ...]]] = []
+        
+        self.seek(0)
+    
+    
+    def seek(self, position: int):
+        """Moves to a significant token position."""
+        
+        self.position = position
+        
+        if position < len(self.positions):
+            self.kind = self.tokens.kinds[self.positions[position]]
+        else:
+            self.kind = Tokens.EOF
+    
+    
+    def token_index(self) -> int:
+        """Returns the token index of the current token (stream length at the end of file)."""
+        
+        if self.position < len(self.positions):
+            return self.positions[self.position]
+        
+        return len(self.tokens)
+    
+    
+    def peek(self, count: int = 1) -> int:
+        """Returns the kind of a next significant token (lookahead)."""
+        
+        position = self.position + count
+        
+        if position < len(self.positions):
+            return self.tokens.kinds[self.positions[position]]
+        
+        return Tokens.EOF
+    
+    
+    def advance(self) -> int:
+        """Consumes the current token, returns its token index."""
+        
+        token_index = self.token_index()
+        
+        self.last_token = token_index
+        self.seek(self.position + 1)
+        
+        return token_index
+    
+    
+    def accept(self, kind: int) -> bool:
+        """Consumes the current token if it is of the expected kind."""
+        
+        if self.kind == kind:
+            self.advance()
+            return True
+        
+        return False
+    
+    
+    def expect(self, kind: int) -> int:
+        """Consumes a token of the expected kind (raises a ParserError otherwise)."""
+        
+        if self.kind != kind:
+            raise ParserError("d2002", self.token_index(), (TOKEN_NAMES.get(kind, "?"), self.near()))
+        
+        return self.advance()
+    
+    
+    def near(self) -> str:
+        """Returns the text of the current token (error messages)."""
+        
+        if self.kind == Tokens.EOF:
+            return TOKEN_NAMES[Tokens.EOF]
+        
+        return self.tokens.text(self.token_index())
+    
+    
+    def enter_level(self):
+        self.level += 1
+        
+        if self.level > MAX_NESTING_LEVEL:
+            raise ParserError("d2003", self.token_index())
+    
+    
+    def add_node(self, kind: int, first_token: int, children: Tuple[int, ...] = (), value: int = -1) -> int:
+        """Allocates a node ending at the last consumed token."""
+        
+        return self.tree.add_node(kind, first_token, self.last_token, children, value)
+    
+    
+    def report(self, error: ParserError):
+        """Stores the diagnostic of a syntax error."""
+        
+        if error.token_index < len(self.tokens):
+            offset = self.tokens.offsets[error.token_index]
+        else:
+            offset = self.tokens.buffer.size if self.tokens.buffer is not None else 0
+        
+        self.diagnostics.append((error.code, offset, error.message_args))
+    
+    
+    def parse(self) -> SyntaxTree:
+        """
+        Parses the whole token stream.
+        
+        Returns:
+            SyntaxTree: The syntax tree (the root node is a CHUNK node),
+                the syntax errors are stored inside Parser.diagnostics.
+        """
+        
+        first_token = self.token_index()
+        children: List[int] = [self.parse_block()]
+        
+        # Stray block endings ("end" without opener), the parsing goes on after them
+        while self.kind != Tokens.EOF:
+            error_token = self.token_index()
+            self.report(ParserError("d2001", error_token, (self.near(),)))
+            self.advance()
+            
+            children.append(self.add_node(Nodes.ERROR, error_token))
+            children.append(self.parse_block())
+        
+        self.tree.root = self.add_node(Nodes.CHUNK, first_token, tuple(children))
+        return self.tree
+    
+    
+    def recover(self, start_position: int, start_token: int) -> int:
+        """
+        Skips the tokens of an invalid statement, up to the start of the next statement.
+        
+        Args:
+            start_position (int): The position of the first token of the statement.
+            start_token (int): The token index of the first token of the statement.
+        
+        Returns:
+            int: The index of the ERROR node covering the skipped tokens.
+        """
+        
+        # At least one token is skipped (no infinite loop on the same token)
+        if self.position == start_position and self.kind != Tokens.EOF:
+            self.advance()
+        
+        buffer = self.tokens.buffer
+        
+        while self.kind not in RECOVERY_KINDS:
+            # A name at the start of a line usually starts the next statement
+            if self.kind == Tokens.NAME and buffer is not None:
+                previous_offset = self.tokens.offsets[self.last_token]
+                
+                if buffer.find(b"\n", previous_offset, self.tokens.offsets[self.token_index()]) != -1:
+                    break
+            
+            self.advance()
+        
+        return self.add_node(Nodes.ERROR, start_token)
+    
+    
+    def parse_block(self) -> int:
+        """block ::= {statement} [return_statement]"""
+        
+        first_token = self.token_index()
+        statements: List[int] = []
+        
+        self.enter_level()
+        
+        while self.kind not in BLOCK_FOLLOW_KINDS:
+            statement = self.parse_block_statement()
+            statements.append(statement)
+            
+            # The return statement ends the block
+            if self.tree.kinds[statement] == Nodes.RETURN_STATEMENT:
+                break
+        
+        self.level -= 1
+        
+        return self.add_node(Nodes.BLOCK, first_token, tuple(statements))
+    
+    
+    def parse_block_statement(self) -> int:
+        """Parses a statement of a block, an invalid statement is replaced by an ERROR node."""
+        
+        start_position = self.position
+        start_token = self.token_index()
+        level = self.level
+        node_count = len(self.tree)
+        
+        try:
+            if self.kind == Tokens.RETURN:
+                return self.parse_return()
+            
+            return self.parse_statement()
+        except ParserError as error:
+            self.report(error)
+            self.level = level
+            
+            # The nodes of the failed statement are replaced by its ERROR node
+            self.tree.truncate(node_count)
+            return self.recover(start_position, start_token)
+    
+    
+    def iter_statements(self) -> Generator[int, None, None]:
+        """
+        Parses the token stream one top-level statement at a time (streaming emission),
+        the nodes of a statement are released when the next one is requested, so the tree
+        never holds more than the largest top-level statement.
+        
+        Note:
+            No CHUNK/BLOCK node is built, the diagnostics are the same as Parser.parse() ones
+            (the tokens following a top-level return statement are stray tokens).
+        
+        Returns:
+            Generator[int, None, None]: The node index of every top-level statement
+                (valid until the next one is requested).
+        """
+        
+        is_stray = False
+        
+        self.enter_level()
+        
+        while self.kind != Tokens.EOF:
+            node_count = len(self.tree)
+            
+            if is_stray or self.kind in BLOCK_FOLLOW_KINDS:
+                error_token = self.token_index()
+                self.report(ParserError("d2001", error_token, (self.near(),)))
+                self.advance()
+                
+                statement = self.add_node(Nodes.ERROR, error_token)
+                is_stray = False
+            else:
+                statement = self.parse_block_statement()
+                is_stray = self.tree.kinds[statement] == Nodes.RETURN_STATEMENT
+            
+            yield statement
+            
+            self.tree.truncate(node_count)
+        
+        self.level -= 1
+    
+    
+    def parse_statement(self) -> int:
+        """Parses a statement (the "return" statement is parsed by the block)."""
+        
+        kind = self.kind
+        first_token = self.token_index()
+        
+        if kind == Tokens.SEMICOLON:
+            self.advance()
+            return self.add_node(Nodes.EMPTY_STATEMENT, first_token)
+        
+        if kind == Tokens.IF:
+            return self.parse_if()
+        
+        if kind == Tokens.WHILE:
+            self.advance()
+            condition = self.parse_expression()
+            self.expect(Tokens.DO)
+            block = self.parse_block()
+            self.expect(Tokens.END)
+            
+            return self.add_node(Nodes.WHILE_STATEMENT, first_token, (condition, block))
+        
+        if kind == Tokens.DO:
+            self.advance()
+            block = self.parse_block()
+            self.expect(Tokens.END)
+            
+            return self.add_node(Nodes.DO_STATEMENT, first_token, (block,))
+        
+        if kind == Tokens.FOR:
+            return self.parse_for()
+        
+        if kind == Tokens.REPEAT:
+            self.advance()
+            block = self.parse_block()
+            self.expect(Tokens.UNTIL)
+            condition = self.parse_expression()
+            
+            return self.add_node(Nodes.REPEAT_STATEMENT, first_token, (block, condition))
+        
+        if kind == Tokens.FUNCTION:
+            self.advance()
+            function_name = self.parse_function_name()
+            parameters, return_type, block = self.parse_function_body()
+            
+            return self.add_node(
+                Nodes.FUNCTION_STATEMENT,
+                first_token,
+                (function_name, parameters, return_type, block)
+            )
+        
+        if kind == Tokens.LOCAL:
+            self.advance()
+            
+            if self.accept(Tokens.FUNCTION):
+                declaration = self.parse_declaration(False)
+                parameters, return_type, block = self.parse_function_body()
+                
+                return self.add_node(
+                    Nodes.LOCAL_FUNCTION,
+                    first_token,
+                    (declaration, parameters, return_type, block)
+                )
+            
+            declarations: List[int] = [self.parse_declaration(True)]
+            
+            while self.accept(Tokens.COMMA):
+                declarations.append(self.parse_declaration(True))
+            
+            if self.accept(Tokens.ASSIGN):
+                declarations.append(self.parse_expression_list())
+            
+            return self.add_node(Nodes.LOCAL_STATEMENT, first_token, tuple(declarations))
+        
+        if kind == Tokens.DOUBLE_COLON:
+            self.advance()
+            name_token = self.expect(Tokens.NAME)
+            self.expect(Tokens.DOUBLE_COLON)
+            
+            return self.add_node(Nodes.LABEL, first_token, value=name_token)
+        
+        if kind == Tokens.BREAK:
+            self.advance()
+            return self.add_node(Nodes.BREAK_STATEMENT, first_token)
+        
+        if kind == Tokens.GOTO:
+            self.advance()
+            name_token = self.expect(Tokens.NAME)
+            
+            return self.add_node(Nodes.GOTO_STATEMENT, first_token, value=name_token)
+        
+        return self.parse_expression_statement()
+    
+    
+    def parse_return(self) -> int:
+        """return_statement ::= 'return' [expression_list] [';']"""
+        
+        first_token = self.advance()
+        expression_list = -1
+        
+        if self.kind not in BLOCK_FOLLOW_KINDS and self.kind != Tokens.SEMICOLON:
+            expression_list = self.parse_expression_list()
+        
+        self.accept(Tokens.SEMICOLON)
+        
+        return self.add_node(Nodes.RETURN_STATEMENT, first_token, (expression_list,))
+    
+    
+    def parse_if(self) -> int:
+        """if_statement ::= 'if' exp 'then' block {'elseif' exp 'then' block} ['else' block] 'end'"""
+        
+        first_token = self.advance()
+        condition = self.parse_expression()
+        self.expect(Tokens.THEN)
+        
+        children: List[int] = [condition, self.parse_block()]
+        
+        while self.kind == Tokens.ELSEIF:
+            clause_token = self.advance()
+            clause_condition = self.parse_expression()
+            self.expect(Tokens.THEN)
+            clause_block = self.parse_block()
+            
+            children.append(self.add_node(
+                Nodes.ELSEIF_CLAUSE,
+                clause_token,
+                (clause_condition, clause_block)
+            ))
+        
+        if self.kind == Tokens.ELSE:
+            clause_token = self.advance()
+            clause_block = self.parse_block()
+            
+            children.append(self.add_node(Nodes.ELSE_CLAUSE, clause_token, (clause_block,)))
+        
+        self.expect(Tokens.END)
+        
+        return self.add_node(Nodes.IF_STATEMENT, first_token, tuple(children))
+    
+    
+    def parse_for(self) -> int:
+        """
+        numeric_for ::= 'for' declaration '=' exp ',' exp [',' exp] 'do' block 'end'
+        generic_for ::= 'for' declaration {',' declaration} 'in' expression_list 'do' block 'end'
+        """
+        
+        first_token = self.advance()
+        declaration = self.parse_declaration(False)
+        
+        if self.accept(Tokens.ASSIGN):
+            children: List[int] = [declaration, self.parse_expression()]
+            
+            self.expect(Tokens.COMMA)
+            children.append(self.parse_expression())
+            
+            if self.accept(Tokens.COMMA):
+                children.append(self.parse_expression())
+            
+            self.expect(Tokens.DO)
+            children.append(self.parse_block())
+            self.expect(Tokens.END)
+            
+            return self.add_node(Nodes.NUMERIC_FOR, first_token, tuple(children))
+        
+        children = [declaration]
+        
+        while self.accept(Tokens.COMMA):
+            children.append(self.parse_declaration(False))
+        
+        self.expect(Tokens.IN)
+        children.append(self.parse_expression_list())
+        
+        self.expect(Tokens.DO)
+        children.append(self.parse_block())
+        self.expect(Tokens.END)
+        
+        return self.add_node(Nodes.GENERIC_FOR, first_token, tuple(children))
+    
+    
+    def parse_expression_statement(self) -> int:
+        """Parses an assignment or a function call statement."""
+        
+        first_token = self.token_index()
+        expression = self.parse_suffixed_expression()
+        
+        if self.kind == Tokens.ASSIGN or self.kind == Tokens.COMMA:
+            targets: List[int] = [expression]
+            
+            while self.accept(Tokens.COMMA):
+                targets.append(self.parse_suffixed_expression())
+            
+            # Only the variables can be assigned (not the calls)
+            for target in targets:
+                if self.tree.kinds[target] not in (Nodes.IDENTIFIER, Nodes.INDEX, Nodes.FIELD):
+                    target_token = self.tree.first_tokens[target]
+                    raise ParserError("d2001", target_token, (self.tokens.text(target_token),))
+            
+            variable_list = self.add_node(Nodes.VARIABLE_LIST, first_token, tuple(targets))
+            
+            self.expect(Tokens.ASSIGN)
+            expression_list = self.parse_expression_list()
+            
+            return self.add_node(Nodes.ASSIGNMENT, first_token, (variable_list, expression_list))
+        
+        if self.tree.kinds[expression] not in (Nodes.CALL, Nodes.METHOD_CALL):
+            raise ParserError("d2001", self.token_index(), (self.near(),))
+        
+        return self.add_node(Nodes.CALL_STATEMENT, first_token, (expression,))
+    
+    
+    def parse_declaration(self, allow_attribute: bool) -> int:
+        """declaration ::= name [':' type] ['<' name '>']"""
+        
+        name_token = self.expect(Tokens.NAME)
+        type_annotation = self.parse_type_annotation()
+        attribute = -1
+        
+        if allow_attribute and self.kind == Tokens.LESS:
+            attribute_token = self.advance()
+            attribute_name_token = self.expect(Tokens.NAME)
+            self.expect(Tokens.GREATER)
+            
+            attribute = self.add_node(Nodes.ATTRIBUTE, attribute_token, value=attribute_name_token)
+        
+        return self.add_node(Nodes.DECLARATION, name_token, (type_annotation, attribute), name_token)
+    
+    
+    def parse_type_annotation(self) -> int:
+        """type_annotation ::= ':' name {'.' name}, returns -1 if there is no annotation."""
+        
+        if self.kind != Tokens.COLON:
+            return -1
+        
+        first_token = self.advance()
+        name_token = self.expect(Tokens.NAME)
+        
+        while self.kind == Tokens.DOT:
+            self.advance()
+            self.expect(Tokens.NAME)
+        
+        return self.add_node(Nodes.TYPE_ANNOTATION, first_token, value=name_token)
+    
+    
+    def parse_function_name(self) -> int:
+        """function_name ::= name {'.' name} [':' name]"""
+        
+        first_token = self.expect(Tokens.NAME)
+        
+        while self.accept(Tokens.DOT):
+            self.expect(Tokens.NAME)
+        
+        # Method definition, the value is the method name token
+        method_token = -1
+        
+        if self.accept(Tokens.COLON):
+            method_token = self.expect(Tokens.NAME)
+        
+        return self.add_node(Nodes.FUNCTION_NAME, first_token, value=method_token)
+    
+    
+    def parse_function_body(self) -> Tuple[int, int, int]:
+        """
+        function_body ::= '(' [parameters] ')' [':' type] block 'end'
+        
+        Returns:
+            Tuple[int, int, int]: The PARAMETERS node, the return TYPE_ANNOTATION node (-1 if none)
+                and the BLOCK node.
+        """
+        
+        first_token = self.expect(Tokens.LEFT_PAREN)
+        parameters: List[int] = []
+        
+        if self.kind != Tokens.RIGHT_PAREN:
+            while True:
+                if self.kind == Tokens.ELLIPSIS:
+                    vararg_token = self.advance()
+                    parameters.append(self.add_node(Nodes.VARARG, vararg_token))
+                    break
+                
+                parameters.append(self.parse_declaration(False))
+                
+                if not self.accept(Tokens.COMMA):
+                    break
+        
+        self.expect(Tokens.RIGHT_PAREN)
+        parameters_node = self.add_node(Nodes.PARAMETERS, first_token, tuple(parameters))
+        
+        return_type = self.parse_type_annotation()
+        block = self.parse_block()
+        self.expect(Tokens.END)
+        
+        return parameters_node, return_type, block
+    
+    
+    def parse_expression_list(self) -> int:
+        """expression_list ::= exp {',' exp}"""
+        
+        first_token = self.token_index()
+        expressions: List[int] = [self.parse_expression()]
+        
+        while self.accept(Tokens.COMMA):
+            expressions.append(self.parse_expression())
+        
+        return self.add_node(Nodes.EXPRESSION_LIST, first_token, tuple(expressions))
+    
+    
+    def parse_expression(self, limit: int = 0) -> int:
+        """
+        Parses an expression by precedence climbing, the binary operators
+        with a left priority higher than the limit are grouped.
+        """
+        
+        self.enter_level()
+        first_token = self.token_index()
+        
+        if self.kind in UNARY_OPERATOR_KINDS:
+            operator_kind = self.kind
+            self.advance()
+            
+            operand = self.parse_expression(UNARY_PRIORITY)
+            expression = self.add_node(Nodes.UNARY_OPERATION, first_token, (operand,), operator_kind)
+        else:
+            expression = self.parse_simple_expression()
+        
+        priorities = BINARY_PRIORITIES.get(self.kind)
+        
+        while priorities is not None and priorities[0] > limit:
+            operator_kind = self.kind
+            self.advance()
+            
+            right_operand = self.parse_expression(priorities[1])
+            expression = self.add_node(
+                Nodes.BINARY_OPERATION,
+                first_token,
+                (expression, right_operand),
+                operator_kind
+            )
+            
+            priorities = BINARY_PRIORITIES.get(self.kind)
+        
+        self.level -= 1
+        return expression
+    
+    
+    def parse_simple_expression(self) -> int:
+        """Parses a literal, a function, a table constructor or a suffixed expression."""
+        
+        kind = self.kind
+        first_token = self.token_index()
+        
+        literal_node = LITERAL_NODES.get(kind)
+        
+        if literal_node is not None:
+            self.advance()
+            return self.add_node(literal_node, first_token)
+        
+        if kind == Tokens.LEFT_BRACE:
+            return self.parse_table()
+        
+        if kind == Tokens.FUNCTION:
+            self.advance()
+            parameters, return_type, block = self.parse_function_body()
+            
+            return self.add_node(Nodes.FUNCTION_EXPRESSION, first_token, (parameters, return_type, block))
+        
+        return self.parse_suffixed_expression()
+    
+    
+    def parse_primary_expression(self) -> int:
+        """primary_expression ::= name | '(' exp ')'"""
+        
+        first_token = self.token_index()
+        
+        if self.kind == Tokens.NAME:
+            self.advance()
+            return self.add_node(Nodes.IDENTIFIER, first_token, value=first_token)
+        
+        if self.kind == Tokens.LEFT_PAREN:
+            self.advance()
+            expression = self.parse_expression()
+            self.expect(Tokens.RIGHT_PAREN)
+            
+            return self.add_node(Nodes.PARENTHESIZED, first_token, (expression,))
+        
+        raise ParserError("d2001", first_token, (self.near(),))
+    
+    
+    def parse_suffixed_expression(self) -> int:
+        """
+        suffixed_expression ::= primary_expression {'.' name | '[' exp ']' | ':' name arguments | arguments}
+        """
+        
+        first_token = self.token_index()
+        expression = self.parse_primary_expression()
+        
+        while True:
+            kind = self.kind
+            
+            if kind == Tokens.DOT:
+                self.advance()
+                name_token = self.expect(Tokens.NAME)
+                expression = self.add_node(Nodes.FIELD, first_token, (expression,), name_token)
+            elif kind == Tokens.LEFT_BRACKET:
+                self.advance()
+                key = self.parse_expression()
+                self.expect(Tokens.RIGHT_BRACKET)
+                expression = self.add_node(Nodes.INDEX, first_token, (expression, key))
+            elif kind == Tokens.COLON:
+                self.advance()
+                name_token = self.expect(Tokens.NAME)
+                arguments = self.parse_arguments()
+                expression = self.add_node(
+                    Nodes.METHOD_CALL,
+                    first_token,
+                    (expression, *arguments),
+                    name_token
+                )
+            elif kind in CALL_ARGUMENT_KINDS:
+                arguments = self.parse_arguments()
+                expression = self.add_node(Nodes.CALL, first_token, (expression, *arguments))
+            else:
+                return expression
+    
+    
+    def parse_arguments(self) -> Tuple[int, ...]:
+        """arguments ::= '(' [expression_list] ')' | table | string"""
+        
+        first_token = self.token_index()
+        
+        if self.kind == Tokens.STRING or self.kind == Tokens.LONG_STRING:
+            self.advance()
+            return (self.add_node(Nodes.STRING, first_token),)
+        
+        if self.kind == Tokens.LEFT_BRACE:
+            return (self.parse_table(),)
+        
+        self.expect(Tokens.LEFT_PAREN)
+        arguments: List[int] = []
+        
+        if self.kind != Tokens.RIGHT_PAREN:
+            arguments.append(self.parse_expression())
+            
+            while self.accept(Tokens.COMMA):
+                arguments.append(self.parse_expression())
+        
+        self.expect(Tokens.RIGHT_PAREN)
+        
+        return tuple(arguments)
+    
+    
+    def parse_table(self) -> int:
+        """table ::= '{' [field {(',' | ';') field} [(',' | ';')]] '}'"""
+        
+        first_token = self.expect(Tokens.LEFT_BRACE)
+        fields: List[int] = []
+        
+        while self.kind != Tokens.RIGHT_BRACE:
+            field_token = self.token_index()
+            
+            if self.kind == Tokens.LEFT_BRACKET:
+                self.advance()
+                key = self.parse_expression()
+                self.expect(Tokens.RIGHT_BRACKET)
+                self.expect(Tokens.ASSIGN)
+                value = self.parse_expression()
+                
+                fields.append(self.add_node(Nodes.INDEXED_FIELD, field_token, (key, value)))
+            elif self.kind == Tokens.NAME and self.peek() == Tokens.ASSIGN:
+                self.advance()
+                self.advance()
+                value = self.parse_expression()
+                
+                fields.append(self.add_node(Nodes.NAMED_FIELD, field_token, (value,), field_token))
+            else:
+                value = self.parse_expression()
+                fields.append(self.add_node(Nodes.POSITIONAL_FIELD, field_token, (value,)))
+            
+            if not self.accept(Tokens.COMMA) and not self.accept(Tokens.SEMICOLON):
+                break
+        
+        self.expect(Tokens.RIGHT_BRACE)
+        
+        return self.add_node(Nodes.TABLE, first_token, tuple(fields))
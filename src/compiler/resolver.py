@@ -0,0 +1,178 @@
+from compiler import Files
+
+from typing import Any, Dict, Optional, Set
+from pathlib import Path
+
+import hashlib
+import json
+import os
+
+
+class ConfigResolver:
+    """
+    Resolves the effective config of the project directories on demand (DPC102),
+    a config file is only loaded when a directory below it is resolved for the first time,
+    then merged with the effective config of its parent directory.
+    
+    Note:
+        The effective configs are shared between the directories that don't have
+        their own config file, they must be treated as read-only.
+    """
+    
+    def __init__(
+        self,
+        project_dir_path: Path,
+        default_config: Optional[Dict[str, Any]] = None,
+        filename: str = "clua.config.yaml"
+    ):
+        # Path of the project directory (root of the config inheritance)
+        self.project_dir_path: Path = project_dir_path
+        
+        # Compiler default config (base of the root directory)
+        self.default_config: Dict[str, Any] = default_config or {}
+        
+        # Name of the user config files
+        self.filename: str = filename
+        
+        # Known config file paths (found by the project walker),
+        # None checks the existence of the config file of every resolved directory
+        self.config_paths: Optional[Set[Path]] = None
+        
+        # Loaded config file dicts (None if the file cannot be loaded)
+        self.loaded_config_dicts: Dict[Path, Optional[Dict[str, Any]]] = {}
+        
+        # Effective configs and their hashes, memoized per directory
+        self.effective_configs: Dict[Path, Dict[str, Any]] = {}
+        self.config_hashes: Dict[Path, str] = {}
+    
+    
+    @staticmethod
+    def merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merges two configs, nested dicts are merged recursively,
+        any other value of the override replaces the base one.
+        
+        Args:
+            base (Dict[str, Any]): The parent config.
+            override (Dict[str, Any]): The child config.
+        
+        Returns:
+            Dict[str, Any]: A new merged config.
+        """
+        
+        merged: Dict[str, Any] = dict(base)
+        
+        for key, value in override.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = ConfigResolver.merge(merged[key], value)
+            else:
+                merged[key] = value
+        
+        return merged
+    
+    
+    def load_config(self, dir_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Loads the config file of a directory (once), the loaded content is stored
+        inside ConfigResolver.loaded_config_dicts.
+        
+        Args:
+            dir_path (Path): The path of the directory.
+        
+        Returns:
+            Optional[Dict[str, Any]]: The content of the config file,
+                or None if the directory doesn't have one.
+        """
+        
+        config_path = dir_path / self.filename
+        
+        if config_path in self.loaded_config_dicts:
+            return self.loaded_config_dicts[config_path]
+        
+        if self.config_paths is not None:
+            if config_path not in self.config_paths:
+                return None
+        elif not os.path.isfile(config_path):
+            return None
+        
+        content = Files.load_yaml(config_path)
+        self.loaded_config_dicts[config_path] = content
+        
+        return content
+    
+    
+    def resolve(self, dir_path: Path) -> Dict[str, Any]:
+        """
+        Returns the effective config of a project directory.
+        
+        Args:
+            dir_path (Path): The path of the directory.
+        
+        Returns:
+            Dict[str, Any]: The compiler default config, merged with the config files
+                from the project directory down to this directory.
+        """
+        
+        effective_config = self.effective_configs.get(dir_path)
+        
+        if effective_config is not None:
+            return effective_config
+        
+        # The inheritance stops at the project directory
+        if dir_path == self.project_dir_path or self.project_dir_path not in dir_path.parents:
+            effective_config = self.default_config
+        else:
+            effective_config = self.resolve(dir_path.parent)
+        
+        config = self.load_config(dir_path)
+        
+        if config:
+            effective_config = ConfigResolver.merge(effective_config, config)
+        
+        self.effective_configs[dir_path] = effective_config
+        return effective_config
+    
+    
+    def resolve_file(self, cf_path: Path) -> Dict[str, Any]:
+        """Returns the effective config of a clua file (config of its directory)."""
+        
+        return self.resolve(cf_path.parent)
+    
+    
+    def get_config_hash(self, dir_path: Path) -> str:
+        """Returns the hash of the effective config of a directory (memoized)."""
+        
+        config_hash = self.config_hashes.get(dir_path)
+        
+        if config_hash is None:
+            serialized_config = json.dumps(self.resolve(dir_path), sort_keys=True, default=str)
+            config_hash = hashlib.sha256(serialized_config.encode()).hexdigest()
+            self.config_hashes[dir_path] = config_hash
+        
+        return config_hash
+    
+    
+    def invalidate(self, config_path: Path, exists: bool = True):
+        """
+        Forgets a config file (modified, added or removed) and the effective configs
+        of its directory and all the directories below it.
+        
+        Args:
+            config_path (Path): The path of the config file.
+            exists (bool, optional): False if the config file has been removed.
+        """
+        
+        dir_path = config_path.parent
+        
+        self.loaded_config_dicts.pop(config_path, None)
+        
+        if self.config_paths is not None:
+            if exists:
+                self.config_paths.add(config_path)
+            else:
+                self.config_paths.discard(config_path)
+        
+        for memoized_dir_path in list(self.effective_configs):
+            if memoized_dir_path == dir_path or dir_path in memoized_dir_path.parents:
+                del self.effective_configs[memoized_dir_path]
+                self.config_hashes.pop(memoized_dir_path, None)
@@ -1,10 +1,635 @@
-from compiler import Paths, Register, Operator
+from compiler import SourceBuffer, LineIndex
+from compiler.contexts import Types, TokenStream, SymbolTable, Prescan
 
-from typing import Optional, TextIO
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Set, Tuple, Union
+
+from contextlib import nullcontext
+from bisect import bisect_right
 from pathlib import Path
+from array import array
+
+import mmap
+import os
+import re
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+Tokens = Types.Tokens
+
+# Token patterns, the order matters as the master pattern tries them from top to bottom
+# (numbers before dots, longest operators first)
+TOKEN_PATTERNS: List[Tuple[str, bytes]] = [
+    # Comments (long comments must be tried before the line comments)
+    ("LONG_COMMENT", rb"--\[(?P<LONG_COMMENT_LEVEL>=*)\[.*?\](?P=LONG_COMMENT_LEVEL)\]"),
+    ("UNFINISHED_LONG_COMMENT", rb"--\[=*\[.*"),
+    ("COMMENT", rb"--[^\n]*"),
+    
+    # Names (keywords are scanned as names, see KEYWORD_CANDIDATES)
+    ("NAME", rb"[A-Za-z_][A-Za-z0-9_]*"),
+    
+    # Numbers (hexadecimal with optional binary exponent, decimal with optional exponent)
+    ("NUMBER", (
+        rb"0[xX](?:[0-9a-fA-F]+(?:\.[0-9a-fA-F]*)?|\.[0-9a-fA-F]+)(?:[pP][+-]?[0-9]+)?"
+        rb"|(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+    )),
+    
+    # Strings
+    ("STRING", rb""""(?:[^"\\\n]|\\z\s*|\\.)*"|'(?:[^'\\\n]|\\z\s*|\\.)*'"""),
+    ("UNFINISHED_STRING", rb"""["'](?:[^\\\n]|\\.)*"""),
+    ("LONG_STRING", rb"\[(?P<LONG_STRING_LEVEL>=*)\[.*?\](?P=LONG_STRING_LEVEL)\]"),
+    ("UNFINISHED_LONG_STRING", rb"\[=*\[.*"),
+    
+    # Operators & punctuation
+    ("ELLIPSIS", rb"\.\.\."),
+    ("CONCAT", rb"\.\."),
+    ("DOT", rb"\."),
+    ("EQUAL", rb"=="),
+    ("ASSIGN", rb"="),
+    ("LEFT_PAREN", rb"\("),
+    ("RIGHT_PAREN", rb"\)"),
+    ("COMMA", rb","),
+    ("LEFT_BRACE", rb"\{"),
+    ("RIGHT_BRACE", rb"\}"),
+    ("LEFT_BRACKET", rb"\["),
+    ("RIGHT_BRACKET", rb"\]"),
+    ("DOUBLE_COLON", rb"::"),
+    ("COLON", rb":"),
+    ("SEMICOLON", rb";"),
+    ("MINUS", rb"-"),
+    ("PLUS", rb"\+"),
+    ("STAR", rb"\*"),
+    ("DOUBLE_SLASH", rb"//"),
+    ("SLASH", rb"/"),
+    ("PERCENT", rb"%"),
+    ("CARET", rb"\^"),
+    ("HASH", rb"\#"),
+    ("AMPERSAND", rb"&"),
+    ("NOT_EQUAL", rb"~="),
+    ("TILDE", rb"~"),
+    ("PIPE", rb"\|"),
+    ("SHIFT_LEFT", rb"<<"),
+    ("LESS_EQUAL", rb"<="),
+    ("LESS", rb"<"),
+    ("SHIFT_RIGHT", rb">>"),
+    ("GREATER_EQUAL", rb">="),
+    ("GREATER", rb">"),
+    
+    # Anything else (single character, including non-ASCII bytes),
+    # whitespace is excluded so the trailing whitespace of a buffer doesn't match
+    ("INVALID_CHARACTER", rb"[^ \t\r\n\f\v]"),
+]
+
+
+# Master pattern, leading whitespace is consumed by the match itself,
+# so every match corresponds to exactly one token
+# (except for the trailing whitespace of the buffer, where no group matches)
+MASTER_PATTERN: "re.Pattern[bytes]" = re.compile(
+    rb"[ \t\r\n\f\v]*(?:"
+    + b"|".join(
+        b"(?P<" + name.encode() + b">" + pattern + b")"
+        for name, pattern in TOKEN_PATTERNS
+    )
+    + b")",
+    re.DOTALL
+)
+
+# Token kind id of every group index of the master pattern (None for the inner groups)
+GROUP_KINDS: List[Optional[int]] = [None] * (MASTER_PATTERN.groups + 1)
+
+for group_name, group_index in MASTER_PATTERN.groupindex.items():
+    if group_name in Tokens.__members__:
+        GROUP_KINDS[group_index] = Tokens[group_name].value
+
+# Comments and strings of the prescan, the search only stops on their first byte
+# (charset), then the lookbehind selects the rest of the matching token pattern
+# (same patterns as COMMENT/LONG_COMMENT and STRING/LONG_STRING and their unfinished forms)
+PRESCAN_PATTERN: "re.Pattern[bytes]" = re.compile(
+    rb"[-\"'\[](?:"
+    rb"(?<=-)-(?:\[(=*)\[.*?\]\1\]|\[=*\[.*|[^\n]*)"
+    rb"|(?<=\")(?:(?:[^\"\\\n]|\\z\s*|\\.)*\"|(?:[^\\\n]|\\.)*)"
+    rb"|(?<=')(?:(?:[^'\\\n]|\\z\s*|\\.)*'|(?:[^\\\n]|\\.)*)"
+    rb"|(?<=\[)(?:(=*)\[.*?\]\2\]|=*\[.*)"
+    rb")",
+    re.DOTALL
+)
+
+# First byte of the comments ("-")
+PRESCAN_COMMENT_BYTE: int = ord("-")
+
+# Statement terminators, the chunks of a parallel scan start after one of them
+# (outside the strings and the comments, so no token spans two chunks)
+CHUNK_BOUNDARY_PATTERN: "re.Pattern[bytes]" = re.compile(rb"[;\n]")
+
+# Minimum chunk size of a parallel scan (smaller buffers are scanned in a single process)
+PARALLEL_SCAN_MIN_CHUNK_SIZE: int = 1 << 20
+
+# Keywords indexed by their first byte and their length (first_byte * 16 + length),
+# names are resolved into keywords with this table, without being sliced from the buffer
+KEYWORD_CANDIDATES: Dict[int, List[Tuple[bytes, int]]] = {}
+
+for keyword_kind in Tokens:
+    if Tokens.AND <= keyword_kind <= Tokens.WHILE:
+        keyword = keyword_kind.name.lower().encode()
+        KEYWORD_CANDIDATES.setdefault(keyword[0] * 16 + len(keyword), []).append(
+            (keyword, keyword_kind.value)
+        )
+
+KEYWORD_MAX_LENGTH: int = 8
+
+# Token kinds that can be merged with the following tokens by an edit
+# (long bracket openers "[==[", comment openers "--", numbers exponents, "..", "==")
+MERGEABLE_KINDS: Set[int] = {
+    Tokens.LEFT_BRACKET.value,
+    Tokens.ASSIGN.value,
+    Tokens.EQUAL.value,
+    Tokens.MINUS.value,
+    Tokens.PLUS.value,
+    Tokens.DOT.value,
+    Tokens.CONCAT.value,
+    Tokens.NUMBER.value,
+}
+
+# Diagnostic codes of the invalid token kinds (diagnostic_messages.yaml)
+DIAGNOSTIC_CODES: Dict[int, str] = {
+    Tokens.INVALID_CHARACTER.value: "d1001",
+    Tokens.UNFINISHED_STRING.value: "d1002",
+    Tokens.UNFINISHED_LONG_STRING.value: "d1003",
+    Tokens.UNFINISHED_LONG_COMMENT.value: "d1004",
+}
+
+# Tokens interned into the symbol table (identifiers and string literals)
+SYMBOL_KINDS: Set[int] = {
+    Tokens.NAME.value,
+    Tokens.STRING.value,
+    Tokens.LONG_STRING.value,
+}
 
 
 class Scanner:
+    """Converts the content of a clua file buffer into tokens."""
+    
+    @staticmethod
+    def tokenize(
+        data: Union[bytes, mmap.mmap, SourceBuffer],
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Generator[Tuple[int, int, int], None, None]:
+        """
+        Tokenizes a buffer (or a part of it) in a single pass of the master pattern,
+        whitespace is skipped and no substring is allocated per token.
+        
+        Args:
+            data (Union[bytes, mmap.mmap, SourceBuffer]): The buffer to tokenize.
+            start (int, optional): The offset where the tokenization starts.
+            end (int, optional): The offset where the tokenization stops
+                (defaults to the end of the buffer).
+        
+        Returns:
+            Generator[Tuple[int, int, int], None, None]: Compact tokens (kind id, start offset, length).
+        """
+        
+        if isinstance(data, SourceBuffer):
+            data = data.data
+        
+        if end is None:
+            end = len(data)
+        
+        group_kinds = GROUP_KINDS
+        keyword_candidates = KEYWORD_CANDIDATES
+        name_kind = Tokens.NAME.value
+        find = data.find
+        
+        for match in MASTER_PATTERN.finditer(data, start, end):
+            group_index = match.lastindex
+            
+            # Trailing whitespace
+            if group_index is None:
+                return
+            
+            token_start, token_end = match.span(group_index)
+            token_kind = group_kinds[group_index]
+            
+            # Keyword resolution (compares the buffer in place)
+            if token_kind == name_kind and token_end - token_start <= KEYWORD_MAX_LENGTH:
+                candidates = keyword_candidates.get(data[token_start] * 16 + token_end - token_start)
+                
+                if candidates is not None:
+                    for keyword, keyword_kind in candidates:
+                        if find(keyword, token_start, token_end) == token_start:
+                            token_kind = keyword_kind
+                            break
+            
+            yield token_kind, token_start, token_end - token_start
+    
+    
+    @staticmethod
+    def prescan(data: Union[bytes, mmap.mmap, SourceBuffer]) -> Prescan:
+        """
+        Locates the lines, the comments and the string literals of a buffer with two
+        bulk searches (no token is built), so the comments can be removed or skipped
+        wholesale (compilerOptions.removeComments).
+        
+        Args:
+            data (Union[bytes, mmap.mmap, SourceBuffer]): The buffer to prescan.
+        
+        Returns:
+            Prescan: The line index, the comment spans and the string spans.
+        """
+        
+        if isinstance(data, SourceBuffer):
+            data = data.data
+        
+        prescan = Prescan(LineIndex.from_buffer(data))
+        
+        comment_starts, comment_ends = prescan.comment_starts, prescan.comment_ends
+        string_starts, string_ends = prescan.string_starts, prescan.string_ends
+        
+        for match in PRESCAN_PATTERN.finditer(data):
+            span_start, span_end = match.span()
+            
+            if data[span_start] == PRESCAN_COMMENT_BYTE:
+                comment_starts.append(span_start)
+                comment_ends.append(span_end)
+            else:
+                string_starts.append(span_start)
+                string_ends.append(span_end)
+        
+        return prescan
+    
+    
+    @staticmethod
+    def scan(
+        buffer: SourceBuffer,
+        start: int = 0,
+        end: Optional[int] = None,
+        symbol_table: Optional[SymbolTable] = None
+    ) -> TokenStream:
+        """
+        Tokenizes a buffer into a token stream.
+        
+        Args:
+            buffer (SourceBuffer): The buffer to tokenize.
+            start (int, optional): The offset where the tokenization starts.
+            end (int, optional): The offset where the tokenization stops
+                (defaults to the end of the buffer).
+            symbol_table (SymbolTable, optional): Interns the identifiers and string literals.
+        
+        Returns:
+            TokenStream: The compact token stream, bound to the buffer.
+        """
+        
+        token_stream = TokenStream(buffer)
+        token_stream.extend(Scanner.tokenize(buffer, start, end))
+        
+        if symbol_table is not None:
+            Scanner.intern_symbols(token_stream, symbol_table)
+        
+        return token_stream
+    
+    
+    @staticmethod
+    def find_chunk_boundaries(buffer: SourceBuffer, prescan: Prescan, chunk_count: int) -> List[int]:
+        """
+        Splits a buffer into chunks of similar sizes, every chunk boundary follows a statement
+        terminator (";" or a newline) outside the strings and the comments.
+        
+        Args:
+            buffer (SourceBuffer): The buffer to split.
+            prescan (Prescan): The prescan of the buffer (Scanner.prescan()).
+            chunk_count (int): The wanted number of chunks (fewer if there are not enough terminators).
+        
+        Returns:
+            List[int]: The boundaries, from 0 to the buffer size (chunk i is boundaries[i:i + 2]).
+        """
+        
+        boundaries: List[int] = [0]
+        chunk_size = buffer.size // chunk_count
+        
+        for chunk_index in range(1, chunk_count):
+            target_offset = max(chunk_index * chunk_size, boundaries[-1])
+            
+            for match in CHUNK_BOUNDARY_PATTERN.finditer(buffer.data, target_offset):
+                terminator_offset = match.start()
+                
+                if prescan.comment_at(terminator_offset) is None and prescan.string_at(terminator_offset) is None:
+                    if match.end() < buffer.size:
+                        boundaries.append(match.end())
+                    
+                    break
+        
+        boundaries.append(buffer.size)
+        
+        return boundaries
+    
+    
+    @staticmethod
+    def tokenize_chunk(
+        cf_path: Optional[Path],
+        chunk: Optional[bytes],
+        start: int,
+        end: int
+    ) -> Tuple["array[int]", "array[int]", "array[int]"]:
+        """
+        Tokenizes a chunk of a buffer (worker processes of scan_parallel()).
+        
+        Args:
+            cf_path (Path, optional): The path of the mapped source file, the worker maps
+                the same file (shared page cache, nothing is copied).
+            chunk (bytes, optional): The chunk content, for the buffers without file.
+            start (int): The start offset of the chunk inside the buffer.
+            end (int): The end offset of the chunk inside the buffer.
+        
+        Returns:
+            Tuple[array[int], array[int], array[int]]: The kinds, the offsets (inside the buffer)
+                and the lengths of the chunk tokens.
+        """
+        
+        kinds, offsets, lengths = array("H"), array("I"), array("I")
+        
+        if cf_path is not None:
+            with open(cf_path, "rb") as cf_file:
+                with mmap.mmap(cf_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    for kind, offset, length in Scanner.tokenize(data, start, end):
+                        kinds.append(kind)
+                        offsets.append(offset)
+                        lengths.append(length)
+        else:
+            for kind, offset, length in Scanner.tokenize(chunk or b""):
+                kinds.append(kind)
+                offsets.append(start + offset)
+                lengths.append(length)
+        
+        return kinds, offsets, lengths
+    
+    
+    @staticmethod
+    def scan_parallel(
+        buffer: SourceBuffer,
+        max_workers: Optional[int] = None,
+        symbol_table: Optional[SymbolTable] = None,
+        executor: Optional["Executor"] = None,
+        min_chunk_size: int = PARALLEL_SCAN_MIN_CHUNK_SIZE
+    ) -> TokenStream:
+        """
+        Tokenizes a large buffer across multiple processes, the buffer is split at the
+        statement terminators found by the prescan, the chunk streams are stitched
+        in order, then every seam is verified against a sequential tokenization.
+        
+        Args:
+            buffer (SourceBuffer): The buffer to tokenize.
+            max_workers (int, optional): The number of worker processes (defaults to the number of CPUs).
+            symbol_table (SymbolTable, optional): Interns the identifiers and string literals.
+            executor (Executor, optional): A resident process pool, used instead of starting new workers.
+            min_chunk_size (int, optional): The minimum size of a chunk in bytes,
+                the buffers smaller than two chunks are scanned by Scanner.scan().
+        
+        Returns:
+            TokenStream: The compact token stream, bound to the buffer (same as Scanner.scan()).
+        """
+        
+        chunk_count = min(max_workers or os.cpu_count() or 1, buffer.size // max(min_chunk_size, 1))
+        
+        if chunk_count <= 1:
+            return Scanner.scan(buffer, symbol_table=symbol_table)
+        
+        boundaries = Scanner.find_chunk_boundaries(buffer, Scanner.prescan(buffer), chunk_count)
+        chunk_spans = list(zip(boundaries, boundaries[1:]))
+        
+        if len(chunk_spans) <= 1:
+            return Scanner.scan(buffer, symbol_table=symbol_table)
+        
+        # Mapped files are shared through the page cache, only the in-memory buffers are sent
+        cf_path = buffer.path if isinstance(buffer.data, mmap.mmap) else None
+        chunks = [None if cf_path is not None else bytes(buffer.data[start:end]) for start, end in chunk_spans]
+        
+        # Imported on demand (multiprocessing is slow to import)
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with nullcontext(executor) if executor is not None else ProcessPoolExecutor(len(chunk_spans)) as worker_pool:
+            chunk_tokens = list(worker_pool.map(
+                Scanner.tokenize_chunk,
+                [cf_path] * len(chunk_spans),
+                chunks,
+                boundaries[:-1],
+                boundaries[1:]
+            ))
+        
+        token_stream = TokenStream(buffer)
+        seam_indexes: List[int] = []
+        
+        for kinds, offsets, lengths in chunk_tokens:
+            seam_indexes.append(len(token_stream))
+            
+            token_stream.kinds.extend(kinds)
+            token_stream.offsets.extend(offsets)
+            token_stream.lengths.extend(lengths)
+        
+        # The last token before every seam is tokenized again with the first one after it
+        for seam_index in seam_indexes[1:]:
+            if not Scanner.verify_seam(token_stream, seam_index):
+                return Scanner.scan(buffer, symbol_table=symbol_table)
+        
+        if symbol_table is not None:
+            Scanner.intern_symbols(token_stream, symbol_table)
+        
+        return token_stream
+    
+    
+    @staticmethod
+    def verify_seam(token_stream: TokenStream, seam_index: int) -> bool:
+        """
+        Returns True if the tokens around a seam of stitched chunks are the same
+        as the tokens of a sequential tokenization (no token has been split).
+        
+        Args:
+            token_stream (TokenStream): The stitched token stream (bound to its buffer).
+            seam_index (int): The index of the first token of a chunk.
+        
+        Returns:
+            bool: False if the chunks have to be tokenized again sequentially.
+        """
+        
+        first_index = max(seam_index - 1, 0)
+        
+        if first_index >= len(token_stream):
+            return True
+        
+        expected_tokens = token_stream[first_index:seam_index + 1]
+        sequential_tokens = Scanner.tokenize(token_stream.buffer, token_stream.offsets[first_index])
+        
+        for expected_token in expected_tokens:
+            if next(sequential_tokens, None) != expected_token:
+                return False
+        
+        return True
+    
+    
+    @staticmethod
+    def intern_symbols(token_stream: TokenStream, symbol_table: SymbolTable):
+        """
+        Interns the identifiers and string literals of a stream, their text is sliced
+        from the buffer once per token and only stored once per distinct text.
+        
+        Args:
+            token_stream (TokenStream): The scanned token stream (bound to its buffer).
+            symbol_table (SymbolTable): The interning table.
+        """
+        
+        data = token_stream.buffer.data
+        symbol_kinds = SYMBOL_KINDS
+        ids = symbol_table.ids
+        intern = symbol_table.intern
+        
+        symbols = array("I", [0]) * len(token_stream)
+        
+        for index, (kind, offset, length) in enumerate(token_stream):
+            if kind in symbol_kinds:
+                raw = data[offset:offset + length]
+                symbol_id = ids.get(raw)
+                
+                symbols[index] = symbol_id if symbol_id is not None else intern(raw)
+        
+        token_stream.symbols = symbols
+    
+    
+    @staticmethod
+    def collect_diagnostics(token_stream: TokenStream) -> List[Tuple[str, int, Tuple[Any, ...]]]:
+        """
+        Returns the diagnostics of the invalid tokens of a stream.
+        
+        Args:
+            token_stream (TokenStream): The scanned token stream (bound to its buffer).
+        
+        Returns:
+            List[Tuple[str, int, Tuple[Any, ...]]]: The diagnostics as (code, offset, args).
+        """
+        
+        diagnostics: List[Tuple[str, int, Tuple[Any, ...]]] = []
+        
+        # Invalid kinds are the lowest kind ids (after EOF), valid streams are skipped
+        if min(token_stream.kinds, default=Tokens.NAME) >= Tokens.NAME:
+            return diagnostics
+        
+        for index, kind in enumerate(token_stream.kinds):
+            if 0 < kind < Tokens.NAME:
+                code = DIAGNOSTIC_CODES[kind]
+                args = (token_stream.text(index),) if kind == Tokens.INVALID_CHARACTER else ()
+                
+                diagnostics.append((code, token_stream.offsets[index], args))
+        
+        return diagnostics
+    
+    
     @staticmethod
-    def tokenize(input_line: str):
-        pass
\ No newline at end of file
+    def rescan(
+        token_stream: TokenStream,
+        new_buffer: SourceBuffer,
+        edit_start: int,
+        edit_old_end: int,
+        edit_new_end: int,
+        symbol_table: Optional[SymbolTable] = None
+    ) -> TokenStream:
+        """
+        Re-tokenizes only the region affected by an edit, the lexing stops as soon as
+        a new token starts at the (shifted) position of an old token after the edit,
+        as the scanner has no state between tokens.
+        
+        Args:
+            token_stream (TokenStream): The token stream of the buffer before the edit.
+            new_buffer (SourceBuffer): The buffer after the edit.
+            edit_start (int): The offset where the edit starts.
+            edit_old_end (int): The offset where the replaced text ended (before the edit).
+            edit_new_end (int): The offset where the inserted text ends (after the edit).
+            symbol_table (SymbolTable, optional): Interns the identifiers and string literals
+                of the new stream (only the re-tokenized ones if the old stream is interned).
+        
+        Returns:
+            TokenStream: The token stream of the new buffer.
+        """
+        
+        old_kinds = token_stream.kinds
+        old_offsets = token_stream.offsets
+        old_lengths = token_stream.lengths
+        delta = edit_new_end - edit_old_end
+        
+        # Last token starting before the edit
+        first_index = max(bisect_right(old_offsets, edit_start) - 1, 0)
+        
+        def is_glued(index: int) -> bool:
+            """Returns True if a token ends where the next one starts."""
+            
+            return old_offsets[index] + old_lengths[index] == old_offsets[index + 1]
+        
+        # Steps back over the contiguous tokens that could be merged by the edit
+        # (the exponent/hex digits glued to a number, "1e" or "0x", are lexed as a name)
+        steps = 0
+        
+        while first_index > 0 and is_glued(first_index - 1) and (
+            steps == 0
+            or old_kinds[first_index - 1] in MERGEABLE_KINDS
+            or (
+                old_kinds[first_index - 1] == Tokens.NAME
+                and first_index > 1
+                and old_kinds[first_index - 2] == Tokens.NUMBER
+                and is_glued(first_index - 2)
+            )
+        ):
+            first_index -= 1
+            steps += 1
+        
+        restart_offset = old_offsets[first_index] if first_index < len(old_offsets) else edit_start
+        restart_offset = min(restart_offset, edit_start)
+        
+        # First old token after the edit (resynchronization candidate)
+        old_index = bisect_right(old_offsets, edit_old_end - 1) if edit_old_end > 0 else 0
+        old_count = len(old_offsets)
+        
+        new_kinds = old_kinds[:first_index]
+        new_offsets = old_offsets[:first_index]
+        new_lengths = old_lengths[:first_index]
+        
+        # The symbols of the unchanged tokens are reused
+        old_symbols = token_stream.symbols if symbol_table is not None else None
+        new_symbols = old_symbols[:first_index] if old_symbols is not None else None
+        data = new_buffer.data
+        
+        for kind, offset, length in Scanner.tokenize(new_buffer, restart_offset):
+            if offset >= edit_new_end:
+                old_offset = offset - delta
+                
+                while old_index < old_count and old_offsets[old_index] < old_offset:
+                    old_index += 1
+                
+                # Converged, the remaining old tokens are shifted by the edit delta
+                if (
+                    old_index < old_count
+                    and old_offsets[old_index] == old_offset
+                    and old_kinds[old_index] == kind
+                ):
+                    new_kinds.extend(old_kinds[old_index:])
+                    new_offsets.extend(array("I", map(delta.__add__, old_offsets[old_index:])))
+                    new_lengths.extend(old_lengths[old_index:])
+                    
+                    if new_symbols is not None:
+                        new_symbols.extend(old_symbols[old_index:])
+                    
+                    break
+            
+            new_kinds.append(kind)
+            new_offsets.append(offset)
+            new_lengths.append(length)
+            
+            if new_symbols is not None:
+                new_symbols.append(
+                    symbol_table.intern(data[offset:offset + length]) if kind in SYMBOL_KINDS else 0
+                )
+        
+        new_token_stream = TokenStream(new_buffer, new_kinds, new_offsets, new_lengths, new_symbols)
+        
+        # The old stream wasn't interned, the whole new stream is
+        if symbol_table is not None and new_symbols is None:
+            Scanner.intern_symbols(new_token_stream, symbol_table)
+        
+        return new_token_stream
@@ -0,0 +1,390 @@
+from compiler import Loader, Driver, Watcher, Cli
+from compiler.contexts import FileContext, ProjectContext
+from compiler.client import Client
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from pathlib import Path
+
+import socketserver
+import threading
+import argparse
+import json
+import stat
+import sys
+import io
+import os
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+# Maximum number of resident projects, the least recently compiled ones are evicted
+MAX_PROJECTS = 8
+
+
+class Server:
+    """
+    Compilation server (clua serve), keeps the compiler data, the project states and
+    the worker processes resident, so the clients skip the whole cold start.
+    
+    Note:
+        Every connection is handled by its own thread, the files of a request are compiled
+        by the shared process pool. Every project has its own state and lock, so the requests
+        of different projects are compiled at the same time (the requests of the same project
+        wait for each other).
+    """
+    
+    class Project:
+        """Resident state of a compiled project (project context, watcher and file contexts)."""
+        
+        def __init__(self, watcher: Watcher):
+            # Polls the project files since the previous request (incremental rebuild),
+            # its project context holds the project tree, configs, trace, tokens and symbols
+            self.watcher: Watcher = watcher
+            
+            # Last compilation context of every file of the trace
+            self.contexts: Dict[Path, FileContext] = {}
+            
+            # Held while the project is compiled (one request of the project at a time)
+            self.lock: threading.Lock = threading.Lock()
+            
+            # False until the first request loads and compiles the project
+            self.loaded: bool = False
+        
+        
+        @property
+        def context(self) -> ProjectContext:
+            return self.watcher.project
+        
+        
+        def update(self, contexts: List[FileContext]) -> List[FileContext]:
+            """
+            Stores the recompiled contexts and drops the files removed from the trace.
+            
+            Returns:
+                List[FileContext]: The contexts of all the files of the trace (trace order).
+            """
+            
+            for context in contexts:
+                self.contexts[context.cf_path] = context
+            
+            clua_trace = self.context.clua_trace or []
+            self.contexts = {cf_path: self.contexts[cf_path] for cf_path in clua_trace if cf_path in self.contexts}
+            
+            return list(self.contexts.values())
+    
+    
+    class RequestHandler(socketserver.StreamRequestHandler):
+        """Reads the requests of a connection (one JSON object per line) and writes the responses."""
+        
+        def handle(self):
+            server: "Server" = getattr(self.server, "compilation_server")
+            
+            for request_line in self.rfile:
+                try:
+                    request = json.loads(request_line)
+                except ValueError:
+                    request = {}
+                
+                response = server.handle_request(request if isinstance(request, dict) else {})
+                
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+    
+    
+    def __init__(self, socket_path: Path, max_workers: Optional[int] = None, max_projects: int = MAX_PROJECTS):
+        # Path of the Unix domain socket
+        self.socket_path: Path = socket_path
+        
+        # Number of worker processes (defaults to the number of CPUs)
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        
+        # Resident project states, keyed by (project directory, cache directory, emit),
+        # from the least to the most recently compiled one
+        self.projects: Dict[Tuple[Path, Optional[Path], bool], Server.Project] = {}
+        self.max_projects: int = max(max_projects, 1)
+        
+        # Only held while the resident projects are looked up (never while compiling)
+        self.lock: threading.Lock = threading.Lock()
+        
+        # Worker processes shared by all the requests (None compiles inside the server process)
+        self.executor: Optional["ProcessPoolExecutor"] = None
+        self.socket_server: Optional[socketserver.ThreadingUnixStreamServer] = None
+    
+    
+    def get_project(self, project_key: Tuple[Path, Optional[Path], bool]) -> "Server.Project":
+        """
+        Returns the resident state of a project (created if needed) and marks it as the most
+        recently compiled one, the least recently compiled projects over max_projects are evicted.
+        
+        Note:
+            An evicted project is only released once its running request ends,
+            its next request loads and compiles it again.
+        """
+        
+        project_dir_path, cache_dir_path, emit = project_key
+        
+        with self.lock:
+            project = self.projects.pop(project_key, None)
+            
+            if project is None:
+                watcher = Watcher(
+                    project_dir_path,
+                    self.max_workers,
+                    cache_dir_path,
+                    emit=emit,
+                    executor=self.executor,
+                    project=ProjectContext()
+                )
+                project = Server.Project(watcher)
+            
+            # Dicts keep the insertion order, the first key is the least recently compiled one
+            self.projects[project_key] = project
+            
+            while len(self.projects) > self.max_projects:
+                del self.projects[next(iter(self.projects))]
+        
+        return project
+    
+    
+    def compile(
+        self,
+        project_dir_path: Path,
+        use_cache: bool = True,
+        emit: bool = False,
+        snippets: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Compiles a project, the first request loads it and compiles every file,
+        the next ones only recompile the files changed since the previous request.
+        
+        Args:
+            project_dir_path (Path): The absolute path of the project directory.
+            use_cache (bool, optional): Uses the on-disk compile cache of the project.
+            emit (bool, optional): Writes the Lua output of every clua file beside it.
+            snippets (bool, optional): Adds the source line under every diagnostic.
+        
+        Returns:
+            Dict[str, Any]: The response (reported diagnostics, exit code and file counts).
+        """
+        
+        cache_dir_path = project_dir_path / ".clua_cache" if use_cache else None
+        project_key = (project_dir_path, cache_dir_path, emit)
+        project = self.get_project(project_key)
+        
+        with project.lock:
+            project_context = project.context
+            
+            if not project.loaded:
+                if not Loader.initialize_project(project_dir_path, project_context):
+                    with self.lock:
+                        if self.projects.get(project_key) is project:
+                            del self.projects[project_key]
+                    
+                    return {"status": "error", "message": f"Invalid or empty project: {project_dir_path}"}
+                
+                project.watcher.take_snapshot()
+                
+                import_graph = project_context.import_graph
+                compiled_contexts = Driver.compile_trace(
+                    project_context.clua_trace or [],
+                    self.max_workers,
+                    cache_dir_path,
+                    emit,
+                    import_graph.topological_waves() if import_graph is not None else None,
+                    self.executor,
+                    project_context
+                )
+                
+                project.loaded = True
+            else:
+                changed_paths = project.watcher.poll()
+                
+                compiled_contexts = project.watcher.rebuild(changed_paths) if len(changed_paths) > 0 else []
+            
+            contexts = project.update(compiled_contexts)
+            
+            # Symbols of the removed and edited files
+            project_context.trim_symbols()
+            
+            output_file = io.StringIO()
+            error_count = Cli.report(contexts, snippets, output_file, project_context)
+        
+        return {
+            "status": "ok",
+            "exitCode": 1 if error_count > 0 else 0,
+            "output": output_file.getvalue(),
+            "files": len(contexts),
+            "compiled": len(compiled_contexts)
+        }
+    
+    
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Executes a request ("compile", "ping" or "shutdown" command).
+        
+        Args:
+            request (Dict[str, Any]): The decoded request.
+        
+        Returns:
+            Dict[str, Any]: The response ("status" key, "ok" or "error").
+        """
+        
+        command = request.get("command")
+        
+        try:
+            if command == "compile":
+                return self.compile(
+                    Path(str(request.get("project", "."))).resolve(),
+                    bool(request.get("cache", True)),
+                    bool(request.get("emit", False)),
+                    bool(request.get("snippets", False))
+                )
+            
+            if command == "ping":
+                return {"status": "ok", "pid": os.getpid(), "projects": len(self.projects)}
+            
+            if command == "shutdown":
+                # shutdown() waits for serve_forever(), which runs in another thread
+                if self.socket_server is not None:
+                    threading.Thread(target=self.socket_server.shutdown).start()
+                
+                return {"status": "ok"}
+        except Exception as error:
+            # A failing request never stops the server
+            return {"status": "error", "message": f"{type(error).__name__}: {error}"}
+        
+        return {"status": "error", "message": f"Unknown command: {command}"}
+    
+    
+    def prepare_socket_path(self) -> bool:
+        """
+        Checks the socket path before binding it, the private directory of the default path
+        is created, and a socket left by a server that didn't stop properly is removed
+        (only if it belongs to the current user, nothing else is ever removed).
+        
+        Returns:
+            bool: False if the path is not safe to use or another server is listening on it.
+        """
+        
+        socket_dir_path = self.socket_path.parent
+        
+        try:
+            socket_dir_path.mkdir(mode=0o700, exist_ok=True)
+            dir_stat = os.lstat(socket_dir_path)
+        except OSError as error:
+            print(f"Cannot create the socket directory {socket_dir_path}: {error}", file=sys.stderr)
+            return False
+        
+        # Another user could replace the socket (sticky directories such as /tmp are fine)
+        if (
+            not stat.S_ISDIR(dir_stat.st_mode)
+            or dir_stat.st_uid not in (os.getuid(), 0)
+            or (dir_stat.st_mode & 0o022 and not dir_stat.st_mode & stat.S_ISVTX)
+        ):
+            print(f"The socket directory {socket_dir_path} is not private to the current user", file=sys.stderr)
+            return False
+        
+        try:
+            socket_stat = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return True
+        except OSError as error:
+            print(f"Cannot check the socket path {self.socket_path}: {error}", file=sys.stderr)
+            return False
+        
+        if not stat.S_ISSOCK(socket_stat.st_mode) or socket_stat.st_uid != os.getuid():
+            print(f"{self.socket_path} is not a socket of the current user, refusing to replace it", file=sys.stderr)
+            return False
+        
+        try:
+            Client.request(self.socket_path, {"command": "ping"}, timeout=1.0)
+            print(f"A compilation server is already listening on {self.socket_path}", file=sys.stderr)
+            return False
+        except OSError:
+            # Left by a server that didn't stop properly
+            self.socket_path.unlink(missing_ok=True)
+        
+        return True
+    
+    
+    def serve(self) -> bool:
+        """
+        Loads the compiler data, starts the worker processes and serves until
+        a "shutdown" request (or KeyboardInterrupt).
+        
+        Returns:
+            bool: False if the server cannot start (compiler data, socket path unsafe or already in use).
+        """
+        
+        if not self.prepare_socket_path():
+            return False
+        
+        if not Loader.initialize_compiler():
+            return False
+        
+        if self.max_workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # The workers are started before the request threads exist (fork safety)
+            self.executor = ProcessPoolExecutor(self.max_workers)
+            self.executor.submit(os.getpid).result()
+        
+        # The socket is only accessible to its owner
+        previous_umask = os.umask(0o177)
+        
+        try:
+            self.socket_server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Server.RequestHandler)
+        finally:
+            os.umask(previous_umask)
+        
+        setattr(self.socket_server, "compilation_server", self)
+        self.socket_server.daemon_threads = True
+        
+        print(f"Compilation server listening on {self.socket_path}", file=sys.stderr)
+        
+        try:
+            self.socket_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.socket_server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            
+            if self.executor is not None:
+                self.executor.shutdown()
+        
+        return True
+    
+    
+    @staticmethod
+    def main(argv: Optional[List[str]] = None) -> int:
+        """
+        Starts a compilation server (clua serve).
+        
+        Args:
+            argv (List[str], optional): The arguments following "serve".
+        
+        Returns:
+            int: The exit code (1 if the server cannot start).
+        """
+        
+        parser = argparse.ArgumentParser(prog="clua serve", description="Clua compilation server.")
+        
+        parser.add_argument(
+            "--socket",
+            type=Path,
+            default=Client.get_default_socket_path(),
+            help="path of the Unix domain socket"
+        )
+        parser.add_argument(
+            "-j", "--jobs",
+            type=int,
+            default=None,
+            help="number of worker processes (defaults to the number of CPUs)"
+        )
+        
+        args = parser.parse_args(argv)
+        server = Server(args.socket, args.jobs)
+        
+        return 0 if server.serve() else 1
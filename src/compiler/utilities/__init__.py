@@ -1,4 +1,11 @@
 # type: ignore
-from .debugger import Debugger
 from .paths import Paths
 from .files import Files
+from .buffer import SourceBuffer
+from .lines import LineIndex
+from .cursor import SourceCursor
+from .debugger import Debugger
+from .storage import DiskCache
+from .timings import Timings
+from .output import OutputFile
+from .sourcemap import SourceMap
@@ -0,0 +1,133 @@
+from . import Paths
+
+from typing import Optional, Tuple, Union
+from pathlib import Path
+
+import mmap
+
+
+class SourceBuffer:
+    """
+    A read-only byte buffer over a Clua file, backed by a memory map.
+    
+    Note:
+        The scanner walks the buffer by byte offset, lines are never copied
+        unless they are explicitly requested through `slice()` or `text()`.
+    """
+    
+    def __init__(self, data: Union[bytes, mmap.mmap], path: Optional[Path] = None):
+        # Raw data (mmap object or bytes), supports the buffer protocol
+        self.data: Union[bytes, mmap.mmap] = data
+        
+        # Path of the source file (None for in-memory buffers)
+        self.path: Optional[Path] = path
+        
+        # Total size of the buffer in bytes
+        self.size: int = len(data)
+    
+    
+    @staticmethod
+    def open(cf_path: Path) -> Optional["SourceBuffer"]:
+        """
+        Maps a .clua file into memory (empty files are loaded as an empty bytes object,
+        as they cannot be mapped).
+        
+        Args:
+            cf_path (Path): The path of the file to map.
+        
+        Returns:
+            Optional[SourceBuffer]: The mapped buffer or None if the file cannot be opened.
+        """
+        
+        if Paths.is_file_path_valid(cf_path, ".clua"):
+            try:
+                with open(cf_path, "rb") as cf_file:
+                    try:
+                        data = mmap.mmap(cf_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    
+                    # Empty file (zero-length mapping is not allowed)
+                    except ValueError:
+                        data = b""
+                    
+                    return SourceBuffer(data, cf_path)
+            except OSError:
+                pass
+        
+        return None
+    
+    
+    @staticmethod
+    def from_bytes(data: bytes, path: Optional[Path] = None) -> "SourceBuffer":
+        """Creates an in-memory buffer (unsaved editor content, generated sources...)."""
+        
+        return SourceBuffer(data, path)
+    
+    
+    def close(self):
+        """Unmaps the buffer, note that the buffer can't be read after this call."""
+        
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+    
+    
+    def __enter__(self) -> "SourceBuffer":
+        return self
+    
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    
+    def byte_at(self, offset: int) -> int:
+        """Returns the byte value at a certain offset (-1 if out of bounds)."""
+        
+        if 0 <= offset < self.size:
+            return self.data[offset]
+        
+        return -1
+    
+    
+    def find(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the offset of the first occurrence of sub (-1 if not found)."""
+        
+        if end is None:
+            end = self.size
+        
+        return self.data.find(sub, start, end)
+    
+    
+    def slice(self, start: int, end: int) -> bytes:
+        """Returns a copy of the bytes between two offsets."""
+        
+        return self.data[start:end]
+    
+    
+    def text(self, start: int, end: int) -> str:
+        """Returns the decoded text between two offsets."""
+        
+        return self.data[start:end].decode("utf-8", "replace")
+    
+    
+    def line_span(self, offset: int) -> Tuple[int, int]:
+        """
+        Returns the span of the line that starts at the given offset,
+        without copying it.
+        
+        Args:
+            offset (int): The start offset of the line.
+        
+        Returns:
+            Tuple[int, int]: The start and end offsets of the line
+                (the end offset includes the newline character).
+        """
+        
+        newline_pos = self.data.find(b"\n", offset)
+        
+        if newline_pos == -1:
+            return offset, self.size
+        
+        return offset, newline_pos + 1
@@ -0,0 +1,104 @@
+from . import SourceBuffer, LineIndex
+
+from typing import Optional, Tuple
+
+
+class SourceCursor:
+    """
+    A read position over a shared source buffer, any number of cursors can walk
+    the same buffer at the same time (no global position).
+    
+    Note:
+        The parser backtracks on token indexes (TokenStream), not on the source bytes,
+        so the cursor only moves forward or to the beginning of a line.
+    """
+    
+    def __init__(
+        self,
+        buffer: SourceBuffer,
+        position: int = 0,
+        line_index: Optional[LineIndex] = None
+    ):
+        # Shared source buffer (never copied)
+        self.buffer: SourceBuffer = buffer
+        
+        # Byte offset of the next read
+        self.position: int = position
+        
+        # Shared line index of the buffer (built on the first line seek if missing)
+        self.line_index: Optional[LineIndex] = line_index
+        
+        # -1 removes the first iteration supplement (0-Indexing)
+        self.line_number: int = -1
+        
+        # Span (start/end byte offsets) of the last read line
+        self.line_start: int = 0
+        self.line_end: int = 0
+    
+    
+    def is_eof(self) -> bool:
+        """Returns True if the end of the buffer is reached."""
+        
+        return self.position >= self.buffer.size
+    
+    
+    def read(self, count: int = 1) -> bytes:
+        """Returns the next bytes and moves the cursor after them."""
+        
+        start = self.position
+        self.position = min(start + count, self.buffer.size)
+        
+        return self.buffer.slice(start, self.position)
+    
+    
+    def seek(self, offset: int):
+        """Moves the cursor to a byte offset (the line state is not updated)."""
+        
+        self.position = max(0, min(offset, self.buffer.size))
+    
+    
+    def seek_line(self, line_number: int) -> int:
+        """
+        Moves the cursor to the beginning of a line,
+        the next readline() call will return this line.
+        
+        Args:
+            line_number (int): The 0-indexed number of the line.
+        
+        Returns:
+            int: The new cursor position.
+        """
+        
+        if self.line_index is None:
+            self.line_index = LineIndex.from_buffer(self.buffer.data)
+        
+        self.position = self.line_index.seek_line(line_number)
+        self.line_number = line_number - 1
+        
+        return self.position
+    
+    
+    def readline(self) -> Tuple[int, int]:
+        """
+        Reads the line starting at the cursor position (the line is not copied).
+        
+        Returns:
+            Tuple[int, int]: The span (start/end byte offsets) of the line that have been read,
+                an empty span is returned if the end of the buffer is reached.
+        """
+        
+        line_start = self.position
+        
+        if line_start >= self.buffer.size:
+            return line_start, line_start
+        
+        line_start, line_end = self.buffer.line_span(line_start)
+        
+        # Moves the cursor to the beginning of the next line
+        self.position = line_end
+        self.line_number += 1
+        
+        self.line_start = line_start
+        self.line_end = line_end
+        
+        return line_start, line_end
@@ -1,4 +1,193 @@
-# DPC101
+from . import SourceBuffer, LineIndex
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from pathlib import Path
+
+
+# Diagnostic found while compiling a file (code, byte offset, message arguments),
+# the message, the position and the snippet are only formatted when it is reported
+Diagnostic = Tuple[str, int, Tuple[Any, ...]]
+
+
 class Debugger:
+    """
+    Filters and formats the diagnostics of the compiled files (DPC101).
+    
+    Note:
+        The scanner and the parser only record compact diagnostics (Diagnostic tuples),
+        filtering them is a dict lookup per code, so the diagnostics dropped by the config
+        never pay for the message formatting, the line lookup or the source snippet.
+    """
+    
     class Types:
-        pass
+        """Log types of the diagnostics (diagnostic_messages.yaml "logType")."""
+        
+        INFO = "Info"
+        WARNING = "Warning"
+        ERROR = "Error"
+        
+        # Severity of every log type, compared with the minimum log type of the config
+        SEVERITIES: Dict[str, int] = {"Info": 0, "Warning": 1, "Error": 2}
+    
+    
+    def __init__(
+        self,
+        messages: Optional[Dict[str, Any]] = None,
+        min_log_type: str = "Info",
+        ignored_codes: Iterable[str] = ()
+    ):
+        # Diagnostic messages database (diagnostic_messages.yaml)
+        self.messages: Dict[str, Any] = messages or {}
+        
+        # Diagnostics below this severity are not reported (errors are always reported)
+        self.min_severity: int = min(
+            Debugger.Types.SEVERITIES.get(min_log_type, 0),
+            Debugger.Types.SEVERITIES[Debugger.Types.ERROR]
+        )
+        
+        # Codes of the diagnostics that are never reported (except errors)
+        self.ignored_codes: Set[str] = set(ignored_codes)
+        
+        # Filter decision memoized per code
+        self.reported_codes: Dict[str, bool] = {}
+    
+    
+    @staticmethod
+    def from_options(messages: Optional[Dict[str, Any]], compiler_options: Dict[str, Any]) -> "Debugger":
+        """
+        Returns the debugger of a config.
+        
+        Args:
+            messages (Dict[str, Any], optional): The diagnostic messages database.
+            compiler_options (Dict[str, Any]): The "compilerOptions" of the effective config
+                ("logLevel" and "ignoreDiagnostics" keys).
+        
+        Returns:
+            Debugger: The debugger, filtering the diagnostics as requested by the config.
+        """
+        
+        return Debugger(
+            messages,
+            str(compiler_options.get("logLevel") or Debugger.Types.INFO),
+            compiler_options.get("ignoreDiagnostics") or ()
+        )
+    
+    
+    def get_log_type(self, code: str) -> str:
+        """Returns the log type of a diagnostic code (unknown codes are errors)."""
+        
+        return str((self.messages.get(code) or {}).get("logType", Debugger.Types.ERROR))
+    
+    
+    def is_reported(self, code: str) -> bool:
+        """Returns True if the diagnostics of a code pass the filters of the config."""
+        
+        reported = self.reported_codes.get(code)
+        
+        if reported is None:
+            log_type = self.get_log_type(code)
+            severity = Debugger.Types.SEVERITIES.get(log_type, Debugger.Types.SEVERITIES[Debugger.Types.ERROR])
+            
+            if log_type == Debugger.Types.ERROR:
+                reported = True
+            else:
+                reported = severity >= self.min_severity and code not in self.ignored_codes
+            
+            self.reported_codes[code] = reported
+        
+        return reported
+    
+    
+    def filter(self, diagnostics: Iterable[Diagnostic]) -> List[Diagnostic]:
+        """
+        Returns the reported diagnostics (nothing is formatted).
+        
+        Args:
+            diagnostics (Iterable[Diagnostic]): The diagnostics of a file.
+        
+        Returns:
+            List[Diagnostic]: The diagnostics that pass the filters, sorted by offset.
+        """
+        
+        is_reported = self.is_reported
+        
+        return sorted(
+            (diagnostic for diagnostic in diagnostics if is_reported(diagnostic[0])),
+            key=lambda i: i[1]
+        )
+    
+    
+    def format_message(self, code: str, args: Tuple[Any, ...]) -> str:
+        """Returns the message of a diagnostic, its template filled with its arguments."""
+        
+        template = str((self.messages.get(code) or {}).get("message", ""))
+        
+        try:
+            return template.format(*args)
+        except (IndexError, KeyError):
+            return template
+    
+    
+    @staticmethod
+    def format_snippet(cf_buffer: SourceBuffer, line_index: LineIndex, line_number: int, column: int) -> str:
+        """
+        Returns the source line of a diagnostic followed by a caret under its column.
+        
+        Args:
+            cf_buffer (SourceBuffer): The source buffer of the file.
+            line_index (LineIndex): The line index of the file.
+            line_number (int): The 0-indexed line of the diagnostic.
+            column (int): The 0-indexed column (byte) of the diagnostic.
+        
+        Returns:
+            str: The snippet (two lines), empty if the line is out of the buffer.
+        """
+        
+        line_start, line_end = line_index.line_span(line_number)
+        
+        if line_start >= cf_buffer.size:
+            return ""
+        
+        line = cf_buffer.slice(line_start, min(line_end, cf_buffer.size)).rstrip(b"\r\n")
+        prefix = line[:column].decode("utf-8", "replace")
+        
+        # Tabs are kept so the caret stays aligned in the terminal
+        padding = "".join("\t" if character == "\t" else " " for character in prefix)
+        
+        return f"    {line.decode('utf-8', 'replace')}\n    {padding}^"
+    
+    
+    def format(
+        self,
+        cf_path: Path,
+        diagnostic: Diagnostic,
+        line_index: LineIndex,
+        cf_buffer: Optional[SourceBuffer] = None
+    ) -> str:
+        """
+        Formats a reported diagnostic ("path:line:column: logType code: message").
+        
+        Args:
+            cf_path (Path): The path of the clua file.
+            diagnostic (Diagnostic): The diagnostic.
+            line_index (LineIndex): The line index of the file (line/column resolution).
+            cf_buffer (SourceBuffer, optional): The source buffer of the file,
+                the source snippet is only added if it is given.
+        
+        Returns:
+            str: The formatted diagnostic.
+        """
+        
+        code, offset, args = diagnostic
+        line_number, column = line_index.offset_to_line_col(offset)
+        
+        text = f"{cf_path}:{line_number + 1}:{column + 1}: {self.get_log_type(code)} {code}: "
+        text += self.format_message(code, args)
+        
+        if cf_buffer is not None:
+            snippet = Debugger.format_snippet(cf_buffer, line_index, line_number, column)
+            
+            if snippet:
+                text += "\n" + snippet
+        
+        return text
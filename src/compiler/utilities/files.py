@@ -3,7 +3,14 @@ from . import Paths
 from typing import List, Any, Dict, cast, Optional
 from pathlib import Path
 
-import yaml
+import hashlib
+import pickle
+import hmac
+import os
+
+
+# Size of the signature of the signed pickle files (HMAC-SHA256 digest)
+SIGNATURE_SIZE = 32
 
 
 class Files:
@@ -22,12 +29,18 @@ class Files:
                 or None if file not found/YAML error.
         """
         
+        # Imported on demand, the compiler database snapshot doesn't need it
+        import yaml
+        
+        # libyaml C loader when available (pure-Python loader otherwise)
+        yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        
         if Paths.is_file_path_valid(file_path, ".yaml"):
             with open(file_path, "r") as yaml_file:
                 try:
                     content: Optional[Dict[str, Any]] = cast(Any, yaml).load(
                         yaml_file,
-                        yaml.FullLoader
+                        yaml_loader
                     )
                     
                     if isinstance(content, dict):
@@ -104,3 +117,84 @@ class Files:
             return Files.load_yaml(compiler_file_paths[default_index])
         
         return None
+    
+    
+    @staticmethod
+    def load_pickle(file_path: Path, signing_key: Optional[bytes] = None) -> Optional[Any]:
+        """
+        Loads the content of a pickle file (snapshots, cache entries).
+
+        Args:
+            file_path (Path): The path of the pickle file.
+            signing_key (bytes, optional): The key of the signed files (Files.dump_pickle()),
+                the content is only unpickled if its signature matches.
+
+        Returns:
+            Optional[Any]: The unpickled content, or None if file not found/invalid.
+        """
+        
+        try:
+            with open(file_path, "rb") as pickle_file:
+                if signing_key is None:
+                    return pickle.load(pickle_file)
+                
+                signature = pickle_file.read(SIGNATURE_SIZE)
+                data = pickle_file.read()
+            
+            # Written by someone else (or corrupted), never unpickled
+            if not hmac.compare_digest(signature, hmac.new(signing_key, data, hashlib.sha256).digest()):
+                return None
+            
+            return pickle.loads(data)
+        
+        # Missing, truncated or incompatible files are treated as not found
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+    
+    
+    @staticmethod
+    def dump_pickle(file_path: Path, content: Any, signing_key: Optional[bytes] = None) -> bool:
+        """
+        Writes a pickle file atomically (temporary file replaced by the final one),
+        so concurrent readers never see a partially written file.
+
+        Args:
+            file_path (Path): The path of the pickle file.
+            content (Any): The picklable content.
+            signing_key (bytes, optional): Prefixes the content with its signature
+                (HMAC-SHA256), checked by Files.load_pickle().
+
+        Returns:
+            bool: True if the file is successfully written.
+        """
+        
+        temp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+        replaced = False
+        
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            with open(temp_path, "wb") as temp_file:
+                if signing_key is None:
+                    pickle.dump(content, temp_file, pickle.HIGHEST_PROTOCOL)
+                else:
+                    data = pickle.dumps(content, pickle.HIGHEST_PROTOCOL)
+                    
+                    temp_file.write(hmac.new(signing_key, data, hashlib.sha256).digest())
+                    temp_file.write(data)
+            
+            os.replace(temp_path, file_path)
+            replaced = True
+        
+        # Full disk, unpicklable or too deeply nested content (never fails the compilation)
+        except (OSError, pickle.PicklingError, RecursionError, TypeError, AttributeError):
+            pass
+        finally:
+            # No partial file is left beside the final one
+            if not replaced:
+                try:
+                    temp_path.unlink(missing_ok=True)
+                except OSError:
+                    pass
+        
+        return replaced
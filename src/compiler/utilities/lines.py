@@ -0,0 +1,113 @@
+from typing import Iterable, Tuple, Union
+from bisect import bisect_right
+from array import array
+
+import mmap
+import re
+
+
+# Matches every newline of a buffer (the search itself runs in C)
+NEWLINE_PATTERN = re.compile(b"\n")
+
+
+class LineIndex:
+    """
+    Precomputed line-start offsets of a buffer, allows random access to any line.
+    
+    Note:
+        Lines and columns are 0-indexed (same as Register.cf_line_number),
+        columns are byte offsets inside the line.
+    """
+    
+    def __init__(self, line_starts: "array[int]", size: int):
+        # Start offset of every line (the first line always starts at 0)
+        self.line_starts: "array[int]" = line_starts
+        
+        # Size of the indexed buffer in bytes
+        self.size: int = size
+    
+    
+    @staticmethod
+    def from_buffer(data: Union[bytes, mmap.mmap]) -> "LineIndex":
+        """
+        Builds the index in one pass over the buffer.
+        
+        Args:
+            data (Union[bytes, mmap.mmap]): The raw buffer data (SourceBuffer.data).
+        
+        Returns:
+            LineIndex: The line index of the buffer.
+        """
+        
+        line_starts = array("q", [0])
+        line_starts.extend(match.end() for match in NEWLINE_PATTERN.finditer(data))
+        
+        # A trailing newline doesn't open a new line (same behavior as cf_readline)
+        if len(line_starts) > 1 and line_starts[-1] == len(data):
+            line_starts.pop()
+        
+        return LineIndex(line_starts, len(data))
+    
+    
+    @staticmethod
+    def from_lengths(line_lengths: Iterable[int]) -> "LineIndex":
+        """Builds the index from the line lengths stored by the Register (cf_line_lengths)."""
+        
+        line_starts = array("q", [0])
+        size = 0
+        
+        for line_length in line_lengths:
+            size += line_length
+            line_starts.append(size)
+        
+        # The last start is the end of the last line
+        if len(line_starts) > 1:
+            line_starts.pop()
+        
+        return LineIndex(line_starts, size)
+    
+    
+    def __len__(self) -> int:
+        """Returns the number of lines."""
+        
+        return len(self.line_starts)
+    
+    
+    def seek_line(self, line_number: int) -> int:
+        """Returns the start offset of a line in O(1) (IndexError if the line doesn't exist)."""
+        
+        if line_number < 0:
+            raise IndexError(f"Invalid line number: {line_number}")
+        
+        return self.line_starts[line_number]
+    
+    
+    def line_span(self, line_number: int) -> Tuple[int, int]:
+        """Returns the span (start/end offsets, newline included) of a line."""
+        
+        line_start = self.seek_line(line_number)
+        
+        if line_number + 1 < len(self.line_starts):
+            return line_start, self.line_starts[line_number + 1]
+        
+        return line_start, self.size
+    
+    
+    def line_at(self, offset: int) -> int:
+        """Returns the line number that contains the offset in O(log n)."""
+        
+        return bisect_right(self.line_starts, offset) - 1
+    
+    
+    def offset_to_line_col(self, offset: int) -> Tuple[int, int]:
+        """Converts an offset into a (line, column) position."""
+        
+        line_number = self.line_at(offset)
+        
+        return line_number, offset - self.line_starts[line_number]
+    
+    
+    def line_col_to_offset(self, line_number: int, column: int) -> int:
+        """Converts a (line, column) position into an offset."""
+        
+        return self.seek_line(line_number) + column
@@ -0,0 +1,196 @@
+from typing import BinaryIO, Optional, Union
+from pathlib import Path
+
+import shutil
+import os
+
+
+# Size of the output blocks (bytes written to the disk at once)
+OUTPUT_BLOCK_SIZE: int = 1 << 20
+
+
+class OutputFile:
+    """
+    Binary output file written in large blocks and replaced atomically (temporary file
+    renamed over the final one), the existing file is left untouched (same modification
+    time) if the new content is identical.
+    
+    Note:
+        The written blocks are compared with the existing file as they are flushed,
+        the temporary file is only created once the content differs, so an unchanged
+        output costs a read of the existing file and no write at all.
+    """
+    
+    def __init__(
+        self,
+        output_path: Path,
+        block_buffer: Optional[bytearray] = None,
+        block_size: int = OUTPUT_BLOCK_SIZE
+    ):
+        # Path of the final output file
+        self.output_path: Path = output_path
+        
+        # Path of the temporary file (renamed over the output file when closed)
+        self.temp_path: Path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+        
+        # Block buffer (reusable between files, its size never changes)
+        self.block_buffer: bytearray = block_buffer if block_buffer is not None else bytearray(block_size)
+        self.block_length: int = 0
+        
+        # Previous output (None if it doesn't exist), compared with the flushed blocks
+        self.existing_file: Optional[BinaryIO] = None
+        
+        try:
+            self.existing_file = open(output_path, "rb")
+        except OSError:
+            pass
+        
+        # Temporary file, only opened once the content differs from the existing output
+        self.temp_file: Optional[BinaryIO] = None
+        
+        # Number of flushed bytes identical to the existing output (not written yet)
+        self.matched_size: int = 0
+        
+        # Total number of written bytes
+        self.size: int = 0
+        
+        # True if the output file has been replaced (set when closed)
+        self.changed: bool = False
+    
+    
+    def __enter__(self) -> "OutputFile":
+        return self
+    
+    
+    def __exit__(self, exception_type, *args):
+        if exception_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """
+        Appends data to the block buffer, full blocks are flushed.
+        
+        Returns:
+            int: The number of written bytes.
+        """
+        
+        data_length = len(data)
+        
+        if self.block_length + data_length > len(self.block_buffer):
+            self.flush()
+            
+            # Larger than a block, flushed without being copied
+            if data_length >= len(self.block_buffer):
+                self.write_block(memoryview(data))
+                self.size += data_length
+                
+                return data_length
+        
+        self.block_buffer[self.block_length:self.block_length + data_length] = data
+        self.block_length += data_length
+        self.size += data_length
+        
+        return data_length
+    
+    
+    def flush(self):
+        """Writes the pending block (or checks it against the existing output)."""
+        
+        if self.block_length > 0:
+            self.write_block(memoryview(self.block_buffer)[:self.block_length])
+            self.block_length = 0
+    
+    
+    def write_block(self, block: memoryview):
+        """Compares a block with the existing output, the temporary file is opened on the first difference."""
+        
+        if self.temp_file is None and self.existing_file is not None:
+            if self.existing_file.read(len(block)) == block:
+                self.matched_size += len(block)
+                return
+        
+        if self.temp_file is None:
+            self.open_temp_file()
+        
+        self.temp_file.write(block)
+    
+    
+    def open_temp_file(self):
+        """Opens the temporary file, the matched part of the existing output is copied first."""
+        
+        self.temp_file = open(self.temp_path, "wb")
+        
+        if self.existing_file is not None:
+            self.existing_file.seek(0)
+            remaining_size = self.matched_size
+            
+            while remaining_size > 0:
+                block = self.existing_file.read(min(remaining_size, len(self.block_buffer)))
+                
+                if not block:
+                    break
+                
+                self.temp_file.write(block)
+                remaining_size -= len(block)
+            
+            self.existing_file.close()
+            self.existing_file = None
+    
+    
+    def close(self) -> bool:
+        """
+        Flushes the last block and replaces the output file if its content changed.
+        
+        Returns:
+            bool: True if the output file has been written, False if it was already up to date.
+        """
+        
+        self.flush()
+        
+        # Every block matched, the existing output must also end here
+        if self.temp_file is None and self.existing_file is not None:
+            if self.existing_file.read(1) == b"":
+                self.existing_file.close()
+                self.existing_file = None
+                
+                return False
+        
+        if self.temp_file is None:
+            self.open_temp_file()
+        
+        try:
+            self.temp_file.close()
+            
+            # The replaced output keeps its permissions (missing output: default mode)
+            try:
+                shutil.copymode(self.output_path, self.temp_path)
+            except OSError:
+                pass
+            
+            os.replace(self.temp_path, self.output_path)
+        except OSError:
+            self.abort()
+            raise
+        
+        self.changed = True
+        return True
+    
+    
+    def abort(self):
+        """Closes the files and removes the temporary file, the existing output is kept."""
+        
+        if self.existing_file is not None:
+            self.existing_file.close()
+            self.existing_file = None
+        
+        if self.temp_file is not None:
+            self.temp_file.close()
+            self.temp_file = None
+            
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
@@ -1,5 +1,8 @@
-from typing import List, Generator, Optional
+from typing import List, Generator, Optional, Tuple
 from pathlib import Path
+from fnmatch import fnmatch
+
+import os
 
 
 class Paths:
@@ -179,25 +182,78 @@ class Paths:
     
     
     @staticmethod
-    def clua_paths_organizer(project_tree: List[Path]) -> Optional[List[Path]]:
+    def walk_project(
+        project_dir_path: Path,
+        config_filename: str = "clua.config.yaml",
+        excluded_patterns: Optional[List[str]] = None
+    ) -> Tuple[List[Path], List[Path], List[Path]]:
         """
-        Get the path of all the valid clua files and sorts them by directory depth.
+        Walks a project directory in a single pass (os.scandir), the entries are classified
+        with their cached type information (no additional stat call per entry).
 
         Args:
-            project_tree (List[Path]): The loaded user project tree.
+            project_dir_path (Path): The path of the project directory.
+            config_filename (str, optional): The name of the clua config files.
+            excluded_patterns (List[str], optional): Name patterns (fnmatch) of the files and
+                directories to skip, excluded directories are not walked at all.
 
         Returns:
-            Optional[List[Path]]: A directory depth sorted list of clua file paths.
+            Tuple[List[Path], List[Path], List[Path]]: The clua file paths, the config file paths
+                and the directory paths (project directory excluded).
         """
         
-        unsorted_paths: Optional[List[Path]] = Paths.search_paths_in_tree_by_extension(
-            project_tree,
-            ".clua"
-        )
+        if excluded_patterns is None:
+            excluded_patterns = []
+        
+        clua_paths: List[Path] = []
+        config_paths: List[Path] = []
+        dir_paths: List[Path] = []
+        
+        pending_dir_paths: List[str] = [str(project_dir_path)]
+        
+        while len(pending_dir_paths) > 0:
+            try:
+                entries = os.scandir(pending_dir_paths.pop())
+            
+            # Unreadable directory (permissions, removed while walking)
+            except OSError:
+                continue
+            
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    
+                    if any(fnmatch(name, pattern) for pattern in excluded_patterns):
+                        continue
+                    
+                    # Symbolic links to directories are not followed (loops)
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_dir_paths.append(entry.path)
+                        dir_paths.append(Path(entry.path))
+                    elif name.endswith(".clua") and entry.is_file():
+                        clua_paths.append(Path(entry.path))
+                    elif name == config_filename and entry.is_file():
+                        config_paths.append(Path(entry.path))
+        
+        return clua_paths, config_paths, dir_paths
+    
+    
+    @staticmethod
+    def clua_paths_organizer(clua_paths: List[Path]) -> Optional[List[Path]]:
+        """
+        Sorts the clua file paths found inside the project by directory depth,
+        the build order is given by the import graph (ImportGraph.topological_order()).
+
+        Args:
+            clua_paths (List[Path]): The clua file paths (Paths.walk_project() result).
+
+        Returns:
+            Optional[List[Path]]: A directory depth sorted list of clua file paths.
+        """
         
         # General output verification
-        if unsorted_paths is not None and len(unsorted_paths) > 0:
-            # Reversed Stem sorting (directory depth optimization)
-            return sorted(unsorted_paths, key=lambda i: i.stem, reverse=True)
+        if len(clua_paths) > 0:
+            # Deterministic order (the walk order depends on the file system)
+            return sorted(clua_paths, key=lambda i: (len(i.parts), i))
         
         return None
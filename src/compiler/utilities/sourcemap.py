@@ -0,0 +1,434 @@
+from . import LineIndex, OutputFile
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+from pathlib import Path
+from array import array
+
+import json
+import re
+
+
+# Base64 digits of the VLQ encoding (5 bits per digit, the 6th bit flags a continuation)
+BASE64_DIGITS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+BASE64_VALUES: Dict[str, int] = {digit: value for value, digit in enumerate(BASE64_DIGITS)}
+
+# Encoded small values, the deltas between two segments are small and repeat a lot
+VLQ_CACHE: Dict[int, str] = {}
+VLQ_CACHE_LIMIT = 1 << 10
+
+# Locations of the Lua stack traces ("dev.lua:12:", 1-indexed lines)
+TRACE_LOCATION_PATTERN = re.compile(r"([^\s:\"'\[\]]+\.lua):(\d+):")
+
+
+class SourceMap:
+    """
+    Mapping of the generated Lua positions to the clua source positions (source map v3,
+    base64 VLQ "mappings"), one segment per generated line and per copied source span.
+    
+    Note:
+        Lines and columns are 0-indexed byte offsets (same as LineIndex), the output
+        is a copy of the source spans so the columns inside a segment are shifted linearly.
+        The segments are stored as parallel arrays, lookups are O(log n) bisects.
+    """
+    
+    class Builder:
+        """Records the source spans copied into the output, in output order (Emitter)."""
+        
+        def __init__(self, line_index: LineIndex, file: str, source: str):
+            # Line-start offsets of the source (no rescanning of the source)
+            self.line_index: LineIndex = line_index
+            
+            # Built source map
+            self.source_map: SourceMap = SourceMap(file, source)
+            
+            # Current generated column
+            self.generated_column: int = 0
+        
+        
+        def add_span(self, start: int, end: int):
+            """Records a source span (start/end offsets) copied at the current output position."""
+            
+            if start >= end:
+                return
+            
+            line_starts = self.line_index.line_starts
+            source_map = self.source_map
+            
+            line_number = self.line_index.line_at(start)
+            source_map.add_segment(self.generated_column, line_number, start - line_starts[line_number])
+            
+            # Every source line starting inside the span starts a generated line (added in bulk)
+            next_line_number = bisect_left(line_starts, end, line_number + 1)
+            new_line_count = next_line_number - line_number - 1
+            
+            if new_line_count > 0:
+                segment_count = len(source_map.generated_columns)
+                
+                source_map.line_segments.extend(range(segment_count, segment_count + new_line_count))
+                source_map.generated_columns.extend(repeat(0, new_line_count))
+                source_map.source_lines.extend(range(line_number + 1, next_line_number))
+                source_map.source_columns.extend(repeat(0, new_line_count))
+            
+            last_line_start = line_starts[next_line_number - 1]
+            
+            if last_line_start > start:
+                self.generated_column = end - last_line_start
+            else:
+                self.generated_column += end - start
+            
+            # The span ends with a newline, the next generated line starts with the next span
+            if next_line_number < len(line_starts) and line_starts[next_line_number] == end:
+                source_map.add_line()
+                self.generated_column = 0
+        
+        
+        def add_text(self, length: int):
+            """Records generated text without a source (removed comment separator, no newline)."""
+            
+            self.generated_column += length
+        
+        
+        def build(self) -> "SourceMap":
+            """Returns the built source map."""
+            
+            return self.source_map
+    
+    
+    def __init__(self, file: str, source: str):
+        # Name of the generated Lua file and of its clua source
+        self.file: str = file
+        self.source: str = source
+        
+        # Index of the first segment of every generated line
+        self.line_segments: "array[int]" = array("q", [0])
+        
+        # Segments (generated column, source line, source column)
+        self.generated_columns: "array[int]" = array("q")
+        self.source_lines: "array[int]" = array("q")
+        self.source_columns: "array[int]" = array("q")
+    
+    
+    def __len__(self) -> int:
+        """Returns the number of generated lines."""
+        
+        return len(self.line_segments)
+    
+    
+    def add_line(self):
+        """Starts the next generated line."""
+        
+        self.line_segments.append(len(self.generated_columns))
+    
+    
+    def add_segment(self, generated_column: int, source_line: int, source_column: int):
+        """Adds a segment to the current generated line (increasing generated columns)."""
+        
+        self.generated_columns.append(generated_column)
+        self.source_lines.append(source_line)
+        self.source_columns.append(source_column)
+    
+    
+    def lookup(self, line_number: int, column: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        Returns the source position of a generated position in O(log n).
+        
+        Args:
+            line_number (int): The generated line (0-indexed).
+            column (int, optional): The generated column (0-indexed).
+        
+        Returns:
+            Tuple[int, int]: The source (line, column), None if the position isn't mapped.
+        """
+        
+        if line_number < 0 or line_number >= len(self.line_segments):
+            return None
+        
+        first_segment = self.line_segments[line_number]
+        end_segment = self.line_segments[line_number + 1] if line_number + 1 < len(self.line_segments) else len(self.generated_columns)
+        
+        if first_segment == end_segment:
+            return None
+        
+        segment = max(bisect_right(self.generated_columns, column, first_segment, end_segment) - 1, first_segment)
+        column_offset = max(column - self.generated_columns[segment], 0)
+        
+        return self.source_lines[segment], self.source_columns[segment] + column_offset
+    
+    
+    def lookup_lines(self, line_numbers: Iterable[int]) -> List[Optional[int]]:
+        """
+        Returns the source line of many generated lines (start of the line), without bisects.
+        
+        Args:
+            line_numbers (Iterable[int]): The generated lines (0-indexed).
+        
+        Returns:
+            List[Optional[int]]: The source line of every generated line (None if not mapped).
+        """
+        
+        line_segments = self.line_segments
+        source_lines = self.source_lines
+        line_count = len(line_segments)
+        segment_count = len(source_lines)
+        
+        source_line_numbers: List[Optional[int]] = []
+        
+        for line_number in line_numbers:
+            if 0 <= line_number < line_count:
+                segment = line_segments[line_number]
+                end_segment = line_segments[line_number + 1] if line_number + 1 < line_count else segment_count
+                
+                if segment < end_segment:
+                    source_line_numbers.append(source_lines[segment])
+                    continue
+            
+            source_line_numbers.append(None)
+        
+        return source_line_numbers
+    
+    
+    @staticmethod
+    def translate_trace(trace: str, source_maps: Mapping[str, "SourceMap"]) -> str:
+        """
+        Rewrites the Lua locations of a stack trace (or of any log) into clua locations.
+        
+        Args:
+            trace (str): The text of the trace ("dev.lua:12: ..." locations).
+            source_maps (Mapping[str, SourceMap]): The source maps, keyed by Lua path
+                as it appears in the traces (or by file name).
+        
+        Returns:
+            str: The translated trace, the locations without a source map are kept.
+        """
+        
+        def translate_location(match: "re.Match[str]") -> str:
+            lua_path = match.group(1)
+            source_map = source_maps.get(lua_path) or source_maps.get(Path(lua_path).name)
+            
+            if source_map is None:
+                return match.group(0)
+            
+            source_line_number = source_map.lookup_lines((int(match.group(2)) - 1,))[0]
+            
+            if source_line_number is None:
+                return match.group(0)
+            
+            source_path = str(Path(lua_path).with_name(source_map.source))
+            return f"{source_path}:{source_line_number + 1}:"
+        
+        return TRACE_LOCATION_PATTERN.sub(translate_location, trace)
+    
+    
+    @staticmethod
+    def encode_vlq(value: int) -> str:
+        """Encodes a signed integer as base64 VLQ digits (the sign is the lowest bit)."""
+        
+        text = VLQ_CACHE.get(value)
+        
+        if text is not None:
+            return text
+        
+        remaining = (value << 1) if value >= 0 else ((-value) << 1) | 1
+        digits: List[str] = []
+        
+        while True:
+            digit = remaining & 31
+            remaining >>= 5
+            
+            if remaining > 0:
+                digits.append(BASE64_DIGITS[digit | 32])
+            else:
+                digits.append(BASE64_DIGITS[digit])
+                break
+        
+        text = "".join(digits)
+        
+        if -VLQ_CACHE_LIMIT < value < VLQ_CACHE_LIMIT:
+            VLQ_CACHE[value] = text
+        
+        return text
+    
+    
+    @staticmethod
+    def decode_vlq(text: str) -> List[int]:
+        """Decodes a sequence of base64 VLQ values (a segment)."""
+        
+        values: List[int] = []
+        value = 0
+        shift = 0
+        
+        for digit in text:
+            digit_value = BASE64_VALUES[digit]
+            value |= (digit_value & 31) << shift
+            
+            if digit_value & 32:
+                shift += 5
+                continue
+            
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            value = 0
+            shift = 0
+        
+        return values
+    
+    
+    def encode_mappings(self) -> str:
+        """Returns the "mappings" field, the fields of a segment are deltas from the previous one."""
+        
+        encode_vlq = SourceMap.encode_vlq
+        line_segments = self.line_segments
+        line_count = len(line_segments)
+        
+        # Encoded segments, keyed by their deltas (most lines are "next line, column 0")
+        segment_texts: Dict[Tuple[int, int, int], str] = {}
+        parts: List[str] = []
+        
+        line_number = 0
+        next_line_segment = line_segments[1] if line_count > 1 else -1
+        
+        previous_generated_column = 0
+        previous_source_line = 0
+        previous_source_column = 0
+        
+        for segment, (generated_column, source_line, source_column) in enumerate(
+            zip(self.generated_columns, self.source_lines, self.source_columns)
+        ):
+            # Separator: ";" per generated line break, "," between the segments of a line
+            if segment == next_line_segment:
+                line_break_count = 0
+                
+                while segment == next_line_segment:
+                    line_number += 1
+                    line_break_count += 1
+                    next_line_segment = line_segments[line_number + 1] if line_number + 1 < line_count else -1
+                
+                parts.append(";" * line_break_count)
+                # The generated column is relative to the line, the source fields to the whole map
+                previous_generated_column = 0
+            elif segment > 0:
+                parts.append(",")
+            
+            deltas = (
+                generated_column - previous_generated_column,
+                source_line - previous_source_line,
+                source_column - previous_source_column
+            )
+            
+            segment_text = segment_texts.get(deltas)
+            
+            if segment_text is None:
+                # Always the first (and only) source, encoded 0
+                segment_text = segment_texts[deltas] = (
+                    encode_vlq(deltas[0]) + "A" + encode_vlq(deltas[1]) + encode_vlq(deltas[2])
+                )
+            
+            parts.append(segment_text)
+            
+            previous_generated_column = generated_column
+            previous_source_line = source_line
+            previous_source_column = source_column
+        
+        # Generated lines after the last segment
+        parts.append(";" * (line_count - 1 - line_number))
+        
+        return "".join(parts)
+    
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Returns the source map as a JSON-serializable dict (source map v3)."""
+        
+        return {
+            "version": 3,
+            "file": self.file,
+            "sources": [self.source],
+            "names": [],
+            "mappings": self.encode_mappings()
+        }
+    
+    
+    @staticmethod
+    def from_json(data: Dict[str, Any]) -> "SourceMap":
+        """
+        Builds a source map from its JSON form (only the first source is kept).
+        
+        Raises:
+            ValueError: If the "mappings" field is invalid.
+        """
+        
+        sources = data.get("sources") or [""]
+        source_map = SourceMap(str(data.get("file", "")), str(sources[0]))
+        
+        # Decoded segments, most of them repeat
+        segment_values: Dict[str, List[int]] = {}
+        
+        add_line = source_map.line_segments.append
+        add_generated_column = source_map.generated_columns.append
+        add_source_line = source_map.source_lines.append
+        add_source_column = source_map.source_columns.append
+        
+        source_line = 0
+        source_column = 0
+        
+        for line_number, encoded_line in enumerate(str(data.get("mappings", "")).split(";")):
+            if line_number > 0:
+                add_line(len(source_map.generated_columns))
+            
+            generated_column = 0
+            
+            for encoded_segment in encoded_line.split(","):
+                values = segment_values.get(encoded_segment)
+                
+                if values is None:
+                    if not encoded_segment:
+                        continue
+                    
+                    try:
+                        values = segment_values[encoded_segment] = SourceMap.decode_vlq(encoded_segment)
+                    except KeyError as error:
+                        raise ValueError(f"Invalid source map segment: {encoded_segment}") from error
+                
+                generated_column += values[0]
+                
+                # Segments without a source (1 field) are skipped
+                if len(values) < 4:
+                    continue
+                
+                source_line += values[2]
+                source_column += values[3]
+                
+                add_generated_column(generated_column)
+                add_source_line(source_line)
+                add_source_column(source_column)
+        
+        return source_map
+    
+    
+    def dump(self, map_path: Path, block_buffer: Optional[bytearray] = None) -> bool:
+        """
+        Writes the source map (JSON), an unchanged map is not rewritten (OutputFile).
+        
+        Args:
+            map_path (Path): The path of the map file.
+            block_buffer (bytearray, optional): The reusable block buffer of the OutputFile.
+        
+        Returns:
+            bool: True if the file has been written, False if it was already up to date.
+        """
+        
+        with OutputFile(map_path, block_buffer) as output_file:
+            output_file.write(json.dumps(self.to_json(), separators=(",", ":")).encode())
+        
+        return output_file.changed
+    
+    
+    @staticmethod
+    def load(map_path: Path) -> Optional["SourceMap"]:
+        """Loads a source map file (None if it cannot be read or is invalid)."""
+        
+        try:
+            with open(map_path, "rb") as map_file:
+                return SourceMap.from_json(json.load(map_file))
+        except (OSError, ValueError, IndexError, TypeError, AttributeError):
+            return None
@@ -0,0 +1,146 @@
+from . import Files
+
+from typing import Any, Optional, Union
+from pathlib import Path
+
+import hashlib
+import secrets
+import stat
+import mmap
+import os
+
+
+# Layout version of the stored contexts, bumped when FileContext (or its content) changes,
+# so the entries written by an older layout are never reused
+CACHE_FORMAT_VERSION = 6
+
+# Per-user secret signing the entries (inside the user cache directory)
+SIGNING_KEY_FILENAME = "cache.key"
+SIGNING_KEY_SIZE = 32
+
+
+class DiskCache:
+    """
+    Persistent on-disk storage of compilation results (.clua_cache directory),
+    the entries are keyed by file content hash, compiler version and effective config hash.
+    
+    Note:
+        The cache directory lives inside the project (it can be committed or shared),
+        so the entries are signed with a per-user key and only the entries signed
+        by the current user are unpickled, the others are misses.
+    """
+    
+    def __init__(self, cache_dir_path: Path, compiler_version: str, signing_key: Optional[bytes] = None):
+        # Path of the cache directory (created on first store)
+        self.cache_dir_path: Path = cache_dir_path
+        
+        # Version of the compiler (entries of other versions are never reused)
+        self.compiler_version: str = compiler_version
+        
+        # Signs the stored entries, None disables the cache (key not available)
+        self.signing_key: Optional[bytes] = signing_key if signing_key is not None else DiskCache.load_signing_key()
+    
+    
+    @staticmethod
+    def get_user_cache_dir_path() -> Path:
+        """Returns the per-user cache directory of the compiler ($XDG_CACHE_HOME/clua, ~/.cache/clua by default)."""
+        
+        cache_home = os.environ.get("XDG_CACHE_HOME")
+        
+        if cache_home:
+            return Path(cache_home) / "clua"
+        
+        return Path.home() / ".cache" / "clua"
+    
+    
+    @staticmethod
+    def load_signing_key() -> Optional[bytes]:
+        """
+        Returns the per-user key signing the entries, created on first use
+        (only readable and writable by its owner).
+        
+        Returns:
+            Optional[bytes]: The key, or None if it cannot be created or is not private
+                to the current user.
+        """
+        
+        key_path = DiskCache.get_user_cache_dir_path() / SIGNING_KEY_FILENAME
+        
+        try:
+            key_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            
+            try:
+                key_fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                key_fd = None
+            
+            if key_fd is not None:
+                with os.fdopen(key_fd, "wb") as key_file:
+                    key_file.write(secrets.token_bytes(SIGNING_KEY_SIZE))
+            
+            with open(key_path, "rb") as key_file:
+                key_stat = os.fstat(key_file.fileno())
+                
+                # A key readable (or replaceable) by other users signs nothing
+                if key_stat.st_uid != os.getuid() or key_stat.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+                    return None
+                
+                key = key_file.read()
+        except OSError:
+            return None
+        
+        # Partially written by a concurrent first use
+        return key if len(key) == SIGNING_KEY_SIZE else None
+    
+    
+    def make_key(self, content: Union[bytes, mmap.mmap], config_hash: str) -> str:
+        """
+        Generates the key of an entry.
+
+        Args:
+            content (Union[bytes, mmap.mmap]): The content of the clua file.
+            config_hash (str): The hash of the effective config of the file.
+
+        Returns:
+            str: The hexadecimal key of the entry.
+        """
+        
+        key_hash = hashlib.sha256(content)
+        key_hash.update(b"\0" + self.compiler_version.encode())
+        key_hash.update(b"\0%d" % CACHE_FORMAT_VERSION)
+        key_hash.update(b"\0" + config_hash.encode())
+        
+        return key_hash.hexdigest()
+    
+    
+    def get_entry_path(self, key: str) -> Path:
+        """Returns the path of an entry (sharded by the first two key characters)."""
+        
+        return self.cache_dir_path / key[:2] / key
+    
+    
+    def load(self, key: str) -> Optional[Any]:
+        """Returns the content of an entry, or None if not found/invalid (or not signed by the current user)."""
+        
+        if self.signing_key is None:
+            return None
+        
+        return Files.load_pickle(self.get_entry_path(key), self.signing_key)
+    
+    
+    def store(self, key: str, payload: Any) -> bool:
+        """
+        Stores a signed entry atomically (temporary file replaced by the final one).
+
+        Args:
+            key (str): The key of the entry.
+            payload (Any): The picklable content of the entry.
+
+        Returns:
+            bool: True if the entry is successfully stored.
+        """
+        
+        if self.signing_key is None:
+            return False
+        
+        return Files.dump_pickle(self.get_entry_path(key), payload, self.signing_key)
@@ -0,0 +1,220 @@
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+
+import time
+import os
+
+
+# Recorded span (phase, file path, start time, wall duration, CPU duration, process id, counters),
+# the times are in seconds (time.perf_counter() clock, shared by the worker processes)
+TimingEvent = Tuple[str, str, float, float, float, int, Dict[str, int]]
+
+
+class TimingSpan:
+    """Measures a phase (context manager), the counters are attached to the recorded event."""
+    
+    __slots__ = ("timings", "phase", "cf_path", "counters", "start_time", "start_cpu_time")
+    
+    def __init__(self, timings: "Timings", phase: str, cf_path: str):
+        self.timings: "Timings" = timings
+        self.phase: str = phase
+        self.cf_path: str = cf_path
+        
+        # Counters of the phase (bytes, lines, tokens...)
+        self.counters: Dict[str, int] = {}
+        
+        self.start_time: float = 0.0
+        self.start_cpu_time: float = 0.0
+    
+    
+    def __enter__(self) -> "TimingSpan":
+        self.start_time = time.perf_counter()
+        self.start_cpu_time = time.process_time()
+        return self
+    
+    
+    def __exit__(self, *args):
+        self.timings.events.append((
+            self.phase,
+            self.cf_path,
+            self.start_time,
+            time.perf_counter() - self.start_time,
+            time.process_time() - self.start_cpu_time,
+            os.getpid(),
+            self.counters
+        ))
+    
+    
+    def count(self, **counters: int):
+        """Adds values to the counters of the phase."""
+        
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+class NullSpan:
+    """Span of the disabled recorders, every operation is a no-op."""
+    
+    __slots__ = ()
+    
+    def __enter__(self) -> "NullSpan":
+        return self
+    
+    
+    def __exit__(self, *args):
+        pass
+    
+    
+    def count(self, **counters: int):
+        pass
+
+
+# Shared by all the disabled recorders (no allocation per span)
+NULL_SPAN = NullSpan()
+
+
+class Timings:
+    """
+    Per-phase and per-file timings recorder (--timings), every span records its wall time,
+    its CPU time and its counters.
+    
+    Note:
+        A disabled recorder returns a shared no-op span, so the instrumentation points
+        only cost a method call when the timings are not requested.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        # False turns every span into a no-op
+        self.enabled: bool = enabled
+        
+        # Recorded spans (worker events are merged by the driver)
+        self.events: List[TimingEvent] = []
+    
+    
+    def span(self, phase: str, cf_path: Optional[Path] = None):
+        """
+        Returns the span of a phase, used as a context manager.
+        
+        Args:
+            phase (str): The name of the phase ("walk", "config", "scan", "parse", "emit"...).
+            cf_path (Path, optional): The path of the processed file (None for project phases).
+        
+        Returns:
+            Union[TimingSpan, NullSpan]: The span (no-op if the recorder is disabled).
+        """
+        
+        if not self.enabled:
+            return NULL_SPAN
+        
+        return TimingSpan(self, phase, str(cf_path) if cf_path is not None else "")
+    
+    
+    def merge(self, events: Optional[List[TimingEvent]]):
+        """Adds the events recorded by another recorder (worker process)."""
+        
+        if events:
+            self.events.extend(events)
+    
+    
+    def summarize(self) -> Dict[str, Any]:
+        """
+        Aggregates the events per phase and per file.
+        
+        Returns:
+            Dict[str, Any]: The totals of every phase ("phases") and of every file ("files"),
+                with their wall/CPU times (seconds), their span count and their counters.
+        """
+        
+        phases: Dict[str, Dict[str, Any]] = {}
+        files: Dict[str, Dict[str, Any]] = {}
+        
+        for phase, cf_path, _, wall_time, cpu_time, _, counters in self.events:
+            totals = [phases.setdefault(phase, {"wall": 0.0, "cpu": 0.0, "count": 0, "counters": {}})]
+            
+            if cf_path:
+                totals.append(files.setdefault(cf_path, {"wall": 0.0, "cpu": 0.0, "count": 0, "counters": {}}))
+            
+            for total in totals:
+                total["wall"] += wall_time
+                total["cpu"] += cpu_time
+                total["count"] += 1
+                
+                for name, value in counters.items():
+                    total["counters"][name] = total["counters"].get(name, 0) + value
+        
+        return {"phases": phases, "files": files}
+    
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Returns the summary and the raw events (machine-readable output)."""
+        
+        summary = self.summarize()
+        summary["events"] = [
+            {
+                "phase": phase,
+                "file": cf_path,
+                "start": start_time,
+                "wall": wall_time,
+                "cpu": cpu_time,
+                "pid": pid,
+                "counters": counters
+            }
+            for phase, cf_path, start_time, wall_time, cpu_time, pid, counters in self.events
+        ]
+        
+        return summary
+    
+    
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Returns the events in the Chrome trace format (chrome://tracing, Perfetto)."""
+        
+        origin = min((event[2] for event in self.events), default=0.0)
+        
+        return {
+            "traceEvents": [
+                {
+                    "name": f"{phase} {Path(cf_path).name}" if cf_path else phase,
+                    "cat": phase,
+                    "ph": "X",
+                    "ts": (start_time - origin) * 1_000_000,
+                    "dur": wall_time * 1_000_000,
+                    "pid": 0,
+                    "tid": pid,
+                    "args": dict(counters, file=cf_path, cpu_ms=cpu_time * 1000)
+                }
+                for phase, cf_path, start_time, wall_time, cpu_time, pid, counters in self.events
+            ],
+            "displayTimeUnit": "ms"
+        }
+    
+    
+    def format_report(self, file_count: int = 10) -> str:
+        """
+        Formats the summary as a table (--timings).
+        
+        Args:
+            file_count (int, optional): The number of slowest files to list.
+        
+        Returns:
+            str: The phases totals followed by the slowest files.
+        """
+        
+        summary = self.summarize()
+        lines: List[str] = [f"{'phase':<16} {'wall ms':>10} {'cpu ms':>10} {'spans':>7}  counters"]
+        
+        for phase, total in summary["phases"].items():
+            counters = ", ".join(f"{name}={value}" for name, value in total["counters"].items())
+            lines.append(
+                f"{phase:<16} {total['wall'] * 1000:10.2f} {total['cpu'] * 1000:10.2f} {total['count']:7}  {counters}"
+            )
+        
+        slowest_files = sorted(summary["files"].items(), key=lambda i: i[1]["wall"], reverse=True)
+        
+        if len(slowest_files) > 0:
+            lines.append("")
+            lines.append(f"{'slowest files':<16} {'wall ms':>10} {'cpu ms':>10}")
+            
+            for cf_path, total in slowest_files[:file_count]:
+                lines.append(f"{total['wall'] * 1000:27.2f} {total['cpu'] * 1000:10.2f}  {cf_path}")
+        
+        return "\n".join(lines)
@@ -0,0 +1,326 @@
+from compiler import Cache, Paths, Loader, Driver
+from compiler.contexts import FileContext, ProjectContext
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set
+from pathlib import Path
+from fnmatch import fnmatch
+
+import time
+import os
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+class Watcher:
+    """
+    Keeps the project state resident and recompiles the changed files only
+    (polling of the file/directory modification times, no third-party dependency).
+    
+    Note:
+        Only the known directories are listed again, and only when their own
+        modification time changes (a file has been added, removed or renamed).
+    """
+    
+    def __init__(
+        self,
+        project_dir_path: Path,
+        max_workers: Optional[int] = None,
+        cache_dir_path: Optional[Path] = None,
+        config_filename: str = "clua.config.yaml",
+        emit: bool = False,
+        executor: Optional["Executor"] = None,
+        project: Optional[ProjectContext] = None
+    ):
+        # Path of the watched project directory
+        self.project_dir_path: Path = project_dir_path
+        
+        # Loaded state of the project (the project of the command line by default)
+        self.project: ProjectContext = project if project is not None else Cache.Project
+        
+        # Driver options
+        self.max_workers: Optional[int] = max_workers
+        self.cache_dir_path: Optional[Path] = cache_dir_path
+        self.emit: bool = emit
+        
+        # Resident process pool of the compilation server (None starts workers per rebuild)
+        self.executor: Optional["Executor"] = executor
+        
+        # Name of the user config files
+        self.config_filename: str = config_filename
+        
+        # Last known modification times (nanoseconds) of the watched files/directories
+        self.file_mtimes: Dict[Path, int] = {}
+        self.dir_mtimes: Dict[Path, int] = {}
+    
+    
+    @staticmethod
+    def get_mtime(path: Path) -> Optional[int]:
+        """Returns the modification time of a path, or None if it doesn't exist anymore."""
+        
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+    
+    
+    def is_watched_file(self, path: Path) -> bool:
+        """Returns True for the clua files and the user config files."""
+        
+        return path.suffix == ".clua" or path.name == self.config_filename
+    
+    
+    def take_snapshot(self):
+        """Stores the modification times of the files/directories of the project tree."""
+        
+        self.file_mtimes.clear()
+        self.dir_mtimes = {self.project_dir_path: Watcher.get_mtime(self.project_dir_path) or 0}
+        
+        for path in self.project.project_tree or []:
+            mtime = Watcher.get_mtime(path)
+            
+            if mtime is None:
+                continue
+            
+            if path.is_dir():
+                self.dir_mtimes[path] = mtime
+            elif self.is_watched_file(path):
+                self.file_mtimes[path] = mtime
+    
+    
+    def poll(self) -> Set[Path]:
+        """
+        Compares the current modification times with the snapshot.
+        
+        Returns:
+            Set[Path]: The changed paths (modified, added or removed files).
+        """
+        
+        changed_paths: Set[Path] = set()
+        
+        # New files/directories (only the modified directories are listed)
+        for dir_path, dir_mtime in list(self.dir_mtimes.items()):
+            current_mtime = Watcher.get_mtime(dir_path)
+            
+            if current_mtime == dir_mtime:
+                continue
+            
+            if current_mtime is None:
+                del self.dir_mtimes[dir_path]
+                continue
+            
+            self.dir_mtimes[dir_path] = current_mtime
+            
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        path = Path(entry.path)
+                        
+                        if any(fnmatch(entry.name, pattern) for pattern in self.project.excluded_patterns):
+                            continue
+                        
+                        if entry.is_dir(follow_symlinks=False) and path not in self.dir_mtimes:
+                            changed_paths.update(self.poll_new_directory(path))
+                        elif entry.is_file() and path not in self.file_mtimes and self.is_watched_file(path):
+                            file_mtime = Watcher.get_mtime(path)
+                            
+                            # Removed since the listing
+                            if file_mtime is None:
+                                continue
+                            
+                            self.file_mtimes[path] = file_mtime
+                            changed_paths.add(path)
+            except OSError:
+                # Removed since get_mtime() (same as a missing directory)
+                del self.dir_mtimes[dir_path]
+        
+        # Modified/removed files
+        for file_path, file_mtime in list(self.file_mtimes.items()):
+            current_mtime = Watcher.get_mtime(file_path)
+            
+            if current_mtime != file_mtime:
+                changed_paths.add(file_path)
+                
+                if current_mtime is None:
+                    del self.file_mtimes[file_path]
+                else:
+                    self.file_mtimes[file_path] = current_mtime
+        
+        return changed_paths
+    
+    
+    def poll_new_directory(self, dir_path: Path) -> Set[Path]:
+        """Registers the content of a new directory, returns its watched files."""
+        
+        clua_paths, config_paths, dir_paths = Paths.walk_project(
+            dir_path,
+            self.config_filename,
+            self.project.excluded_patterns
+        )
+        
+        for path in [dir_path] + dir_paths:
+            self.dir_mtimes[path] = Watcher.get_mtime(path) or 0
+        
+        for path in clua_paths + config_paths:
+            self.file_mtimes[path] = Watcher.get_mtime(path) or 0
+        
+        return set(clua_paths + config_paths)
+    
+    
+    def rebuild(self, changed_paths: Set[Path]) -> List[FileContext]:
+        """
+        Updates the project cache with the changed paths and recompiles the affected files
+        (changed clua files, every clua file below a changed config file, and all the files
+        requiring them, directly or not), in build order.
+        
+        Args:
+            changed_paths (Set[Path]): The changed paths returned by poll().
+        
+        Returns:
+            List[FileContext]: The compilation contexts of the recompiled files.
+        """
+        
+        clua_trace: List[Path] = list(self.project.clua_trace or [])
+        config_resolver = self.project.config_resolver
+        import_graph = self.project.import_graph
+        
+        affected_paths: Set[Path] = set()
+        removed_paths: Set[Path] = set()
+        config_dir_paths: List[Path] = []
+        
+        for path in changed_paths:
+            exists = path in self.file_mtimes
+            
+            if path.name == self.config_filename:
+                # Reloaded on demand by the next compilation
+                if config_resolver is not None:
+                    config_resolver.invalidate(path, exists)
+                
+                config_dir_paths.append(path.parent)
+            elif exists:
+                if path not in clua_trace:
+                    clua_trace.append(path)
+                
+                affected_paths.add(path)
+            elif path in clua_trace:
+                clua_trace.remove(path)
+                removed_paths.add(path)
+                self.project.compiler_tokens.pop(path, None)
+        
+        # The "exclude" list of the root config drives the project walk
+        if self.project_dir_path / self.config_filename in changed_paths and config_resolver is not None:
+            root_config = config_resolver.resolve(self.project_dir_path)
+            
+            if list(root_config.get("exclude", [])) != self.project.excluded_patterns:
+                return self.reload()
+        
+        # Dependents of the config files (all the clua files below their directory)
+        for cf_path in clua_trace:
+            if any(dir_path in cf_path.parents for dir_path in config_dir_paths):
+                affected_paths.add(cf_path)
+        
+        rebuild_waves: Optional[List[List[Path]]] = None
+        
+        if import_graph is not None:
+            # The dependents of a removed file lose one of their imports
+            for cf_path in removed_paths:
+                affected_paths.update(import_graph.dependents.get(cf_path, ()))
+            
+            import_graph.update(
+                [cf_path for cf_path in affected_paths if cf_path in changed_paths],
+                removed_paths
+            )
+            
+            affected_paths = import_graph.transitive_dependents(affected_paths - removed_paths)
+            clua_trace = import_graph.topological_order(clua_trace)
+            rebuild_waves = import_graph.topological_waves(affected_paths & set(clua_trace))
+        
+        self.project.clua_trace = clua_trace
+        
+        # Trace order is kept for the recompiled files
+        rebuild_trace = [cf_path for cf_path in clua_trace if cf_path in affected_paths]
+        
+        if len(rebuild_trace) == 0:
+            return []
+        
+        return Driver.compile_trace(
+            rebuild_trace,
+            self.max_workers,
+            self.cache_dir_path,
+            self.emit,
+            rebuild_waves,
+            self.executor,
+            self.project
+        )
+    
+    
+    def reload(self) -> List[FileContext]:
+        """
+        Loads the project again (walk, import graph and trace) and recompiles all its files,
+        used when the "exclude" list of the root config changes.
+        
+        Returns:
+            List[FileContext]: The compilation contexts of all the files of the new trace.
+        """
+        
+        previous_trace = set(self.project.clua_trace or [])
+        
+        if not Loader.initialize_project(self.project_dir_path, self.project):
+            self.project.project_tree = []
+            self.project.clua_trace = []
+        
+        clua_trace: List[Path] = list(self.project.clua_trace or [])
+        
+        # Files excluded (or removed) since the previous walk
+        for cf_path in previous_trace.difference(clua_trace):
+            self.project.compiler_tokens.pop(cf_path, None)
+        
+        # Taken before the compilation, the files saved meanwhile are rebuilt by the next poll
+        self.take_snapshot()
+        
+        if len(clua_trace) == 0:
+            return []
+        
+        import_graph = self.project.import_graph
+        
+        return Driver.compile_trace(
+            clua_trace,
+            self.max_workers,
+            self.cache_dir_path,
+            self.emit,
+            import_graph.topological_waves() if import_graph is not None else None,
+            self.executor,
+            self.project
+        )
+    
+    
+    def run(
+        self,
+        on_rebuild: Callable[[List[FileContext]], None],
+        interval: float = 0.5
+    ):
+        """
+        Watches the project until interrupted (KeyboardInterrupt).
+        
+        Note:
+            The snapshot should be taken before the initial compilation of the project
+            (take_snapshot()), so the files saved while it runs are rebuilt,
+            it is only taken here if it doesn't exist yet.
+        
+        Args:
+            on_rebuild (Callable[[List[FileContext]], None]): Called after every rebuild.
+            interval (float, optional): The polling interval in seconds.
+        """
+        
+        if len(self.dir_mtimes) == 0:
+            self.take_snapshot()
+        
+        try:
+            while True:
+                time.sleep(interval)
+                changed_paths = self.poll()
+                
+                if len(changed_paths) > 0:
+                    on_rebuild(self.rebuild(changed_paths))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,85 @@
+from typing import Callable, List
+from pathlib import Path
+
+import random
+import sys
+
+import pytest
+
+
+# The compiler package lives in src/ (no installation needed)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+# Source fragments mixing every token family, joined without separators so that
+# the fuzzed buffers also contain glued tokens (long brackets, comments, operators)
+SOURCE_FRAGMENTS: List[bytes] = [
+    b"local x = 1\n",
+    b"local function f(a, b) return a .. b end\n",
+    b"y = x // 2 ~= 3 and ... or nil;",
+    b"t = {1, 2.5e3, 0x1F, [\"k\"] = 'v'}\n",
+    b"print(\"a--b\", 'c\\'d', \"e\\\"f\")",
+    b"s = [[long\nstring]]",
+    b"s = [==[level ]] two]==]",
+    b"-- line comment\n",
+    b"--[[ long\ncomment ]]",
+    b"--[=[ level\n]] one ]=]",
+    b"if a >= b then c() elseif d then e() else f() end\n",
+    b"for i = 1, 10 do x = x + i end\n",
+    b"a = b << 2 >> 1 | 3 & 4 ~ 5\n",
+    b"\n",
+    b"  \t",
+    b";",
+    b"[",
+    b"]",
+    b"=",
+    b"-",
+    b"'",
+    b"\"",
+    b"@",
+]
+
+# Bytes inserted by the random edits (openers and closers that merge or split tokens)
+EDIT_BYTES = b"[]=-'\"\\\n ;.x1"
+
+
+def generate_source(rnd: random.Random, max_fragments: int = 40) -> bytes:
+    """Returns a random source buffer made of SOURCE_FRAGMENTS."""
+    
+    return b"".join(rnd.choice(SOURCE_FRAGMENTS) for _ in range(rnd.randint(0, max_fragments)))
+
+
+def generate_edit_text(rnd: random.Random) -> bytes:
+    """Returns the random text inserted by an edit (fragment or a few edit bytes)."""
+    
+    if rnd.random() < 0.5:
+        return rnd.choice(SOURCE_FRAGMENTS)
+    
+    return bytes(rnd.choice(EDIT_BYTES) for _ in range(rnd.randint(0, 4)))
+
+
+@pytest.fixture
+def rnd() -> random.Random:
+    """Seeded random generator (the fuzzed cases are the same on every run)."""
+    
+    return random.Random(1337)
+
+
+@pytest.fixture
+def source_generator() -> Callable[[random.Random], bytes]:
+    return generate_source
+
+
+@pytest.fixture
+def edit_text_generator() -> Callable[[random.Random], bytes]:
+    return generate_edit_text
+
+
+@pytest.fixture(autouse=True)
+def user_cache_dir(tmp_path, monkeypatch) -> Path:
+    """Per-user cache directory of the test (the signing key of the disk cache is created there)."""
+    
+    cache_home_path = tmp_path / "user_cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home_path))
+    
+    return cache_home_path / "clua"
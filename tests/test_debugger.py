@@ -0,0 +1,54 @@
+from compiler import SourceBuffer, LineIndex, Debugger
+
+from pathlib import Path
+
+
+MESSAGES = {
+    "i001": {"logType": "Info", "message": "note {0}"},
+    "w001": {"logType": "Warning", "message": "unused {0}"},
+    "w002": {"logType": "Warning", "message": "shadowed {0}"},
+    "e001": {"logType": "Error", "message": "unexpected {0}"}
+}
+
+DIAGNOSTICS = [
+    ("e001", 9, ("end",)),
+    ("w001", 4, ("x",)),
+    ("i001", 0, ()),
+    ("w002", 6, ("y",)),
+    ("x999", 2, ())
+]
+
+
+def get_codes(debugger):
+    return [diagnostic[0] for diagnostic in debugger.filter(DIAGNOSTICS)]
+
+
+def test_log_level():
+    # Sorted by offset, the unknown codes are errors
+    assert get_codes(Debugger(MESSAGES)) == ["i001", "x999", "w001", "w002", "e001"]
+    assert get_codes(Debugger(MESSAGES, "Warning")) == ["x999", "w001", "w002", "e001"]
+    assert get_codes(Debugger(MESSAGES, "Error")) == ["x999", "e001"]
+    
+    assert Debugger(MESSAGES).get_log_type("x999") == Debugger.Types.ERROR
+
+
+def test_ignored_diagnostics():
+    debugger = Debugger.from_options(MESSAGES, {"logLevel": "Info", "ignoreDiagnostics": ["w001", "i001", "e001"]})
+    
+    # The errors are always reported
+    assert get_codes(debugger) == ["x999", "w002", "e001"]
+    
+    # Missing options report everything
+    assert get_codes(Debugger.from_options(MESSAGES, {"logLevel": None})) == get_codes(Debugger(MESSAGES))
+
+
+def test_format():
+    data = b"local x\n\tif end\n"
+    debugger = Debugger(MESSAGES)
+    
+    text = debugger.format(Path("a.clua"), ("e001", 12, ("end",)), LineIndex.from_buffer(data), SourceBuffer.from_bytes(data))
+    
+    assert text == "a.clua:2:5: Error e001: unexpected end\n    \tif end\n    \t   ^"
+    
+    # Missing arguments keep the template
+    assert debugger.format_message("w001", ()) == "unused {0}"
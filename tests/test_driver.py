@@ -0,0 +1,107 @@
+from compiler import DiskCache, OutputFile, Scanner, Parser, Driver
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+SOURCE = b"""local x: number = 1 -- one
+local function f(a: string): string return a end
+"""
+
+EMIT_OPTIONS = {"removeComments": True, "sourceMap": True}
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("the file has been scanned again")
+
+
+def test_cache_hit_writes_the_stored_output(tmp_path, monkeypatch):
+    cf_path = tmp_path / "a.clua"
+    cf_path.write_bytes(SOURCE)
+    disk_cache = DiskCache(tmp_path / ".clua_cache", "test")
+    
+    # Checked only, the entry is completed by the first emitting hit
+    context = Driver.compile_file(cf_path, disk_cache, "config")
+    assert not context.cached and context.output_path is None
+    
+    context = Driver.compile_file(cf_path, disk_cache, "config", EMIT_OPTIONS)
+    assert context.cached and context.emitted_output is None
+    
+    output = cf_path.with_suffix(".lua").read_bytes()
+    source_map = cf_path.with_suffix(".lua.map").read_bytes()
+    assert output == b"local x = 1 \nlocal function f(a) return a end\n"
+    
+    cf_path.with_suffix(".lua").unlink()
+    cf_path.with_suffix(".lua.map").unlink()
+    
+    # Same content at another path, neither scanned nor parsed
+    other_path = tmp_path / "b.clua"
+    other_path.write_bytes(SOURCE)
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(Scanner, "scan", fail)
+        patch.setattr(Scanner, "tokenize", fail)
+        patch.setattr(Parser, "parse", fail)
+        
+        for path in (cf_path, other_path):
+            context = Driver.compile_file(path, disk_cache, "config", EMIT_OPTIONS)
+            
+            assert context.cached and context.emitted_output is None
+            assert path.with_suffix(".lua").read_bytes() == output
+    
+    assert cf_path.with_suffix(".lua.map").read_bytes() == source_map
+    assert b'"file":"b.lua","sources":["b.clua"]' in other_path.with_suffix(".lua.map").read_bytes()
+
+
+@pytest.mark.parametrize("remove_comments", [False, True])
+def test_emitted_output_is_not_kept_without_cache(tmp_path, remove_comments):
+    cf_path = tmp_path / "a.clua"
+    cf_path.write_bytes(SOURCE)
+    
+    context = Driver.compile_file(cf_path, None, "", {"removeComments": remove_comments})
+    
+    assert context.emitted_output is None
+    assert (b"-- one" in cf_path.with_suffix(".lua").read_bytes()) is not remove_comments
+
+
+def test_single_file_wave_uses_the_resident_workers(tmp_path, monkeypatch):
+    cf_paths = [tmp_path / f"{name}.clua" for name in "abc"]
+    scan_executors = []
+    
+    for cf_path in cf_paths:
+        cf_path.write_bytes(SOURCE)
+    
+    def scan_parallel(buffer, max_workers=None, symbol_table=None, executor=None, **kwargs):
+        scan_executors.append((buffer.path.name, max_workers, executor))
+        return Scanner.scan(buffer, symbol_table=symbol_table)
+    
+    monkeypatch.setattr(Scanner, "scan_parallel", scan_parallel)
+    
+    # Compilation server pool, a thread pool runs the wave of two files in this process
+    with ThreadPoolExecutor(2) as executor:
+        contexts = Driver.compile_trace(cf_paths, 2, waves=[[cf_paths[0]], cf_paths[1:]], executor=executor)
+    
+    assert [context.cf_path for context in contexts] == cf_paths
+    assert all(context.loaded for context in contexts)
+    
+    # Only the file compiled alone is tokenized across the workers
+    assert scan_executors == [("a.clua", 2, executor)]
+
+
+def test_thread_pool_outputs_are_not_mixed(tmp_path, monkeypatch):
+    cf_paths = [tmp_path / f"f{index}.clua" for index in range(8)]
+    
+    # Small blocks, flushed while the other threads write theirs
+    monkeypatch.setattr(OutputFile.__init__, "__defaults__", (None, 4096))
+    
+    for index, cf_path in enumerate(cf_paths):
+        cf_path.write_bytes(b"".join(b"local v%d_%d: T = %d\n" % (index, line, line) for line in range(5000)))
+    
+    with ThreadPoolExecutor(4) as executor:
+        Driver.compile_trace(cf_paths, 4, emit=True, executor=executor)
+    
+    for index, cf_path in enumerate(cf_paths):
+        expected_output = b"".join(b"local v%d_%d = %d\n" % (index, line, line) for line in range(5000))
+        
+        assert cf_path.with_suffix(".lua").read_bytes() == expected_output
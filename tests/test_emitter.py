@@ -0,0 +1,77 @@
+from compiler import SourceBuffer, Scanner, Parser, Emitter
+
+import io
+
+
+ANNOTATED_SOURCE = b"""local x: number = 1
+local function f(a: string, b: Foo.Bar): string --[[ c ]] return a end
+function t.m(self, y:number):boolean return y > 0 end
+print(t:m(2), f("s"), x) -- done
+for i: number = 1, 2 do print(i) end
+local s = "a: b" -- note: colon
+"""
+
+EXPECTED_OUTPUT = b"""local x = 1
+local function f(a, b) --[[ c ]] return a end
+function t.m(self, y) return y > 0 end
+print(t:m(2), f("s"), x) -- done
+for i = 1, 2 do print(i) end
+local s = "a: b" -- note: colon
+"""
+
+# Valid statements (the whole-file and the per-statement parses agree on them)
+STATEMENT_FRAGMENTS = [
+    b"local x: number = 1",
+    b"local a, b: Foo.Bar = 1, 2",
+    b"local function f(a: string, ...): string return a end",
+    b"function t.m(self, y:number):boolean return y > 0 end",
+    b"function t:n(z) return self end",
+    b"print(t:m(2), 'x: y') -- call: comment",
+    b"--[[ long: comment ]] x = 2",
+    b"for i: number = 1, 2 do print(i) end",
+    b"for k: string, v in pairs(t) do end",
+    b"local c <const> = 3",
+    b"local d: T <const>, e = 4, 5",
+    b"g = function(a: T, b): U.V return a end",
+    b"t:m 'x' t:m { y = 1 }",
+    b"local h: --[[ type: ]] T = 6",
+    b"::label:: goto label",
+    b"do local y: T = x end",
+]
+
+
+def emit(emit_function, source: bytes, remove_comments: bool) -> bytes:
+    buffer = SourceBuffer.from_bytes(source)
+    output_file = io.BytesIO()
+    
+    if emit_function == "tree":
+        tree = Parser(Scanner.scan(buffer)).parse()
+        Emitter.emit_tree(tree, buffer, output_file, remove_comments)
+    else:
+        parser = Parser(Scanner.scan(buffer))
+        Emitter.emit_statements(parser.iter_statements(), parser.tree, buffer, output_file, remove_comments)
+    
+    return output_file.getvalue()
+
+
+def test_type_annotations_are_removed():
+    for emit_function in ("tree", "statements"):
+        assert emit(emit_function, ANNOTATED_SOURCE, False) == EXPECTED_OUTPUT
+
+
+def test_emit_paths_agree(rnd, source_generator):
+    for _ in range(300):
+        source = b"\n".join(rnd.choice(STATEMENT_FRAGMENTS) for _ in range(rnd.randint(0, 12)))
+        
+        for remove_comments in (False, True):
+            tree_output = emit("tree", source, remove_comments)
+            
+            assert emit("statements", source, remove_comments) == tree_output, source
+            assert b": number" not in tree_output and b"Foo.Bar" not in tree_output
+    
+    # Invalid sources (error nodes, stray block endings, unfinished comments)
+    for _ in range(300):
+        source = source_generator(rnd)
+        
+        for remove_comments in (False, True):
+            assert emit("statements", source, remove_comments) == emit("tree", source, remove_comments), source
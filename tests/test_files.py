@@ -0,0 +1,28 @@
+from compiler import Files
+
+import threading
+import sys
+
+
+def test_dump_pickle_round_trip(tmp_path):
+    file_path = tmp_path / "cache" / "entry.pickle"
+    
+    assert Files.dump_pickle(file_path, {"tokens": [1, 2, 3]})
+    assert Files.load_pickle(file_path) == {"tokens": [1, 2, 3]}
+
+
+def test_dump_pickle_failures_leave_no_temporary_file(tmp_path):
+    file_path = tmp_path / "entry.pickle"
+    
+    # Unpicklable content
+    assert not Files.dump_pickle(file_path, threading.Lock())
+    
+    # Too deeply nested content
+    nested_content: list = []
+    
+    for _ in range(sys.getrecursionlimit() * 2):
+        nested_content = [nested_content]
+    
+    assert not Files.dump_pickle(file_path, nested_content)
+    
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,111 @@
+from compiler import ImportGraph
+
+
+SCANNED_SOURCE = b"""local a = require "a"
+local bc = require('b.c')
+local d = require 'd'
+-- require "comment"
+--[[ require "long.comment" ]]
+--[==[ ]] require "level.comment" ]==]
+local s = "require 'string'" .. [[ require "long.string" ]] .. 'it\\'s require "escaped"'
+local m = f(require("e"), g(require 'f'), require "a")
+obj.require("field") obj:require("method") myrequire("name")
+"""
+
+
+def build_graph(tmp_path, sources):
+    """Writes the project files (module name -> source) and builds their graph."""
+    
+    cf_paths = {}
+    
+    for name, source in sources.items():
+        cf_path = tmp_path / name
+        cf_path.parent.mkdir(parents=True, exist_ok=True)
+        cf_path.write_text(source)
+        
+        cf_paths[name] = cf_path
+    
+    import_graph = ImportGraph(tmp_path)
+    import_graph.build(list(cf_paths.values()))
+    
+    return import_graph, cf_paths
+
+
+def get_names(cf_paths, waves):
+    names = {cf_path: name for name, cf_path in cf_paths.items()}
+    return [[names[cf_path] for cf_path in wave] for wave in waves]
+
+
+def test_scan_imports_skips_comments_and_strings():
+    assert ImportGraph.scan_imports(SCANNED_SOURCE) == ["a", "b.c", "d", "e", "f"]
+    assert ImportGraph.scan_imports(b"x = 1") == []
+
+
+def test_diamond_dependencies(tmp_path):
+    import_graph, cf_paths = build_graph(tmp_path, {
+        "top.clua": "local l, r = require 'left', require 'pkg'",
+        "left.clua": "return require('base')",
+        "pkg/init.clua": "return require 'base'",
+        "base.clua": "return {}",
+        "other.clua": "local lib = require 'lpeg'"
+    })
+    
+    assert import_graph.dependencies[cf_paths["top.clua"]] == {cf_paths["left.clua"], cf_paths["pkg/init.clua"]}
+    assert import_graph.dependents[cf_paths["base.clua"]] == {cf_paths["left.clua"], cf_paths["pkg/init.clua"]}
+    
+    # Unresolved modules (Lua libraries) have no edge
+    assert import_graph.dependencies[cf_paths["other.clua"]] == set()
+    
+    assert get_names(cf_paths, import_graph.topological_waves()) == [
+        ["base.clua", "other.clua"],
+        ["left.clua", "pkg/init.clua"],
+        ["top.clua"]
+    ]
+    
+    # The dependencies outside of the subset are already built
+    assert get_names(cf_paths, import_graph.topological_waves([cf_paths["top.clua"], cf_paths["left.clua"]])) == [
+        ["left.clua"],
+        ["top.clua"]
+    ]
+    
+    assert import_graph.transitive_dependents([cf_paths["left.clua"]]) == {cf_paths["left.clua"], cf_paths["top.clua"]}
+    assert import_graph.transitive_dependents([cf_paths["base.clua"]]) == set(cf_paths.values()) - {cf_paths["other.clua"]}
+
+
+def test_import_cycles_are_built_last(tmp_path):
+    import_graph, cf_paths = build_graph(tmp_path, {
+        "a.clua": "require 'b'",
+        "b.clua": "require 'a'",
+        "c.clua": "require 'a'",
+        "d.clua": "",
+        "e.clua": "require 'd'"
+    })
+    
+    assert get_names(cf_paths, import_graph.topological_waves()) == [["d.clua"], ["e.clua"], ["a.clua", "b.clua", "c.clua"]]
+    
+    # The traversal stops at the files already visited
+    assert import_graph.transitive_dependents([cf_paths["b.clua"]]) == {
+        cf_paths["a.clua"],
+        cf_paths["b.clua"],
+        cf_paths["c.clua"]
+    }
+
+
+def test_update_links_the_added_and_removed_files(tmp_path):
+    import_graph, cf_paths = build_graph(tmp_path, {
+        "a.clua": "require 'b' require 'c'",
+        "b.clua": ""
+    })
+    
+    assert import_graph.dependencies[cf_paths["a.clua"]] == {cf_paths["b.clua"]}
+    
+    # The module "c" is resolved once its file is added
+    c_path = tmp_path / "c.clua"
+    c_path.write_text("")
+    cf_paths["b.clua"].unlink()
+    
+    import_graph.update([c_path], [cf_paths["b.clua"]])
+    
+    assert import_graph.dependencies[cf_paths["a.clua"]] == {c_path}
+    assert import_graph.dependents[c_path] == {cf_paths["a.clua"]}
+    assert cf_paths["b.clua"] not in import_graph.dependents
@@ -0,0 +1,55 @@
+from compiler import LineIndex
+
+import pytest
+
+
+def test_crlf_and_trailing_newline():
+    line_index = LineIndex.from_buffer(b"a\r\nbc\r\n")
+    
+    # The trailing newline doesn't open a new line
+    assert list(line_index.line_starts) == [0, 3]
+    assert line_index.line_span(1) == (3, 7)
+    
+    # "\r" and "\n" belong to the line they end
+    assert [line_index.offset_to_line_col(offset) for offset in range(8)] == [
+        (0, 0), (0, 1), (0, 2),
+        (1, 0), (1, 1), (1, 2), (1, 3),
+        (1, 4)
+    ]
+    
+    assert line_index.line_col_to_offset(1, 3) == 6
+    
+    with pytest.raises(IndexError):
+        line_index.seek_line(-1)
+    
+    with pytest.raises(IndexError):
+        line_index.seek_line(2)
+
+
+@pytest.mark.parametrize("data, line_starts", [
+    (b"", [0]),
+    (b"\n", [0]),
+    (b"\n\n", [0, 1]),
+    (b"a\rb", [0]),
+    (b"a\nb", [0, 2]),
+])
+def test_line_starts(data, line_starts):
+    assert list(LineIndex.from_buffer(data).line_starts) == line_starts
+
+
+def test_offset_round_trip(rnd, source_generator):
+    for _ in range(100):
+        data = source_generator(rnd).replace(b"\n", rnd.choice([b"\n", b"\r\n"]))
+        line_index = LineIndex.from_buffer(data)
+        lines = data.splitlines(keepends=True) or [b""]
+        
+        # Same lines as the stored line lengths (Register.cf_line_lengths)
+        assert list(LineIndex.from_lengths(len(line) for line in lines).line_starts) == list(line_index.line_starts)
+        assert len(line_index) == len(lines)
+        
+        for offset in range(len(data) + 1):
+            line_number, column = line_index.offset_to_line_col(offset)
+            line_start, line_end = line_index.line_span(line_number)
+            
+            assert line_start <= offset <= line_end
+            assert line_index.line_col_to_offset(line_number, column) == offset
@@ -0,0 +1,23 @@
+from compiler import SourceBuffer, Operator, Register
+
+
+def test_apply_edit_closes_the_replaced_buffer(tmp_path):
+    cf_path = tmp_path / "a.clua"
+    cf_path.write_bytes(b"local a = 1\nlocal b = 2\nlocal c = 3\n")
+    
+    cf_object = Operator.open_cf(cf_path)
+    
+    try:
+        edited_object = SourceBuffer.from_bytes(b"local a = 1\nlocal bb = 22\nlocal c = 3\n")
+        line_start = Operator.cf_apply_edit(edited_object, 18)
+        
+        assert cf_object.data.closed
+        assert Register.cf_object is edited_object
+        
+        # Only the edited line and the following ones are read again
+        assert line_start == 12
+        assert Register.cf_cursor.readline() == (12, 26)
+    finally:
+        Operator.close_cf(Register.cf_object)
+    
+    assert Register.cf_object is None
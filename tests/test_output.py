@@ -0,0 +1,79 @@
+from compiler import OutputFile
+
+from unittest import mock
+
+import pytest
+import stat
+import os
+
+
+CONTENT = b"local x = 1\nreturn x\n"
+
+
+def write_output(output_path, chunks, block_size=4) -> bool:
+    with OutputFile(output_path, block_size=block_size) as output_file:
+        for chunk in chunks:
+            output_file.write(chunk)
+    
+    assert output_file.size == sum(len(chunk) for chunk in chunks)
+    return output_file.changed
+
+
+def get_temp_paths(dir_path):
+    return [path for path in dir_path.iterdir() if path.suffix == ".tmp"]
+
+
+def test_unchanged_output_is_not_written(tmp_path):
+    output_path = tmp_path / "a.lua"
+    
+    assert write_output(output_path, [CONTENT])
+    os.utime(output_path, ns=(1, 1))
+    
+    # Split across many blocks, and larger than a block (written without a copy)
+    assert not write_output(output_path, [CONTENT[:3], CONTENT[3:5], CONTENT[5:]])
+    assert not write_output(output_path, [CONTENT], block_size=1024)
+    
+    assert os.stat(output_path).st_mtime_ns == 1
+    assert get_temp_paths(tmp_path) == []
+
+
+@pytest.mark.parametrize("content", [
+    CONTENT.replace(b"return", b"RETURN"),
+    CONTENT[:-1],
+    CONTENT + b"\n",
+    b""
+])
+def test_changed_output_is_replaced(tmp_path, content):
+    output_path = tmp_path / "a.lua"
+    output_path.write_bytes(CONTENT)
+    output_path.chmod(0o640)
+    
+    inode = os.stat(output_path).st_ino
+    
+    assert write_output(output_path, [content[:7], content[7:]])
+    
+    # Replaced by the temporary file (the matched blocks are copied), with the same mode
+    assert output_path.read_bytes() == content
+    assert os.stat(output_path).st_ino != inode
+    assert stat.S_IMODE(os.stat(output_path).st_mode) == 0o640
+    assert get_temp_paths(tmp_path) == []
+
+
+def test_temp_file_is_removed_on_error(tmp_path):
+    output_path = tmp_path / "a.lua"
+    output_path.write_bytes(CONTENT)
+    
+    with pytest.raises(RuntimeError):
+        with OutputFile(output_path, block_size=4) as output_file:
+            output_file.write(b"changed content")
+            
+            assert output_file.temp_file is not None
+            raise RuntimeError()
+    
+    with mock.patch("compiler.utilities.output.os.replace", side_effect=PermissionError):
+        with pytest.raises(PermissionError):
+            write_output(output_path, [b"changed content"])
+    
+    # The existing output is kept
+    assert output_path.read_bytes() == CONTENT
+    assert get_temp_paths(tmp_path) == []
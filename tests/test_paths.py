@@ -0,0 +1,19 @@
+from compiler import Paths
+from compiler.utilities import Files
+
+from pathlib import Path
+
+import compiler
+
+
+def test_default_excludes_keep_source_packages(tmp_path):
+    config = Files.load_yaml(Path(compiler.__file__).parent / "database" / "clua.config.yaml")
+    
+    for dir_name in ("build", "dist", ".git", "node_modules"):
+        (tmp_path / "src" / dir_name).mkdir(parents=True)
+        (tmp_path / "src" / dir_name / "a.clua").write_bytes(b"")
+    
+    clua_paths, _, dir_paths = Paths.walk_project(tmp_path, excluded_patterns=config["exclude"])
+    
+    assert sorted(path.parent.name for path in clua_paths) == ["build", "dist"]
+    assert tmp_path / "src" / "node_modules" not in dir_paths
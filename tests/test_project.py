@@ -0,0 +1,39 @@
+from compiler import SourceBuffer, Scanner
+from compiler.contexts import ProjectContext
+
+from pathlib import Path
+
+
+def scan(project, name, source):
+    cf_path = Path(name)
+    project.compiler_tokens[cf_path] = Scanner.scan(SourceBuffer.from_bytes(source), symbol_table=project.symbol_table)
+    
+    return cf_path
+
+
+def get_names(project, cf_path):
+    tokens = project.compiler_tokens[cf_path]
+    return [project.symbol_table.raw(symbol_id) for symbol_id in tokens.symbols]
+
+
+def test_symbols_of_removed_files_are_trimmed():
+    project = ProjectContext()
+    
+    kept_path = scan(project, "kept.clua", b"local kept = 'text' -- comment\nprint(kept)\n")
+    removed_path = scan(project, "removed.clua", b"".join(b"v%d = 1\n" % index for index in range(5000)))
+    
+    kept_names = get_names(project, kept_path)
+    
+    # Still below twice the minimum size
+    assert not project.trim_symbols()
+    
+    scan(project, "other.clua", b"".join(b"w%d = 1\n" % index for index in range(5000)))
+    del project.compiler_tokens[removed_path]
+    
+    assert project.trim_symbols()
+    # Reserved id, "kept", "'text'", "print" and the names of the other file
+    assert len(project.symbol_table) == 4 + 5000
+    assert get_names(project, kept_path) == kept_names
+    
+    # Trimmed again only once the table has doubled
+    assert not project.trim_symbols()
@@ -0,0 +1,91 @@
+from compiler import SourceBuffer, Scanner
+from compiler.contexts import SymbolTable, TokenStream
+
+
+# Pieces of numbers (exponents, hexadecimal digits) and of the tokens glued to them
+NUMBER_FRAGMENTS = [
+    b"1", b"0", b"e", b"E", b"x", b"p", b"-", b"+", b".", b"b", b"F", b"=", b" ", b"1e", b"0x", b"e-", b".5"
+]
+
+
+def get_tokens(token_stream: TokenStream):
+    return list(token_stream.kinds), list(token_stream.offsets), list(token_stream.lengths)
+
+
+def rescan(old_source: bytes, edit_start: int, edit_old_end: int, edit_text: bytes) -> TokenStream:
+    new_buffer = SourceBuffer.from_bytes(old_source[:edit_start] + edit_text + old_source[edit_old_end:])
+    old_stream = Scanner.scan(SourceBuffer.from_bytes(old_source))
+    
+    return Scanner.rescan(old_stream, new_buffer, edit_start, edit_old_end, edit_start + len(edit_text))
+
+
+def test_rescan_matches_full_scan(rnd, source_generator, edit_text_generator):
+    for _ in range(3000):
+        old_source = source_generator(rnd)
+        
+        edit_start = rnd.randint(0, len(old_source))
+        edit_old_end = rnd.randint(edit_start, min(edit_start + 8, len(old_source)))
+        edit_text = edit_text_generator(rnd)
+        
+        new_source = old_source[:edit_start] + edit_text + old_source[edit_old_end:]
+        new_buffer = SourceBuffer.from_bytes(new_source)
+        
+        old_stream = Scanner.scan(SourceBuffer.from_bytes(old_source))
+        new_stream = Scanner.rescan(old_stream, new_buffer, edit_start, edit_old_end, edit_start + len(edit_text))
+        
+        assert get_tokens(new_stream) == get_tokens(Scanner.scan(new_buffer)), (old_source, new_source)
+
+
+def test_rescan_completes_number_exponents():
+    # The "e" of "1e" is a name until the exponent digits are inserted
+    new_stream = rescan(b"a=1e-b", 5, 5, b"2")
+    
+    assert get_tokens(new_stream) == get_tokens(Scanner.scan(SourceBuffer.from_bytes(b"a=1e-2b")))
+    assert len(new_stream) == 4
+    
+    new_stream = rescan(b"0e-.=Ex", 3, 6, b"0.0")
+    
+    assert get_tokens(new_stream) == get_tokens(Scanner.scan(SourceBuffer.from_bytes(b"0e-0.0x")))
+
+
+def test_rescan_matches_full_scan_on_numbers(rnd):
+    for _ in range(5000):
+        old_source = b"".join(rnd.choice(NUMBER_FRAGMENTS) for _ in range(rnd.randint(0, 8)))
+        
+        edit_start = rnd.randint(0, len(old_source))
+        edit_old_end = rnd.randint(edit_start, min(edit_start + 3, len(old_source)))
+        edit_text = b"".join(rnd.choice(NUMBER_FRAGMENTS) for _ in range(rnd.randint(0, 2)))
+        
+        new_source = old_source[:edit_start] + edit_text + old_source[edit_old_end:]
+        new_stream = rescan(old_source, edit_start, edit_old_end, edit_text)
+        
+        assert get_tokens(new_stream) == get_tokens(Scanner.scan(SourceBuffer.from_bytes(new_source))), (
+            old_source,
+            new_source
+        )
+
+
+def test_rescan_reuses_interned_symbols(rnd, source_generator, edit_text_generator):
+    for _ in range(500):
+        old_source = source_generator(rnd)
+        edit_start = rnd.randint(0, len(old_source))
+        edit_text = edit_text_generator(rnd)
+        
+        new_source = old_source[:edit_start] + edit_text + old_source[edit_start:]
+        new_buffer = SourceBuffer.from_bytes(new_source)
+        
+        symbol_table = SymbolTable()
+        old_stream = Scanner.scan(SourceBuffer.from_bytes(old_source), symbol_table=symbol_table)
+        new_stream = Scanner.rescan(
+            old_stream,
+            new_buffer,
+            edit_start,
+            edit_start,
+            edit_start + len(edit_text),
+            symbol_table
+        )
+        
+        expected_stream = Scanner.scan(new_buffer, symbol_table=symbol_table)
+        
+        assert get_tokens(new_stream) == get_tokens(expected_stream)
+        assert list(new_stream.symbols) == list(expected_stream.symbols)
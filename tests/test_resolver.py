@@ -0,0 +1,88 @@
+from compiler import ConfigResolver
+
+
+DEFAULT_CONFIG = {"compilerOptions": {"logLevel": "info", "removeComments": False}, "exclude": []}
+
+
+def write_config(dir_path, content):
+    dir_path.mkdir(parents=True, exist_ok=True)
+    (dir_path / "clua.config.yaml").write_text(content)
+
+
+def test_merge_order(tmp_path):
+    write_config(tmp_path, "compilerOptions:\n  logLevel: warning\nexclude: [a]\n")
+    write_config(tmp_path / "sub", "compilerOptions:\n  removeComments: true\n")
+    write_config(tmp_path / "sub" / "deep", "compilerOptions:\n  logLevel: error\nexclude: [b]\n")
+    (tmp_path / "other").mkdir()
+    
+    resolver = ConfigResolver(tmp_path, DEFAULT_CONFIG)
+    
+    # Default config, then the config files from the project directory down
+    assert resolver.resolve(tmp_path / "sub" / "deep") == {
+        "compilerOptions": {"logLevel": "error", "removeComments": True},
+        "exclude": ["b"]
+    }
+    assert resolver.resolve(tmp_path / "sub") == {
+        "compilerOptions": {"logLevel": "warning", "removeComments": True},
+        "exclude": ["a"]
+    }
+    
+    # A directory without a config file shares the config of its parent
+    assert resolver.resolve(tmp_path / "other") is resolver.resolve(tmp_path)
+    assert resolver.resolve_file(tmp_path / "other" / "a.clua") is resolver.resolve(tmp_path)
+    
+    # The default config is never modified
+    assert DEFAULT_CONFIG["compilerOptions"] == {"logLevel": "info", "removeComments": False}
+    
+    # The inheritance stops at the project directory
+    write_config(tmp_path / "project", "compilerOptions:\n  removeComments: true\n")
+    assert ConfigResolver(tmp_path / "project", DEFAULT_CONFIG).resolve(tmp_path / "project") == {
+        "compilerOptions": {"logLevel": "info", "removeComments": True},
+        "exclude": []
+    }
+
+
+def test_known_config_paths(tmp_path):
+    write_config(tmp_path / "sub", "exclude: [a]\n")
+    
+    resolver = ConfigResolver(tmp_path, DEFAULT_CONFIG)
+    resolver.config_paths = set()
+    
+    # Only the config files found by the project walk are loaded
+    assert resolver.resolve(tmp_path / "sub") is DEFAULT_CONFIG
+    assert resolver.loaded_config_dicts == {}
+
+
+def test_invalidate(tmp_path):
+    write_config(tmp_path, "exclude: [a]\n")
+    write_config(tmp_path / "sub", "compilerOptions:\n  logLevel: error\n")
+    
+    resolver = ConfigResolver(tmp_path, DEFAULT_CONFIG)
+    resolver.config_paths = {tmp_path / "clua.config.yaml", tmp_path / "sub" / "clua.config.yaml"}
+    
+    deep_path = tmp_path / "sub" / "deep"
+    config_hash = resolver.get_config_hash(deep_path)
+    
+    assert resolver.resolve(deep_path)["exclude"] == ["a"]
+    
+    # Modified root config, every directory below it is resolved again
+    write_config(tmp_path, "exclude: [b]\n")
+    resolver.invalidate(tmp_path / "clua.config.yaml")
+    
+    assert resolver.resolve(deep_path)["exclude"] == ["b"]
+    assert resolver.resolve(deep_path)["compilerOptions"]["logLevel"] == "error"
+    assert resolver.get_config_hash(deep_path) != config_hash
+    
+    # Removed config
+    (tmp_path / "sub" / "clua.config.yaml").unlink()
+    resolver.invalidate(tmp_path / "sub" / "clua.config.yaml", exists=False)
+    
+    assert resolver.resolve(deep_path)["compilerOptions"]["logLevel"] == "info"
+    assert tmp_path / "sub" / "clua.config.yaml" not in resolver.loaded_config_dicts
+    
+    # Added config
+    write_config(deep_path, "compilerOptions:\n  removeComments: true\n")
+    resolver.invalidate(deep_path / "clua.config.yaml")
+    
+    assert resolver.resolve(deep_path)["compilerOptions"]["removeComments"] is True
+    assert resolver.resolve(tmp_path / "sub")["compilerOptions"]["removeComments"] is False
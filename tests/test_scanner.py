@@ -0,0 +1,79 @@
+from compiler import SourceBuffer, Scanner
+from compiler.contexts import Types, SymbolTable
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from conftest import SOURCE_FRAGMENTS
+
+
+Tokens = Types.Tokens
+
+# Fragments without unbalanced quotes or brackets (no unfinished string/comment)
+BALANCED_FRAGMENTS = [fragment for fragment in SOURCE_FRAGMENTS if fragment not in (b"[", b"'", b"\"")]
+
+UNFINISHED_KINDS = (Tokens.UNFINISHED_STRING, Tokens.UNFINISHED_LONG_STRING, Tokens.UNFINISHED_LONG_COMMENT)
+
+
+def get_tokens(stream):
+    return list(stream.kinds), list(stream.offsets), list(stream.lengths)
+
+
+def get_spans(stream, kinds):
+    return [(offset, offset + length) for kind, offset, length in stream if kind in kinds]
+
+
+def test_scan_parallel_matches_scan(rnd, source_generator):
+    # Threads run Scanner.tokenize_chunk() on the in-memory chunks like the worker processes
+    with ThreadPoolExecutor(4) as executor:
+        for _ in range(500):
+            buffer = SourceBuffer.from_bytes(source_generator(rnd, 120))
+            
+            symbol_table = SymbolTable()
+            expected_tokens = Scanner.scan(buffer, symbol_table=symbol_table)
+            
+            parallel_symbol_table = SymbolTable()
+            tokens = Scanner.scan_parallel(
+                buffer,
+                rnd.randint(2, 6),
+                parallel_symbol_table,
+                executor,
+                min_chunk_size=rnd.randint(1, 64)
+            )
+            
+            assert get_tokens(tokens) == get_tokens(expected_tokens), bytes(buffer.data)
+            assert list(tokens.symbols) == list(expected_tokens.symbols)
+            assert parallel_symbol_table.names == symbol_table.names
+
+
+def test_scan_parallel_maps_the_file_in_workers(tmp_path, rnd, source_generator):
+    cf_path = tmp_path / "a.clua"
+    cf_path.write_bytes(b"".join(source_generator(rnd, 200) for _ in range(20)))
+    
+    with ProcessPoolExecutor(2) as executor:
+        with SourceBuffer.open(cf_path) as buffer:
+            tokens = Scanner.scan_parallel(buffer, 4, None, executor, min_chunk_size=256)
+            
+            assert get_tokens(tokens) == get_tokens(Scanner.scan(buffer))
+
+
+def test_prescan_matches_tokens(rnd):
+    checked_count = 0
+    
+    for _ in range(2000):
+        source = b"".join(rnd.choice(BALANCED_FRAGMENTS) for _ in range(rnd.randint(0, 40)))
+        tokens = Scanner.scan(SourceBuffer.from_bytes(source))
+        
+        # The prescan doesn't track the unfinished literals (reported by the scanner)
+        if any(kind in UNFINISHED_KINDS for kind in tokens.kinds):
+            continue
+        
+        prescan = Scanner.prescan(source)
+        checked_count += 1
+        
+        comment_spans = list(zip(prescan.comment_starts, prescan.comment_ends))
+        string_spans = list(zip(prescan.string_starts, prescan.string_ends))
+        
+        assert comment_spans == get_spans(tokens, (Tokens.COMMENT, Tokens.LONG_COMMENT)), source
+        assert string_spans == get_spans(tokens, (Tokens.STRING, Tokens.LONG_STRING)), source
+    
+    assert checked_count > 1000
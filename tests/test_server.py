@@ -0,0 +1,131 @@
+from compiler import Cache, Loader
+from compiler.contexts import ProjectContext
+from compiler.client import Client
+from compiler.server import Server
+
+import threading
+import socket
+import pytest
+import os
+
+
+def bind_stale_socket(socket_path):
+    """Leaves a socket file without a listening server behind."""
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale_socket:
+        stale_socket.bind(str(socket_path))
+
+
+def test_default_socket_path_is_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert Client.get_default_socket_path() == tmp_path / "clua.sock"
+    
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    socket_path = Client.get_default_socket_path()
+    assert socket_path.parent.name == f"clua-{os.getuid()}"
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    socket_path = tmp_path / "private" / "clua.sock"
+    server = Server(socket_path, 1)
+    
+    # The private directory is created
+    assert server.prepare_socket_path()
+    assert socket_path.parent.stat().st_mode & 0o777 == 0o700
+    
+    bind_stale_socket(socket_path)
+    
+    assert server.prepare_socket_path()
+    assert not socket_path.exists()
+
+
+def test_other_files_are_never_removed(tmp_path):
+    socket_path = tmp_path / "clua.sock"
+    socket_path.write_text("data")
+    
+    assert not Server(socket_path, 1).prepare_socket_path()
+    assert socket_path.read_text() == "data"
+    
+    with pytest.raises(OSError):
+        Client.request(socket_path, {"command": "ping"}, timeout=1.0)
+
+
+def test_shared_directory_is_refused(tmp_path):
+    shared_dir_path = tmp_path / "shared"
+    shared_dir_path.mkdir()
+    shared_dir_path.chmod(0o777)
+    
+    assert not Server(shared_dir_path / "clua.sock", 1).prepare_socket_path()
+    
+    # Sticky directories (such as /tmp) only let their owners remove the files
+    shared_dir_path.chmod(0o1777)
+    
+    assert Server(shared_dir_path / "clua.sock", 1).prepare_socket_path()
+
+
+@pytest.fixture
+def projects(tmp_path, monkeypatch):
+    """Creates three small projects (a, b and c), the global project is never touched."""
+    
+    monkeypatch.setattr(Cache, "Project", ProjectContext())
+    assert Loader.initialize_compiler()
+    
+    project_dir_paths = []
+    
+    for name in "abc":
+        project_dir_path = tmp_path / name
+        project_dir_path.mkdir()
+        
+        (project_dir_path / f"{name}1.clua").write_text(f"local {name} = 1\n")
+        (project_dir_path / f"{name}2.clua").write_text(f"local {name}: T = 2\n")
+        
+        project_dir_paths.append(project_dir_path)
+    
+    return project_dir_paths
+
+
+def test_projects_have_their_own_state(tmp_path, projects):
+    server = Server(tmp_path / "clua.sock", 1)
+    
+    for project_dir_path in projects[:2]:
+        response = server.compile(project_dir_path, use_cache=False)
+        assert response["status"] == "ok" and response["compiled"] == 2
+    
+    first_project, second_project = [project.context for project in server.projects.values()]
+    
+    assert sorted(path.name for path in first_project.compiler_tokens) == ["a1.clua", "a2.clua"]
+    assert sorted(path.name for path in second_project.compiler_tokens) == ["b1.clua", "b2.clua"]
+    assert Cache.Project.clua_trace == [] and len(Cache.Project.compiler_tokens) == 0
+    
+    # Nothing changed since the previous request
+    assert server.compile(projects[0], use_cache=False)["compiled"] == 0
+
+
+def test_other_projects_are_compiled_meanwhile(tmp_path, projects):
+    server = Server(tmp_path / "clua.sock", 1)
+    server.compile(projects[0], use_cache=False)
+    
+    responses = []
+    
+    # A request of the first project is running (its lock is held)
+    with next(iter(server.projects.values())).lock:
+        thread = threading.Thread(target=lambda: responses.append(server.compile(projects[1], use_cache=False)))
+        thread.start()
+        thread.join(10.0)
+        
+        assert not thread.is_alive()
+    
+    assert responses[0]["status"] == "ok" and responses[0]["compiled"] == 2
+
+
+def test_least_recently_compiled_project_is_evicted(tmp_path, projects):
+    server = Server(tmp_path / "clua.sock", 1, max_projects=2)
+    
+    for project_dir_path in (projects[0], projects[1], projects[0], projects[2]):
+        server.compile(project_dir_path, use_cache=False)
+    
+    assert [project_key[0] for project_key in server.projects] == [projects[0], projects[2]]
+    
+    # Loaded and compiled again
+    assert server.compile(projects[1], use_cache=False)["compiled"] == 2
+    assert [project_key[0] for project_key in server.projects] == [projects[2], projects[1]]
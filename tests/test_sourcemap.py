@@ -0,0 +1,131 @@
+from compiler import SourceBuffer, LineIndex, SourceMap, Scanner, Parser, Emitter
+
+import pytest
+import io
+
+
+MAPPED_SOURCE = b"""local x: number = 1 -- one
+local function f(a: string, --[[ b:
+  multi-line ]] b): string
+    return a..b--[==[ glued ]==]end
+print(f("a: b", [[
+long: string]]))\r
+"""
+
+
+def emit_with_map(emit_function: str, source: bytes, remove_comments: bool):
+    buffer = SourceBuffer.from_bytes(source)
+    builder = SourceMap.Builder(LineIndex.from_buffer(source), "dev.lua", "dev.clua")
+    output_file = io.BytesIO()
+    
+    if emit_function == "tree":
+        tree = Parser(Scanner.scan(buffer)).parse()
+        Emitter.emit_tree(tree, buffer, output_file, remove_comments, builder)
+    else:
+        parser = Parser(Scanner.scan(buffer))
+        Emitter.emit_statements(parser.iter_statements(), parser.tree, buffer, output_file, remove_comments, builder)
+    
+    return output_file.getvalue(), builder.build()
+
+
+def check_mapped_bytes(source: bytes, output: bytes, source_map: SourceMap, remove_comments: bool):
+    """Checks that every output byte is mapped to the same source byte (except the comment separators)."""
+    
+    source_index = LineIndex.from_buffer(source)
+    output_index = LineIndex.from_buffer(output)
+    
+    # The empty line after a trailing newline may have its own (empty) generated line
+    assert len(output_index) <= len(source_map) <= output.count(b"\n") + 1, output
+    
+    for offset, byte in enumerate(output):
+        source_position = source_map.lookup(*output_index.offset_to_line_col(offset))
+        
+        assert source_position is not None, (output, offset)
+        
+        source_offset = source_index.line_col_to_offset(*source_position)
+        
+        # The space replacing a comment glued to two tokens has no source byte
+        if remove_comments and byte == ord(" ") and source[source_offset] != byte:
+            continue
+        
+        assert source[source_offset] == byte, (output, offset)
+
+
+def test_vlq_round_trip():
+    values = [0, 1, -1, 15, 16, -16, 31, 32, -33, 1023, 1024, -1024, 123456789, -(1 << 40)]
+    
+    assert SourceMap.encode_vlq(0) == "A"
+    assert SourceMap.encode_vlq(-1) == "D"
+    assert SourceMap.encode_vlq(16) == "gB"
+    
+    # Twice, the small values are cached by the first pass
+    for _ in range(2):
+        encoded = "".join(SourceMap.encode_vlq(value) for value in values)
+        assert SourceMap.decode_vlq(encoded) == values
+
+
+def test_builder_and_lookups():
+    source = b"ab\ncd\nef"
+    builder = SourceMap.Builder(LineIndex.from_buffer(source), "dev.lua", "dev.clua")
+    
+    # Output "ab\nc_\nef": "d" is replaced by a generated byte
+    builder.add_span(0, 4)
+    builder.add_text(1)
+    builder.add_span(5, 8)
+    source_map = builder.build()
+    
+    assert len(source_map) == 3
+    assert source_map.lookup(0, 0) == (0, 0)
+    assert source_map.lookup(0, 2) == (0, 2)
+    assert source_map.lookup(1, 0) == (1, 0)
+    assert source_map.lookup(1, 2) == (1, 2)
+    assert source_map.lookup(2, 1) == (2, 1)
+    assert source_map.lookup(3) is None
+    assert source_map.lookup(-1) is None
+    
+    assert source_map.lookup_lines([2, 0, 5, -1]) == [2, 0, None, None]
+
+
+def test_json_round_trip():
+    _, source_map = emit_with_map("tree", MAPPED_SOURCE, True)
+    data = source_map.to_json()
+    
+    assert data["version"] == 3 and data["file"] == "dev.lua" and data["sources"] == ["dev.clua"]
+    
+    loaded_map = SourceMap.from_json(data)
+    
+    assert loaded_map.to_json() == data
+    assert list(loaded_map.line_segments) == list(source_map.line_segments)
+    assert list(loaded_map.source_lines) == list(source_map.source_lines)
+    assert list(loaded_map.source_columns) == list(source_map.source_columns)
+    
+    # Segments without a source are skipped, invalid digits are rejected
+    assert SourceMap.from_json({"mappings": "C,AAAA;;EACC"}).lookup(2, 2) == (1, 1)
+    
+    with pytest.raises(ValueError):
+        SourceMap.from_json({"mappings": "A!"})
+
+
+def test_translate_trace():
+    source_map = SourceMap.from_json({"file": "dev.lua", "sources": ["dev.clua"], "mappings": "AAAA;AAEA;"})
+    trace = "lua: src/dev.lua:2: error\n\tsrc/dev.lua:3: in main\n\tother.lua:1: in f"
+    
+    assert SourceMap.translate_trace(trace, {"dev.lua": source_map}) == (
+        "lua: src/dev.clua:3: error\n\tsrc/dev.lua:3: in main\n\tother.lua:1: in f"
+    )
+
+
+def test_mapped_bytes(rnd, source_generator):
+    sources = [MAPPED_SOURCE, b"", b"x = 1", b"-- only comment", b"a = 1--c\nb = 2"]
+    sources.extend(source_generator(rnd) for _ in range(200))
+    
+    for source in sources:
+        for remove_comments in (False, True):
+            tree_output, tree_map = emit_with_map("tree", source, remove_comments)
+            statements_output, statements_map = emit_with_map("statements", source, remove_comments)
+            
+            # The statement spans are split at the statement ends (more segments, same positions)
+            assert statements_output == tree_output
+            
+            check_mapped_bytes(source, tree_output, tree_map, remove_comments)
+            check_mapped_bytes(source, statements_output, statements_map, remove_comments)
@@ -0,0 +1,77 @@
+from compiler import DiskCache, Files
+
+import os
+
+
+class Payload:
+    """Creates a directory when unpickled (a crafted entry runs code the same way)."""
+    
+    def __init__(self, dir_path):
+        self.dir_path = dir_path
+    
+    
+    def __reduce__(self):
+        return os.mkdir, (str(self.dir_path),)
+
+
+def test_signing_key_is_private(user_cache_dir):
+    signing_key = DiskCache.load_signing_key()
+    key_path = user_cache_dir / "cache.key"
+    
+    assert len(signing_key) == 32
+    assert key_path.stat().st_mode & 0o777 == 0o600
+    assert DiskCache.load_signing_key() == signing_key
+    
+    # Readable by the other users, the cache is disabled
+    key_path.chmod(0o644)
+    disk_cache = DiskCache(user_cache_dir / "cache", "test")
+    
+    assert disk_cache.signing_key is None
+    assert not disk_cache.store("key", [1])
+    assert disk_cache.load("key") is None
+
+
+def test_foreign_entries_are_misses(tmp_path):
+    cache_dir_path = tmp_path / ".clua_cache"
+    disk_cache = DiskCache(cache_dir_path, "test")
+    
+    assert disk_cache.store("a1", [1, 2])
+    assert disk_cache.load("a1") == [1, 2]
+    
+    marker_path = tmp_path / "unpickled"
+    
+    # Signed by another user (committed or shared cache directory)
+    foreign_cache = DiskCache(cache_dir_path, "test", signing_key=b"k" * 32)
+    assert foreign_cache.store("b1", Payload(marker_path))
+    
+    # Plain pickle, no signature
+    assert Files.dump_pickle(disk_cache.get_entry_path("c1"), Payload(marker_path))
+    
+    assert disk_cache.load("b1") is None
+    assert disk_cache.load("c1") is None
+    assert not marker_path.exists()
+
+
+def test_corrupted_entries_are_misses(tmp_path):
+    disk_cache = DiskCache(tmp_path / ".clua_cache", "test")
+    
+    for key in ("a1", "b1", "c1"):
+        assert disk_cache.store(key, list(range(100)))
+    
+    # Flipped byte, truncated entry and empty entry
+    entry_path = disk_cache.get_entry_path("a1")
+    entry = bytearray(entry_path.read_bytes())
+    entry[-10] ^= 0xFF
+    entry_path.write_bytes(entry)
+    
+    entry_path = disk_cache.get_entry_path("b1")
+    entry_path.write_bytes(entry_path.read_bytes()[:-1])
+    
+    disk_cache.get_entry_path("c1").write_bytes(b"")
+    
+    for key in ("a1", "b1", "c1"):
+        assert disk_cache.load(key) is None
+    
+    # Overwritten by the next store
+    assert disk_cache.store("a1", [3])
+    assert disk_cache.load("a1") == [3]
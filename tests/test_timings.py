@@ -0,0 +1,103 @@
+from compiler import Cache, Timings, Cli
+from compiler.contexts import ProjectContext
+
+from pathlib import Path
+
+import json
+import os
+
+
+def test_disabled_recorder_records_nothing():
+    timings = Timings(enabled=False)
+    
+    with timings.span("scan", Path("a.clua")) as span:
+        span.count(tokens=3)
+    
+    assert timings.events == []
+
+
+def test_summarize_merges_the_worker_events():
+    timings = Timings()
+    
+    with timings.span("walk") as span:
+        span.count(files=2)
+    
+    with timings.span("scan", Path("a.clua")) as span:
+        span.count(bytes=10, tokens=3)
+        span.count(tokens=1)
+    
+    # Recorded by a worker process (its events come back with the file context)
+    worker_timings = Timings()
+    worker_timings.events.append(("scan", "b.clua", 1.0, 0.25, 0.125, 4242, {"bytes": 5}))
+    worker_timings.events.append(("parse", "b.clua", 1.25, 0.5, 0.5, 4242, {"nodes": 7}))
+    
+    timings.merge(worker_timings.events)
+    timings.merge(None)
+    
+    summary = timings.summarize()
+    
+    assert set(summary["phases"]) == {"walk", "scan", "parse"}
+    assert summary["phases"]["walk"]["counters"] == {"files": 2}
+    assert summary["phases"]["scan"]["count"] == 2
+    assert summary["phases"]["scan"]["counters"] == {"bytes": 15, "tokens": 4}
+    
+    # The project phases (no file) are not listed with the files
+    assert set(summary["files"]) == {"a.clua", "b.clua"}
+    assert summary["files"]["b.clua"]["wall"] == 0.75
+    assert summary["files"]["b.clua"]["cpu"] == 0.625
+    assert summary["files"]["b.clua"]["counters"] == {"bytes": 5, "nodes": 7}
+    
+    assert "b.clua" in timings.format_report()
+
+
+def test_chrome_trace():
+    timings = Timings()
+    timings.events.append(("walk", "", 2.0, 0.5, 0.25, 1, {"files": 2}))
+    timings.events.append(("scan", "src/a.clua", 2.5, 0.001, 0.002, 2, {"tokens": 3}))
+    
+    trace = timings.to_chrome_trace()
+    walk_event, scan_event = trace["traceEvents"]
+    
+    # Microseconds from the first event, one row (tid) per process
+    assert walk_event["name"] == "walk" and walk_event["ts"] == 0 and walk_event["dur"] == 500_000
+    assert scan_event["name"] == "scan a.clua" and scan_event["cat"] == "scan" and scan_event["ph"] == "X"
+    assert scan_event["ts"] == 500_000 and scan_event["tid"] == 2
+    assert scan_event["args"] == {"tokens": 3, "file": "src/a.clua", "cpu_ms": 2.0}
+    
+    assert Timings().to_chrome_trace()["traceEvents"] == []
+
+
+def test_timings_json(tmp_path, monkeypatch):
+    project_dir_path = tmp_path / "project"
+    project_dir_path.mkdir()
+    
+    for name in ("a", "b", "c"):
+        (project_dir_path / f"{name}.clua").write_text(f"local {name}: number = 1\n")
+    
+    # Cli.main() replaces the recorder and loads the project of the command line
+    monkeypatch.setattr(Cache, "Project", ProjectContext())
+    monkeypatch.setattr(Cache.Compiler, "timings", Cache.Compiler.timings)
+    
+    json_path = tmp_path / "timings.json"
+    trace_path = tmp_path / "trace.json"
+    
+    exit_code = Cli.main([
+        str(project_dir_path),
+        "--no-cache",
+        "-j", "2",
+        "--timings-json", str(json_path),
+        "--timings-trace", str(trace_path)
+    ])
+    
+    assert exit_code == 0
+    
+    data = json.loads(json_path.read_text())
+    
+    assert {"walk", "config", "read", "scan", "parse"} <= set(data["phases"])
+    assert set(data["files"]) == {str(project_dir_path / f"{name}.clua") for name in ("a", "b", "c")}
+    assert data["phases"]["read"]["count"] == 3
+    
+    # The files are compiled by the worker processes, their events are merged
+    assert any(event["pid"] != os.getpid() for event in data["events"] if event["phase"] == "scan")
+    
+    assert len(json.loads(trace_path.read_text())["traceEvents"]) == len(data["events"])
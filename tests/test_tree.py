@@ -0,0 +1,62 @@
+from compiler import SourceBuffer, Scanner, Parser
+from compiler.contexts import Types, SyntaxTree
+
+
+Nodes = Types.Nodes
+
+
+def test_truncate_repairs_the_children_of_discarded_nodes():
+    tree = SyntaxTree()
+    
+    first_leaf = tree.add_node(1, 0, 0)
+    second_leaf = tree.add_node(1, 1, 1)
+    tree.add_node(2, 0, 1, (first_leaf, second_leaf))
+    
+    tree.truncate(2)
+    
+    assert len(tree) == 2
+    assert list(tree.parents) == [-1, -1]
+    assert list(tree.next_siblings) == [-1, -1]
+
+
+def test_parsed_trees_have_no_orphan_nodes(rnd, source_generator):
+    for _ in range(1000):
+        source = source_generator(rnd)
+        tree = Parser(Scanner.scan(SourceBuffer.from_bytes(source))).parse()
+        
+        # Every node is reachable from the root (failed statements are only ERROR nodes)
+        assert sorted(tree.walk()) == list(range(len(tree))), source
+
+
+def test_statement_parse_matches_whole_file_parse(rnd, source_generator):
+    for _ in range(1000):
+        source = source_generator(rnd)
+        
+        tree_parser = Parser(Scanner.scan(SourceBuffer.from_bytes(source)))
+        tree = tree_parser.parse()
+        
+        # Top-level statements of the whole tree (the blocks of the chunk are flattened)
+        expected_statements = []
+        
+        for child in tree.children(tree.root):
+            children = tree.children(child) if tree.kinds[child] == Nodes.BLOCK else [child]
+            expected_statements.extend(
+                (tree.kinds[index], tree.first_tokens[index], tree.last_tokens[index]) for index in children
+            )
+        
+        parser = Parser(Scanner.scan(SourceBuffer.from_bytes(source)))
+        statements = []
+        
+        for statement in parser.iter_statements():
+            # Only the nodes of the current statement are held
+            assert statement == len(parser.tree) - 1, source
+            
+            statements.append((
+                parser.tree.kinds[statement],
+                parser.tree.first_tokens[statement],
+                parser.tree.last_tokens[statement]
+            ))
+        
+        assert statements == expected_statements, source
+        assert parser.diagnostics == tree_parser.diagnostics, source
+        assert len(parser.tree) == 0
@@ -0,0 +1,96 @@
+from compiler import Cache, Loader, Watcher
+from compiler.contexts import ProjectContext
+
+from unittest import mock
+
+import shutil
+import pytest
+import os
+
+
+def test_poll_survives_a_removed_directory(tmp_path, monkeypatch):
+    dir_path = tmp_path / "libs"
+    dir_path.mkdir()
+    (dir_path / "a.clua").write_text("x = 1")
+    
+    monkeypatch.setattr(Cache.Project, "project_tree", [dir_path, dir_path / "a.clua"])
+    monkeypatch.setattr(Cache.Project, "excluded_patterns", [])
+    
+    watcher = Watcher(tmp_path)
+    watcher.take_snapshot()
+    
+    # Removed between get_mtime() and the listing
+    os.utime(dir_path, ns=(1, 1))
+    
+    with mock.patch("compiler.watcher.os.scandir", side_effect=FileNotFoundError):
+        assert watcher.poll() == set()
+    
+    assert dir_path not in watcher.dir_mtimes
+    
+    shutil.rmtree(dir_path)
+    
+    assert watcher.poll() == {dir_path / "a.clua"}
+
+
+@pytest.fixture
+def project_state(monkeypatch):
+    """Compiles the test project inside a new project context (restored after the test)."""
+    
+    monkeypatch.setattr(Cache, "Project", ProjectContext())
+    
+    assert Loader.initialize_compiler()
+
+
+def touch(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_run_keeps_the_snapshot_taken_before_the_compilation(tmp_path, monkeypatch, project_state):
+    cf_path = tmp_path / "a.clua"
+    cf_path.write_text("x = 1")
+    touch(cf_path, 1_000_000_000)
+    
+    assert Loader.initialize_project(tmp_path)
+    
+    watcher = Watcher(tmp_path, 1)
+    watcher.take_snapshot()
+    
+    # Saved during the initial compilation
+    touch(cf_path, 2_000_000_000)
+    
+    rebuilds = []
+    sleep_calls = iter([None])
+    
+    def sleep(interval):
+        if next(sleep_calls, KeyboardInterrupt) is KeyboardInterrupt:
+            raise KeyboardInterrupt
+    
+    monkeypatch.setattr("compiler.watcher.time.sleep", sleep)
+    watcher.run(lambda contexts: rebuilds.append([context.cf_path for context in contexts]))
+    
+    assert rebuilds == [[cf_path]]
+
+
+def test_root_exclude_change_walks_the_project_again(tmp_path, project_state):
+    config_path = tmp_path / "clua.config.yaml"
+    config_path.write_text("exclude: []\n")
+    touch(config_path, 1_000_000_000)
+    
+    (tmp_path / "gen").mkdir()
+    (tmp_path / "gen" / "b.clua").write_text("y = 2")
+    (tmp_path / "a.clua").write_text("x = 1")
+    
+    assert Loader.initialize_project(tmp_path)
+    assert sorted(Cache.Project.clua_trace) == [tmp_path / "a.clua", tmp_path / "gen" / "b.clua"]
+    
+    watcher = Watcher(tmp_path, 1)
+    watcher.take_snapshot()
+    
+    config_path.write_text("exclude: [\"gen\"]\n")
+    touch(config_path, 2_000_000_000)
+    
+    contexts = watcher.rebuild(watcher.poll())
+    
+    assert [context.cf_path for context in contexts] == [tmp_path / "a.clua"]
+    assert Cache.Project.clua_trace == [tmp_path / "a.clua"]
+    assert tmp_path / "gen" not in watcher.dir_mtimes